@@ -0,0 +1,105 @@
+"""
+Compare the WSGI (gunicorn sync workers) and ASGI (gunicorn + uvicorn)
+deployments under many slow keep-alive clients.
+
+Start both servers against the same database, for example:
+
+    gunicorn qualitydemo.wsgi:application -c gunicorn.conf.py -b 127.0.0.1:8000
+    gunicorn qualitydemo.asgi:application -c gunicorn.asgi.conf.py -b 127.0.0.1:8001
+
+then run:
+
+    python benchmarks/asgi_vs_wsgi.py --path /api/products/1/ \\
+        --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001
+
+Every client keeps one connection open and waits ``--think`` seconds
+between requests, like a polling client. Only the standard library is used.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def client(host, port, path, think, deadline, latencies, errors):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors.append(1)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+        await asyncio.sleep(think)
+    if writer is not None:
+        writer.close()
+
+
+async def read_response(reader):
+    headers = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in headers.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    if not headers.startswith((b"HTTP/1.1 200", b"HTTP/1.1 304")):
+        raise ValueError(headers.split(b"\r\n", 1)[0])
+
+
+async def run_target(url, path, clients, duration, think):
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*[
+        client(parts.hostname, parts.port or 80, path, think, deadline, latencies, errors)
+        for _ in range(clients)
+    ])
+    return latencies, len(errors)
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', action='append', required=True, help="name=http://host:port")
+    parser.add_argument('--path', default='/api/categories/count/')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--think', type=float, default=1.0, help="Seconds between requests per client")
+    args = parser.parse_args()
+
+    print(f"{args.clients} keep-alive clients, {args.think}s think time, {args.duration}s per target")
+    print(f"{'target':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for target in args.target:
+        name, _, url = target.partition('=')
+        latencies, errors = asyncio.run(
+            run_target(url, args.path, args.clients, args.duration, args.think)
+        )
+        print(
+            f"{name:<8} {len(latencies) / args.duration:>8.1f}"
+            f" {statistics.median(latencies) * 1000 if latencies else float('nan'):>8.1f}"
+            f" {percentile(latencies, 0.99) * 1000:>8.1f} {errors:>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Classify a seeded catalog one model instance at a time (the old
+ProductHelper path: a category query per product) and with
+classify_products() (one values() query), and check they agree.
+
+    python benchmarks/classification.py [--products 10000]
+"""
+
+import argparse
+import datetime
+
+from common import benchmark_database, report, seed_catalog, timeit
+from django.db.models import F
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from products.classification import PRODUCT_CLASSIFICATION, classify_products
+        from products.models import Category, Product
+
+        seed_catalog(args.products)
+        # Give the named branches something to match.
+        Category.objects.filter(pk=Category.objects.order_by('pk').values('pk')[:1]).update(name="Electronics")
+        for offset, name in enumerate(("Laptop", "Mouse", "Keyboard")):
+            Product.objects.annotate(bucket=F('id') % 4).filter(bucket=offset).update(name=name)
+
+        now = datetime.datetime(2026, 10, 12, 10, 0)
+
+        def per_instance():
+            return {product.id: PRODUCT_CLASSIFICATION.classify(product, now) for product in Product.objects.all()}
+
+        def batch():
+            return dict(classify_products(now=now))
+
+        assert per_instance() == batch()
+
+        per_instance_time = timeit(per_instance, repeat=3)
+        batch_time = timeit(batch, repeat=3)
+        report(f"classification ({args.products} products)", [
+            ('per instance', f"{per_instance_time * 1000:9.1f} ms"),
+            ('classify_products', f"{batch_time * 1000:9.1f} ms  x{per_instance_time / batch_time:.1f}"),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Shared setup for the benchmark scripts in this directory."""
+
+import contextlib
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qualitydemo.settings')
+
+import django
+
+django.setup()
+# Request logging would dominate the timings of anything measured here.
+logging.disable(logging.CRITICAL)
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """Run against a throwaway test database so real data is never touched."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_catalog(products=10_000, categories=20, seed=42):
+    from products.models import Category, Product
+
+    rng = random.Random(seed)
+    category_objs = Category.objects.bulk_create(
+        [Category(name=f"Category {index}") for index in range(categories)]
+    )
+    Product.objects.bulk_create(
+        [
+            Product(
+                name=f"Product {index}",
+                description=f"Description for product {index} " * 3,
+                price=Decimal(rng.randint(100, 100_000)) / 100,
+                stock=rng.randint(0, 50),
+                is_active=rng.random() > 0.1,
+                category=rng.choice(category_objs),
+            )
+            for index in range(products)
+        ],
+        batch_size=1000,
+    )
+    return category_objs
+
+
+def timeit(func, repeat=5, number=1):
+    """Return the median seconds per call of ``func`` over ``repeat`` runs."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label:<{width}}  {value}")
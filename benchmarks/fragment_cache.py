@@ -0,0 +1,62 @@
+"""
+Measure product_list/product_detail render time with cold and warm
+template fragment caches on a 10k-product catalog.
+
+    python benchmarks/fragment_cache.py [--products 10000] [--pages 50]
+"""
+
+import argparse
+
+from common import benchmark_database, report, seed_catalog, timeit
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=10_000)
+    parser.add_argument('--pages', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from products.models import Product
+
+        seed_catalog(args.products)
+        client = Client()
+        detail_ids = list(Product.objects.filter(is_active=True).values_list('id', flat=True)[:args.pages])
+
+        def list_pages():
+            for page in range(1, args.pages + 1):
+                client.get('/', {'page': page})
+
+        def detail_pages():
+            for product_id in detail_ids:
+                client.get(f'/product/{product_id}/')
+
+        rows = []
+        for name, func in (('product_list', list_pages), ('product_detail', detail_pages)):
+            def cold(func=func):
+                for cache in caches.all():
+                    cache.clear()
+                func()
+
+            cold_time = timeit(cold, repeat=3)
+            func()
+            warm_time = timeit(func, repeat=3)
+            with CaptureQueriesContext(connection) as queries:
+                func()
+
+            rows += [
+                (f"{name} cold (ms/page)", f"{cold_time * 1000 / args.pages:.2f}"),
+                (f"{name} warm (ms/page)", f"{warm_time * 1000 / args.pages:.2f}"),
+                (f"{name} warm queries/page", f"{len(queries) / args.pages:.1f}"),
+                (f"{name} saving", f"{(1 - warm_time / cold_time) * 100:.0f}%"),
+            ]
+
+        report(f"Fragment caching, {args.products} products, {args.pages} pages", rows)
+
+
+if __name__ == '__main__':
+    main()
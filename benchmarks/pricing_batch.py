@@ -0,0 +1,70 @@
+"""
+Compare the scalar tax/shipping calculators with their batch versions on a
+cart-sized and a catalog-sized input, and check the results are identical.
+
+    python benchmarks/pricing_batch.py [--lines 200] [--catalog 10000]
+"""
+
+import argparse
+import random
+from decimal import Decimal
+
+from common import report, timeit
+
+from products.utils import (
+    calculate_shipping_cost,
+    calculate_shipping_cost_batch,
+    calculate_tax,
+    calculate_tax_batch,
+)
+
+
+def make_inputs(size, rng):
+    prices = [Decimal(rng.randint(100, 100_000)) / 100 for _ in range(size)]
+    # Catalog weights come in a limited set of values, like real packaging.
+    weights = [rng.choice((0.25, 0.5, 1, 1.5, 2.5, 5, 10, 20)) * rng.randint(1, 4) for _ in range(size)]
+    distances = [rng.choice((50, 100, 250, 500, 1000)) for _ in range(size)]
+    return prices, weights, distances
+
+
+def compare(label, size, rng):
+    prices, weights, distances = make_inputs(size, rng)
+
+    # Compare the string forms so differing exponents would count as a mismatch.
+    batch_tax = calculate_tax_batch(prices, 0.21)
+    assert [str(tax) for tax in batch_tax] == [str(calculate_tax(price, 0.21)) for price in prices]
+    scalar_shipping = [calculate_shipping_cost(w, d) for w, d in zip(weights, distances)]
+    batch_shipping = calculate_shipping_cost_batch(weights, distances)
+    assert [str(cost) for cost in batch_shipping] == [str(cost) for cost in scalar_shipping]
+
+    cases = (
+        ('tax', lambda: [calculate_tax(price, 0.21) for price in prices],
+         lambda: calculate_tax_batch(prices, 0.21)),
+        ('shipping', lambda: [calculate_shipping_cost(w, d) for w, d in zip(weights, distances)],
+         lambda: calculate_shipping_cost_batch(weights, distances)),
+        ('shipping, one distance', lambda: [calculate_shipping_cost(w, 250) for w in weights],
+         lambda: calculate_shipping_cost_batch(weights, 250)),
+    )
+    number = max(1, 20_000 // size)
+    rows = []
+    for name, scalar, batch in cases:
+        scalar_time = timeit(scalar, number=number)
+        batch_time = timeit(batch, number=number)
+        timings = f"scalar {scalar_time * 1000:8.3f} ms  batch {batch_time * 1000:8.3f} ms"
+        rows.append((name, f"{timings}  x{scalar_time / batch_time:.1f}"))
+    report(f"{label} ({size} lines)", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--catalog', type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    compare("cart", args.lines, rng)
+    compare("catalog", args.catalog, rng)
+
+
+if __name__ == '__main__':
+    main()
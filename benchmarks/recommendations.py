@@ -0,0 +1,71 @@
+"""
+Build co-occurrence neighbours from synthetic browsing sessions and
+measure recommend() latency for histories of different lengths.
+
+    python benchmarks/recommendations.py [--products 10000] [--visitors 20000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from common import benchmark_database, report, seed_catalog
+
+
+def seed_interactions(visitors, rng):
+    from products.models import Product, ProductInteraction
+
+    by_category = {}
+    for product_id, category_id in Product.objects.filter(is_active=True).values_list('id', 'category_id'):
+        by_category.setdefault(category_id, []).append(product_id)
+    categories = list(by_category.values())
+
+    interactions = []
+    for visitor in range(visitors):
+        # Sessions mostly stay within one category, like real browsing.
+        pool = rng.choice(categories)
+        for product_id in rng.sample(pool, min(len(pool), rng.randint(3, 15))):
+            kind = ProductInteraction.PURCHASE if rng.random() < 0.1 else ProductInteraction.VIEW
+            interactions.append(ProductInteraction(visitor=f'v{visitor}', product_id=product_id, kind=kind))
+    ProductInteraction.objects.bulk_create(interactions, batch_size=5000)
+    return [product_id for pool in categories for product_id in pool], len(interactions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=10_000)
+    parser.add_argument('--visitors', type=int, default=20_000)
+    parser.add_argument('--requests', type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with benchmark_database():
+        from products.recommendations import build_recommendations, recommend
+
+        seed_catalog(args.products)
+        product_ids, interaction_count = seed_interactions(args.visitors, rng)
+
+        start = time.perf_counter()
+        built = build_recommendations()
+        build_time = time.perf_counter() - start
+        recommend(product_ids[:1])  # load the index
+
+        rows = [('build', f"{build_time:.2f} s for {interaction_count} interactions, {built} products")]
+        for size in (1, 5, 20):
+            samples = []
+            for _ in range(args.requests):
+                history = rng.sample(product_ids, size)
+                start = time.perf_counter()
+                recommend(history)
+                samples.append(time.perf_counter() - start)
+            quantiles = statistics.quantiles(samples, n=100)
+            rows.append((
+                f"history of {size}",
+                f"p50 {quantiles[49] * 1e6:7.1f} us  p99 {quantiles[98] * 1e6:7.1f} us",
+            ))
+        report(f"recommendations ({args.products} products, {args.visitors} visitors)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Hammer the reservation subsystem from many processes at once and check
+nothing was oversold or double-settled.
+
+    python benchmarks/reservation_stress.py [--workers 8] [--operations 300]
+
+Each worker reserves random products and then confirms, releases or
+abandons the reservation; a sweeper process releases abandoned ones as
+they expire. Afterwards every product must satisfy:
+
+    stock == initial stock - confirmed units
+    reserved_stock == 0 (everything settled)
+    ledger movements == -confirmed units
+
+SQLite runs against a temporary file database; Postgres against the
+usual test database.
+"""
+
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import benchmark_database, report
+from django.db import OperationalError, connection, connections
+from django.db.models import Sum
+
+INITIAL_STOCK = 50
+ABANDON_TTL = 0.5
+
+
+def worker(seed, product_ids, operations, results):
+    from products.inventory import InsufficientStock
+    from products.ledger import get_stock_movement_buffer
+    from products.reservations import (
+        ReservationExpired,
+        confirm_reservation,
+        release_reservation,
+        reserve_stock,
+    )
+
+    connections.close_all()
+    rng = random.Random(seed)
+    outcomes = Counter()
+    confirmed = Counter()
+    for _ in range(operations):
+        product_id = rng.choice(product_ids)
+        quantity = rng.randint(1, 3)
+        choice = rng.random()
+        try:
+            if choice < 0.15:
+                reserve_stock(product_id, quantity, ttl=ABANDON_TTL)
+                outcomes['abandoned'] += 1
+                continue
+            reservation = reserve_stock(product_id, quantity)
+            if choice < 0.75:
+                confirm_reservation(reservation)
+                confirmed[product_id] += quantity
+                outcomes['confirmed'] += 1
+            else:
+                release_reservation(reservation)
+                outcomes['released'] += 1
+        except InsufficientStock:
+            outcomes['sold_out'] += 1
+        except ReservationExpired:
+            outcomes['expired'] += 1
+        except OperationalError:
+            # SQLite "database is locked" after the busy timeout.
+            outcomes['busy'] += 1
+    get_stock_movement_buffer().flush()
+    results.put((outcomes, confirmed))
+
+
+def sweeper(stop):
+    from products.reservations import release_expired_reservations
+
+    connections.close_all()
+    while not stop.is_set():
+        try:
+            release_expired_reservations()
+        except OperationalError:
+            pass
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=300)
+    parser.add_argument('--products', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            # Processes cannot share the default in-memory test database.
+            connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'stress.sqlite3')
+            # Take the write lock at BEGIN so read-then-write transactions
+            # wait for each other instead of failing to upgrade their lock.
+            connection.settings_dict['OPTIONS'].update(transaction_mode='IMMEDIATE', timeout=30)
+
+        with benchmark_database():
+            run(args)
+
+
+def run(args):
+    from products.models import Category, Product, StockMovement, StockReservation
+    from products.reservations import release_expired_reservations
+
+    category = Category.objects.create(name="Flash sale")
+    Product.objects.bulk_create([
+        Product(name=f"Product {index}", price=1, stock=INITIAL_STOCK, category=category)
+        for index in range(args.products)
+    ])
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    connections.close_all()
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    stop = context.Event()
+    sweep = context.Process(target=sweeper, args=(stop,))
+    workers = [
+        context.Process(target=worker, args=(seed, product_ids, args.operations, results))
+        for seed in range(args.workers)
+    ]
+
+    start = time.perf_counter()
+    sweep.start()
+    for process in workers:
+        process.start()
+    outcomes, confirmed = Counter(), Counter()
+    for _ in workers:
+        worker_outcomes, worker_confirmed = results.get()
+        outcomes.update(worker_outcomes)
+        confirmed.update(worker_confirmed)
+    for process in workers:
+        process.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sweep.join()
+
+    time.sleep(ABANDON_TTL)
+    release_expired_reservations()
+
+    ledger = dict(
+        StockMovement.objects.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total')
+    )
+    problems = []
+    for product in Product.objects.all():
+        expected = INITIAL_STOCK - confirmed[product.pk]
+        if product.stock != expected or product.reserved_stock or ledger.get(product.pk, 0) != -confirmed[product.pk]:
+            problems.append(
+                f"{product.pk}: stock {product.stock} (expected {expected}), reserved {product.reserved_stock}, "
+                f"ledger {ledger.get(product.pk, 0)}"
+            )
+    if StockReservation.objects.exists():
+        problems.append(f"{StockReservation.objects.count()} reservation(s) left unsettled")
+
+    total = sum(outcomes.values())
+    report(
+        f"{args.workers} workers x {args.operations} operations on {args.products} products ({connection.vendor})",
+        [
+            ('throughput', f"{total / elapsed:.0f} operations/s"),
+            *((name, count) for name, count in sorted(outcomes.items())),
+            ('invariants', "ok" if not problems else f"{len(problems)} violation(s)"),
+        ],
+    )
+    for problem in problems:
+        print(f"  ! {problem}")
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
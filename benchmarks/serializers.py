@@ -0,0 +1,55 @@
+"""
+Per-product cost of looking up products by id and encoding their JSON,
+from model instances (in_bulk + build_product_json_data + json) and from
+values() rows (PRODUCT_SERIALIZER.in_bulk + dumps), for 1, 100 and 10k
+products.
+
+    python benchmarks/serializers.py [--products 10000]
+"""
+
+import argparse
+import json
+
+from common import benchmark_database, report, seed_catalog, timeit
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from products.models import Product
+        from products.serializers import PRODUCT_SERIALIZER, dumps, orjson
+        from products.views import build_product_json_data
+
+        seed_catalog(args.products)
+        ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+
+        rows = []
+        for size in (1, 100, args.products):
+            batch = ids[:size]
+
+            def from_models(batch=batch):
+                found = Product.objects.select_related('category').in_bulk(batch)
+                data = [build_product_json_data(found[pk]) for pk in batch]
+                return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+            def from_rows(batch=batch):
+                found = PRODUCT_SERIALIZER.in_bulk(batch)
+                return dumps([found[pk] for pk in batch])
+
+            assert json.loads(from_models()) == json.loads(from_rows())
+            number = max(1, 1000 // size)
+            model_time = timeit(from_models, number=number) / size
+            row_time = timeit(from_rows, number=number) / size
+            rows.append((
+                f"{size} product(s)",
+                f"models {model_time * 1e6:8.1f} us  rows {row_time * 1e6:8.1f} us  x{model_time / row_time:.1f}",
+            ))
+        report(f"per-product serialization cost (orjson: {'yes' if orjson else 'no'})", rows)
+
+
+if __name__ == '__main__':
+    main()
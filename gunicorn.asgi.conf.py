@@ -0,0 +1,62 @@
+"""
+Gunicorn configuration for the ASGI deployment profile.
+
+    gunicorn qualitydemo.asgi:application -c gunicorn.asgi.conf.py
+
+Each worker runs an event loop (uvicorn), so idle or slow keep-alive
+clients cost a socket instead of a thread. The read APIs are served by
+the async views in products.async_views.
+"""
+
+import multiprocessing
+import os
+
+# Binding
+bind = "0.0.0.0:8000"
+
+# Worker processes: one event loop per core is enough, concurrency comes
+# from the loop rather than from extra processes.
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+worker_connections = 10000
+timeout = 30
+graceful_timeout = 30
+# Keep idle client connections open long enough to be reused by pollers.
+keepalive = 75
+
+# Logging
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+
+# Process naming
+proc_name = "qualitydemo-asgi"
+
+# Server mechanics
+daemon = False
+pidfile = None
+user = None
+group = None
+tmp_upload_dir = None
+
+# Security
+limit_request_line = 4094
+limit_request_fields = 100
+limit_request_field_size = 8190
+
+
+# OpenTelemetry initialization hook
+def post_fork(server, worker):
+    """
+    Initialize OpenTelemetry after forking worker processes.
+    This ensures each worker has its own instrumentation and exporters.
+    """
+    if os.environ.get('ENABLE_OTEL', 'true').lower() == 'true':
+        from opentelemetry.instrumentation.django import DjangoInstrumentor
+
+        from qualitydemo.otel_config import configure_opentelemetry
+
+        configure_opentelemetry()
+        DjangoInstrumentor().instrument()
+
+        server.log.info(f"OpenTelemetry initialized in ASGI worker {worker.pid}")
@@ -0,0 +1,111 @@
+"""
+Async versions of the read APIs, served by qualitydemo.asgi_urls under ASGI.
+
+They share parsing and response building with products.views and only
+replace the database and cache calls with their async counterparts.
+"""
+
+import structlog
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .cache import (
+    api_cache_enabled,
+    get_cached_product_payload,
+    set_cached_product_payload,
+)
+from .conditional import ProductValidators, aget_product_validators
+from .models import Category, Product
+from .pagination import InvalidCursor
+from .serializers import PRODUCT_SERIALIZER, json_response
+from .views import (
+    batch_api_response,
+    category_status_counts_response,
+    list_api_response,
+    parse_batch_ids,
+    parse_list_api_params,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Cache backends are blocking; run them off the event loop without
+# serializing every request onto Django's single sync thread.
+aget_cached_product_payload = sync_to_async(get_cached_product_payload, thread_sensitive=False)
+aset_cached_product_payload = sync_to_async(set_cached_product_payload, thread_sensitive=False)
+
+
+async def product_api(request, product_id):
+    logger.info("product_api_request", product_id=product_id, mode='async')
+
+    cache_enabled = api_cache_enabled()
+    if cache_enabled:
+        cached, version = await aget_cached_product_payload(product_id)
+        if cached is not None:
+            validators = ProductValidators(cached['etag'], cached['last_modified'])
+            return validators.conditional_response(request) or validators.apply(json_response(cached['data']))
+
+    # A payload cached under the current version must not come from a
+    # replica that has not seen the write which bumped it.
+    using = DEFAULT_DB_ALIAS if cache_enabled else None
+    validators = await aget_product_validators(product_id, 'json', using=using)
+    if validators is None:
+        logger.warning("product_not_found", product_id=product_id)
+        return JsonResponse({'error': 'Product not found'}, status=404)
+
+    response = validators.conditional_response(request)
+    if response is not None:
+        return response
+
+    data = await PRODUCT_SERIALIZER.afirst(id=product_id, is_active=True, using=using)
+    if data is None:
+        logger.warning("product_not_found", product_id=product_id)
+        return JsonResponse({'error': 'Product not found'}, status=404)
+
+    if cache_enabled:
+        await aset_cached_product_payload(product_id, version, {
+            'data': data, 'etag': validators.etag, 'last_modified': validators.last_modified,
+        })
+
+    logger.info("product_api_success", product_id=product_id, status=data['status'], mode='async')
+    return validators.apply(json_response(data))
+
+
+async def product_list_api(request):
+    try:
+        paginator = parse_list_api_params(request)
+        page = await paginator.aget_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        logger.warning("product_list_api_invalid_cursor", cursor=request.GET.get('cursor'))
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return list_api_response(page)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def product_batch_api(request):
+    try:
+        ids = parse_batch_ids(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return batch_api_response(ids, await PRODUCT_SERIALIZER.ain_bulk(ids, is_active=True))
+
+
+async def category_products_count(request):
+    data = [
+        {'category': name, 'product_count': count}
+        async for name, count in Category.objects.values_list('name', 'product_count')
+    ]
+
+    logger.info("category_products_count_success", total_categories=len(data), mode='async')
+    return JsonResponse({'categories': data})
+
+
+async def category_status_counts(request):
+    return category_status_counts_response([row async for row in Product.objects.status_counts_by_category()])
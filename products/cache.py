@@ -0,0 +1,120 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+
+API_CACHE_PREFIX = 'products:api'
+FRAGMENT_VERSION_PREFIX = 'products:fragments:version'
+CATEGORIES_FRAGMENT = 'categories'
+API_CACHE_STATS = ('hits', 'misses')
+INVALIDATION_CHUNK_SIZE = 500
+
+
+def api_cache_enabled():
+    return getattr(settings, 'PRODUCTS_API_CACHE_ENABLED', False)
+
+
+def get_api_cache():
+    return caches[getattr(settings, 'PRODUCTS_API_CACHE_ALIAS', 'default')]
+
+
+def _version_key(product_id):
+    return f'{API_CACHE_PREFIX}:version:{product_id}'
+
+
+def _entry_key(product_id, version):
+    return f'{API_CACHE_PREFIX}:entry:{product_id}:{version}'
+
+
+def _stats_key(name):
+    return f'{API_CACHE_PREFIX}:stats:{name}'
+
+
+def get_version_token(key, cache):
+    """
+    Return the version token stored under ``key``, creating one if missing.
+
+    Tokens are random rather than counters, so an evicted version key can
+    never make an older entry reachable again.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_product_version(product_id, cache=None):
+    return get_version_token(_version_key(product_id), cache or get_api_cache())
+
+
+def record_api_cache_event(name, cache=None):
+    cache = cache or get_api_cache()
+    key = _stats_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cached_product_payload(product_id):
+    """Return ``(payload, version)``; ``payload`` is None on a miss."""
+    cache = get_api_cache()
+    version = get_product_version(product_id, cache)
+    payload = cache.get(_entry_key(product_id, version))
+    record_api_cache_event('misses' if payload is None else 'hits', cache)
+    return payload, version
+
+
+def set_cached_product_payload(product_id, version, payload):
+    timeout = getattr(settings, 'PRODUCTS_API_CACHE_TIMEOUT', 300)
+    get_api_cache().set(_entry_key(product_id, version), payload, timeout)
+
+
+def invalidate_products(product_ids):
+    """Bump the version of every given product so their cached payloads are skipped."""
+    if not api_cache_enabled():
+        return
+    cache = get_api_cache()
+    keys = [_version_key(product_id) for product_id in product_ids]
+    for start in range(0, len(keys), INVALIDATION_CHUNK_SIZE):
+        cache.delete_many(keys[start:start + INVALIDATION_CHUNK_SIZE])
+
+
+def get_api_cache_stats():
+    values = get_api_cache().get_many([_stats_key(name) for name in API_CACHE_STATS])
+    stats = {name: values.get(_stats_key(name), 0) for name in API_CACHE_STATS}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_api_cache_stats():
+    get_api_cache().delete_many([_stats_key(name) for name in API_CACHE_STATS])
+
+
+def get_fragment_cache():
+    # The same cache the {% cache %} tag writes fragments to.
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _fragment_version_key(name):
+    return f'{FRAGMENT_VERSION_PREFIX}:{name}'
+
+
+def category_products_fragment(category_id):
+    return f'category:{category_id}:products'
+
+
+def get_fragment_version(name):
+    """Return the version token that template fragments built from ``name`` vary on."""
+    return get_version_token(_fragment_version_key(name), get_fragment_cache())
+
+
+def bump_fragment_versions(names):
+    get_fragment_cache().delete_many([_fragment_version_key(name) for name in names])
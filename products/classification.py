@@ -0,0 +1,206 @@
+"""
+Declarative product classification.
+
+Rules are plain data: per product name, a set of attributes plus a tree
+of conditions with attributes to add when they hold or fail. compile()
+turns every name's tree into a table keyed by the truth values of the
+conditions it uses, so classifying a row is one dict lookup per name and
+per condition combination instead of walking nested ifs.
+
+Conditions read either the row (values() dicts, with the category name
+joined in) or the batch context, which is computed once per batch
+(currently just ``weekday`` of a single "now").
+"""
+
+import datetime
+import itertools
+import operator
+
+from .models import Product
+
+CLASSIFICATION_FIELDS = ('id', 'name', 'price', 'stock', 'is_active', 'category__name')
+CLASSIFICATION_CHUNK_SIZE = 2000
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'is': operator.is_,
+    # bool(field) == value, so 1/0 from a backend count as True/False.
+    'truthy': lambda field, value: bool(field) == value,
+}
+
+
+class Condition:
+    """``field <op> value`` on the row, or on the batch context."""
+
+    def __init__(self, field, op, value, context=False):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        self.field = field
+        self.op = op
+        self.value = value
+        self.context = context
+
+    def __repr__(self):
+        source = 'context' if self.context else 'row'
+        return f'Condition({source}.{self.field} {self.op} {self.value!r})'
+
+    def compile(self):
+        field, test, value = self.field, OPERATORS[self.op], self.value
+        if self.context:
+            return lambda row, context: test(context[field], value)
+        return lambda row, context: test(row[field], value)
+
+
+class Rule:
+    """Adds ``then`` (and evaluates ``children``) when ``when`` holds, else adds ``otherwise``."""
+
+    def __init__(self, when, then=None, otherwise=None, children=()):
+        self.when = when
+        self.then = then or {}
+        self.otherwise = otherwise or {}
+        self.children = tuple(children)
+
+    def conditions(self):
+        yield self.when
+        for child in self.children:
+            yield from child.conditions()
+
+    def apply(self, truth, result):
+        if truth[self.when]:
+            result.update(self.then)
+            for child in self.children:
+                child.apply(truth, result)
+        else:
+            result.update(self.otherwise)
+
+
+class Branch:
+    def __init__(self, attributes, rules=()):
+        self.attributes = attributes
+        self.rules = tuple(rules)
+
+    def compile(self):
+        conditions = list(dict.fromkeys(
+            condition for rule in self.rules for condition in rule.conditions()
+        ))
+        table = {}
+        for bits in itertools.product((False, True), repeat=len(conditions)):
+            result = dict(self.attributes)
+            truth = dict(zip(conditions, bits))
+            for rule in self.rules:
+                rule.apply(truth, result)
+            table[bits] = result
+        fields = frozenset(condition.field for condition in conditions if not condition.context)
+        return CompiledBranch([condition.compile() for condition in conditions], table, fields)
+
+
+class CompiledBranch:
+    def __init__(self, tests, table, fields=frozenset()):
+        self.tests = tests
+        self.table = table
+        # Row fields the conditions read.
+        self.fields = fields
+
+    def classify(self, row, context):
+        return dict(self.table[tuple(bool(test(row, context)) for test in self.tests)])
+
+
+class ClassificationEngine:
+    """
+    Classify products by name with ``branches`` (name -> Branch), falling
+    back to ``default``. Compiles the rules once, on construction.
+    """
+
+    def __init__(self, branches, default):
+        self.dispatch = {name: branch.compile() for name, branch in branches.items()}
+        self.default = default.compile()
+
+    @staticmethod
+    def batch_context(now=None):
+        now = now or datetime.datetime.now()
+        return {'now': now, 'weekday': now.weekday()}
+
+    def classify_row(self, row, context):
+        return self.dispatch.get(row['name'], self.default).classify(row, context)
+
+    def classify(self, product, now=None):
+        """Classify a single Product instance (reads ``product.category`` only if its rules do)."""
+        branch = self.dispatch.get(product.name, self.default)
+        return branch.classify(product_row(product, branch.fields), self.batch_context(now))
+
+    def classify_rows(self, rows, now=None):
+        """Yield ``(row, result)`` for an iterable of values() rows, with one "now" for all of them."""
+        context = self.batch_context(now)
+        classify_row = self.classify_row
+        for row in rows:
+            yield row, classify_row(row, context)
+
+    def classify_queryset(self, queryset=None, now=None, chunk_size=CLASSIFICATION_CHUNK_SIZE):
+        """
+        Yield ``(product_id, result)`` for every product in ``queryset``
+        (all products by default) from one streamed values() query.
+        """
+        if queryset is None:
+            queryset = Product.objects.all()
+        rows = queryset.order_by('pk').values(*CLASSIFICATION_FIELDS).iterator(chunk_size=chunk_size)
+        for row, result in self.classify_rows(rows, now):
+            yield row['id'], result
+
+
+def product_row(product, fields=CLASSIFICATION_FIELDS):
+    """A Product as a values() row; the category is only loaded when ``fields`` include its name."""
+    row = {
+        'id': product.pk,
+        'name': product.name,
+        'price': product.price,
+        'stock': product.stock,
+        'is_active': product.is_active,
+    }
+    if 'category__name' in fields:
+        row['category__name'] = product.category.name
+    return row
+
+
+LAPTOP_RULES = Rule(
+    Condition('price', 'gt', 500),
+    then={'tier': 'premium'},
+    otherwise={'tier': 'basic'},
+    children=[Rule(
+        Condition('stock', 'gt', 10),
+        then={'availability': 'high'},
+        otherwise={'availability': 'low'},
+        children=[Rule(
+            Condition('category__name', 'eq', 'Electronics'),
+            then={'promotion_eligible': True},
+            otherwise={'promotion_eligible': False},
+            children=[Rule(
+                Condition('weekday', 'lt', 5, context=True),
+                then={'business_hours': True},
+                otherwise={'business_hours': False, 'final_status': 'weekend'},
+                children=[Rule(
+                    Condition('is_active', 'truthy', True),
+                    then={'final_status': 'available'},
+                    otherwise={'final_status': 'inactive'},
+                )],
+            )],
+        )],
+    )],
+)
+
+PRODUCT_CLASSIFICATION = ClassificationEngine(
+    {
+        'Laptop': Branch({'category_type': 'electronics', 'priority': 1}, [LAPTOP_RULES]),
+        'Mouse': Branch({'category_type': 'accessories', 'priority': 2}),
+        'Keyboard': Branch({'category_type': 'accessories', 'priority': 2}),
+    },
+    default=Branch({'category_type': 'other', 'priority': 3}),
+)
+
+
+def classify_products(queryset=None, now=None, chunk_size=CLASSIFICATION_CHUNK_SIZE):
+    return PRODUCT_CLASSIFICATION.classify_queryset(queryset, now, chunk_size)
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Product, RelatedProduct
+
+
+class ProductValidators:
+    """Strong ETag and Last-Modified for one representation of a product."""
+
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_response(self, request):
+        """Return a 304/412 response if the client's copy is current, else None."""
+        return get_conditional_response(
+            request, etag=self.etag, last_modified=int(self.last_modified.timestamp())
+        )
+
+    def apply(self, response):
+        response.headers['ETag'] = self.etag
+        response.headers['Last-Modified'] = http_date(self.last_modified.timestamp())
+        return response
+
+
+def _related_products_stamp():
+    # This product's precomputed related list (at most RELATED_PRODUCTS_LIMIT
+    # rows): rebuilds recreate its rows with new ids, and edits of the
+    # listed products move their updated_at.
+    entries = RelatedProduct.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    return {
+        'related_updated_at': Subquery(entries.annotate(latest=Max('related__updated_at')).values('latest')),
+        'related_last_entry': Subquery(entries.annotate(last=Max('pk')).values('last')),
+        'related_count': Subquery(entries.annotate(total=Count('pk')).values('total')),
+    }
+
+
+def _validators_query(product_id, include_related, using=None):
+    products = Product.objects.using(using).filter(id=product_id, is_active=True)
+    fields = ['updated_at', 'category__updated_at']
+    if include_related:
+        products = products.annotate(**_related_products_stamp())
+        fields += ['related_updated_at', 'related_last_entry', 'related_count']
+    return products.values(*fields), fields
+
+
+def _build_validators(row, product_id, representation, fields):
+    if row is None:
+        return None
+
+    timestamps = [row['updated_at'], row['category__updated_at']]
+    if row.get('related_updated_at'):
+        timestamps.append(row['related_updated_at'])
+
+    parts = [representation, str(product_id)] + [str(row[field]) for field in fields]
+    digest = hashlib.sha256(':'.join(parts).encode()).hexdigest()[:32]
+    return ProductValidators(quote_etag(digest), max(timestamps))
+
+
+def get_product_validators(product_id, representation, include_related=False, using=None):
+    """
+    Build validators from a single ``values()`` query, before the product is
+    loaded or rendered. Returns None when there is no active product.
+    """
+    rows, fields = _validators_query(product_id, include_related, using)
+    return _build_validators(rows.first(), product_id, representation, fields)
+
+
+async def aget_product_validators(product_id, representation, include_related=False, using=None):
+    rows, fields = _validators_query(product_id, include_related, using)
+    return _build_validators(await rows.afirst(), product_id, representation, fields)
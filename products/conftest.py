@@ -0,0 +1,22 @@
+import pytest
+from django.core.cache import caches
+
+from products import ledger
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Database changes roll back between tests but cached fragments and
+    # version tokens would not, so start every test from empty caches.
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def discard_buffered_stock_movements():
+    # Likewise for ledger rows still buffered (with their flush timer)
+    # once a test's products are gone.
+    yield
+    if ledger._buffer is not None:
+        ledger._buffer.clear()
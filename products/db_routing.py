@@ -0,0 +1,252 @@
+"""
+Primary/replica database routing.
+
+Reads of the apps in DATABASE_REPLICA_APPS go to the DATABASE_REPLICAS
+aliases, round-robin, but only while a request is being handled by
+replica_pinning_middleware. Management commands, other code running
+outside a request and anything inside a transaction on the primary keep
+reading from the primary.
+
+A request is pinned to the primary when it is not a safe method, when it
+writes, or when it carries the pin cookie set after an earlier write, so
+clients read their own writes for DATABASE_PRIMARY_PIN_SECONDS.
+
+Each process checks a replica's reported lag at most once every
+DATABASE_REPLICA_LAG_CHECK_INTERVAL seconds and skips replicas lagging
+more than DATABASE_REPLICA_MAX_LAG seconds (or failing the check). With
+no healthy replica, reads fall back to the primary. Async views route on
+the event loop, where the check can't query: there a stale check is
+refreshed on a background thread and the last result (unhealthy before
+the first one) is used meanwhile.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+
+import structlog
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.decorators import sync_and_async_middleware
+
+logger = structlog.get_logger(__name__)
+
+PIN_COOKIE = 'db_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Logs written while serving reads and never read back by the visitor
+# (product_detail records views), so writing them does not pin.
+UNPINNED_MODELS = {'products.productinteraction'}
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def replica_apps():
+    return getattr(settings, 'DATABASE_REPLICA_APPS', ['products'])
+
+
+def sqlite_lag(primary_path, replica_path, now=None):
+    """
+    How long a copied SQLite replica file has been missing writes made to
+    the primary file, in seconds: 0 while it is at least as new, else the
+    replica copy's age, which keeps growing until the copy is refreshed.
+    """
+    replica_mtime = os.path.getmtime(replica_path)
+    if os.path.getmtime(primary_path) <= replica_mtime:
+        return 0.0
+    return max(0.0, (time.time() if now is None else now) - replica_mtime)
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` trails the primary; raises DatabaseError/OSError when it can't tell."""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    if connection.vendor == 'sqlite':
+        return sqlite_lag(
+            connections[DEFAULT_DB_ALIAS].settings_dict['NAME'], connection.settings_dict['NAME']
+        )
+    return 0.0
+
+
+class ReplicaLagMonitor:
+    def __init__(self, measure=replica_lag, clock=time.monotonic):
+        self.measure = measure
+        self.clock = clock
+        self._checks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        now = self.clock()
+        interval = getattr(settings, 'DATABASE_REPLICA_LAG_CHECK_INTERVAL', 5)
+        checked = self._checks.get(alias)
+        if checked is not None and now - checked[0] < interval:
+            return checked[1]
+
+        if _on_event_loop():
+            self._refresh_in_background(alias)
+            return checked is not None and checked[1]
+
+        with self._lock:
+            checked = self._checks.get(alias)
+            if checked is None or now - checked[0] >= interval:
+                healthy = self._check(alias)
+                checked = self._checks[alias] = (now, healthy)
+        return checked[1]
+
+    def _refresh_in_background(self, alias):
+        with self._lock:
+            if alias in self._refreshing:
+                return
+            self._refreshing.add(alias)
+
+        def refresh():
+            try:
+                healthy = self._check(alias)
+                with self._lock:
+                    self._checks[alias] = (self.clock(), healthy)
+            finally:
+                # Connections opened here belong to this thread only.
+                connections.close_all()
+                with self._lock:
+                    self._refreshing.discard(alias)
+
+        threading.Thread(target=refresh, name=f'replica-lag-{alias}', daemon=True).start()
+
+    def _check(self, alias):
+        try:
+            lag = self.measure(alias)
+        except (DatabaseError, OSError) as exc:
+            logger.warning("db_replica_check_failed", alias=alias, error=str(exc))
+            return False
+        max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 5)
+        if lag > max_lag:
+            logger.warning("db_replica_lagging", alias=alias, lag=lag, max_lag=max_lag)
+            return False
+        return True
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class RequestRouting:
+    """Routing state of the request being handled."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_request_routing = contextvars.ContextVar('request_routing', default=None)
+
+
+@contextlib.contextmanager
+def request_routing(pinned=False):
+    state = RequestRouting(pinned)
+    token = _request_routing.set(state)
+    try:
+        yield state
+    finally:
+        _request_routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def __init__(self, monitor=None):
+        self.monitor = monitor or ReplicaLagMonitor()
+        self._turns = itertools.count()
+
+    def db_for_read(self, model, **hints):
+        state = _request_routing.get()
+        if (
+            state is None
+            or state.pinned
+            or model._meta.app_label not in replica_apps()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+
+        replicas = replica_aliases()
+        if not replicas:
+            return None
+        start = next(self._turns)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.monitor.is_healthy(alias):
+                return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Always the primary: returning None would let Django save an
+        # instance on the replica it was read from.
+        state = _request_routing.get()
+        if (
+            state is not None
+            and model._meta.app_label in replica_apps()
+            and model._meta.label_lower not in UNPINNED_MODELS
+        ):
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def _begin(request):
+    return request_routing(pinned=request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES)
+
+
+def _finish(request, response, state):
+    if state.wrote:
+        response.set_cookie(
+            PIN_COOKIE, '1',
+            max_age=getattr(settings, 'DATABASE_PRIMARY_PIN_SECONDS', 10),
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with _begin(request) as state:
+                response = await get_response(request)
+            return _finish(request, response, state)
+    else:
+        def middleware(request):
+            with _begin(request) as state:
+                response = get_response(request)
+            return _finish(request, response, state)
+    return middleware
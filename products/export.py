@@ -0,0 +1,104 @@
+import csv
+import datetime
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Product
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_FIELDS = ('id', 'name', 'description', 'price', 'stock', 'status', 'category', 'updated_at')
+EXPORT_CHUNK_SIZE = 2000
+
+
+def parse_updated_since(value):
+    """Parse an ISO date or datetime; naive values are taken as UTC."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid updated_since value: {value!r}")
+        parsed = datetime.datetime.combine(date, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.UTC)
+    return parsed
+
+
+def get_export_queryset(updated_since=None):
+    products = Product.objects.filter(is_active=True).select_related('category').order_by('pk')
+    if updated_since is not None:
+        products = products.filter(updated_at__gte=updated_since)
+    return products
+
+
+def export_row(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'description': product.description,
+        'price': str(product.price),
+        'stock': product.stock,
+        'status': product.get_status(),
+        'category': product.category.name,
+        'updated_at': product.updated_at.isoformat(),
+    }
+
+
+def _rows(queryset, chunk_size):
+    # iterator() streams from a server-side cursor where the backend has one,
+    # so only chunk_size model instances are alive at any time.
+    for product in queryset.iterator(chunk_size=chunk_size):
+        yield export_row(product)
+
+
+def _batched(lines, size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch).encode()
+            batch = []
+    if batch:
+        yield ''.join(batch).encode()
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    lines = (json.dumps(row, separators=(',', ':')) + '\n' for row in _rows(queryset, chunk_size))
+    return _batched(lines, chunk_size)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+    header = writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    lines = (writer.writerow(row) for row in _rows(queryset, chunk_size))
+    yield header.encode()
+    yield from _batched(lines, chunk_size)
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_catalog(export_format='ndjson', updated_since=None, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format!r}")
+
+    queryset = get_export_queryset(updated_since)
+    serializer = iter_csv if export_format == 'csv' else iter_ndjson
+    chunks = serializer(queryset, chunk_size)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,57 @@
+"""
+Cursor feeds over recently created products.
+
+recent_products_page() walks the last ``days`` of products newest first;
+new_products_since() returns what was created after a ``since`` cursor,
+oldest first, so incremental consumers only ever read new rows. Both
+seek on (created_at, id) through product_active_created_idx.
+
+created_at is stamped when the row is saved, not when it commits, so a
+product from a long transaction can land behind a cursor already handed
+out; consumers that cannot miss rows should resync from the first page.
+"""
+
+from .models import Product
+from .pagination import KeysetPaginator
+from .utils import ProductUtils
+
+RECENT_PRODUCTS_ORDERING = ('-created_at', '-id')
+NEW_PRODUCTS_ORDERING = ('created_at', 'id')
+RECENT_PRODUCTS_DAYS = 30
+FEED_LIMIT = 20
+
+
+def recent_products_paginator(limit=FEED_LIMIT, days=RECENT_PRODUCTS_DAYS):
+    products = ProductUtils.get_recent_products(days).select_related('category')
+    return KeysetPaginator(products, limit, RECENT_PRODUCTS_ORDERING)
+
+
+def new_products_paginator(limit=FEED_LIMIT):
+    products = Product.objects.filter(is_active=True).select_related('category')
+    return KeysetPaginator(products, limit, NEW_PRODUCTS_ORDERING)
+
+
+def recent_products_page(cursor=None, limit=FEED_LIMIT, days=RECENT_PRODUCTS_DAYS):
+    """
+    One page of the recent-products feed and, on the first page, a
+    ``since`` cursor pointing at its newest product (None otherwise).
+    """
+    page = recent_products_paginator(limit, days).get_page(cursor)
+
+    since_cursor = None
+    if cursor is None and page.object_list:
+        since_cursor = new_products_paginator(limit).encode_cursor(page[0], 'next')
+    return page, since_cursor
+
+
+def new_products_since(since_cursor, limit=FEED_LIMIT):
+    """
+    Up to ``limit`` products created after ``since_cursor``, oldest first,
+    and the cursor to poll with next (unchanged when nothing is new).
+    Raises InvalidCursor for tokens not issued by these feeds.
+    """
+    paginator = new_products_paginator(limit)
+    page = paginator.get_page(since_cursor)
+    if page.object_list:
+        since_cursor = paginator.encode_cursor(page[-1], 'next')
+    return page, since_cursor
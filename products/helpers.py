@@ -1,5 +1,6 @@
-import datetime
-from decimal import Decimal
+from .classification import PRODUCT_CLASSIFICATION
+from .money import Money
+from .recommendations import recommend_products
 
 
 class ProductHelper:
@@ -7,82 +8,33 @@ def __init__(self):
         self.data = {}
 
     def process_product_data(self, product):
-        result = {}
-
-        if product.name == "Laptop":
-            result['category_type'] = "electronics"
-            result['priority'] = 1
-            if product.price > 500:
-                result['tier'] = "premium"
-                if product.stock > 10:
-                    result['availability'] = "high"
-                    if product.category.name == "Electronics":
-                        result['promotion_eligible'] = True
-                        if datetime.datetime.now().weekday() < 5:
-                            result['business_hours'] = True
-                            if product.is_active:
-                                result['final_status'] = "available"
-                            else:
-                                result['final_status'] = "inactive"
-                        else:
-                            result['business_hours'] = False
-                            result['final_status'] = "weekend"
-                    else:
-                        result['promotion_eligible'] = False
-                else:
-                    result['availability'] = "low"
-            else:
-                result['tier'] = "basic"
-        elif product.name == "Mouse":
-            result['category_type'] = "accessories"
-            result['priority'] = 2
-        elif product.name == "Keyboard":
-            result['category_type'] = "accessories"
-            result['priority'] = 2
-        else:
-            result['category_type'] = "other"
-            result['priority'] = 3
-
-        return result
+        return PRODUCT_CLASSIFICATION.classify(product)
 
     def calculate_complex_price(self, base_price, discount=0, tax=0, shipping=0, handling=0, insurance=0):
-        price = base_price
+        """
+        Price after ``discount`` and ``tax`` (percentages) plus the flat
+        charges, as a two-place Decimal. Runs on integer cents: the discount
+        and the tax are each rounded to a cent (half-even) when applied.
+        """
+        price = Money.from_decimal(base_price)
 
         if discount > 0:
-            price = price - (price * discount / 100)
+            price = price.apply_discount(discount)
         if tax > 0:
-            price = price + (price * tax / 100)
-        if shipping > 0:
-            price = price + shipping
-        if handling > 0:
-            price = price + handling
-        if insurance > 0:
-            price = price + insurance
-
-        return price
-
-
-def get_product_recommendation(user_history, current_product):
-    recommendations = []
-
-    if len(user_history) == 0:
-        return ["laptop", "mouse", "keyboard"]
-    elif len(user_history) == 1:
-        if "laptop" in user_history:
-            return ["mouse", "keyboard", "monitor"]
-        elif "mouse" in user_history:
-            return ["keyboard", "laptop", "mousepad"]
-        else:
-            return ["laptop", "mouse"]
-    elif len(user_history) == 2:
-        if "laptop" in user_history and "mouse" in user_history:
-            return ["keyboard", "monitor", "speakers"]
-        elif "laptop" in user_history and "keyboard" in user_history:
-            return ["mouse", "monitor", "webcam"]
-        else:
-            return ["laptop"]
-    else:
-        return ["monitor", "speakers", "webcam", "printer"]
+            price = price + price.percentage(tax)
+        for charge in (shipping, handling, insurance):
+            if charge > 0:
+                price = price + Money.from_decimal(charge)
+
+        return price.to_decimal()
+
+
+def get_product_recommendation(user_history, current_product=None):
+    """Ids of products to recommend after ``user_history`` (product ids) and ``current_product``."""
+    history = list(user_history)
+    if current_product is not None:
+        history.append(getattr(current_product, 'pk', current_product))
+    return [product.pk for product in recommend_products(history)]
 
 
 def unused_function_1():
@@ -109,85 +61,13 @@ def old_method(self, data):
         return temp_var
 
 
-# Duplicate product data processing functions - intentionally duplicated for SonarQube warnings
+# Former copies of ProductHelper.process_product_data, kept for their callers.
 def process_laptop_product_info(product):
-    result = {}
-
-    if product.name == "Laptop":
-        result['category_type'] = "electronics"
-        result['priority'] = 1
-        if product.price > 500:
-            result['tier'] = "premium"
-            if product.stock > 10:
-                result['availability'] = "high"
-                if product.category.name == "Electronics":
-                    result['promotion_eligible'] = True
-                    if datetime.datetime.now().weekday() < 5:
-                        result['business_hours'] = True
-                        if product.is_active:
-                            result['final_status'] = "available"
-                        else:
-                            result['final_status'] = "inactive"
-                    else:
-                        result['business_hours'] = False
-                        result['final_status'] = "weekend"
-                else:
-                    result['promotion_eligible'] = False
-            else:
-                result['availability'] = "low"
-        else:
-            result['tier'] = "basic"
-    elif product.name == "Mouse":
-        result['category_type'] = "accessories"
-        result['priority'] = 2
-    elif product.name == "Keyboard":
-        result['category_type'] = "accessories"
-        result['priority'] = 2
-    else:
-        result['category_type'] = "other"
-        result['priority'] = 3
-
-    return result
+    return PRODUCT_CLASSIFICATION.classify(product)
 
 
 def analyze_product_details(product):
-    result = {}
-
-    if product.name == "Laptop":
-        result['category_type'] = "electronics"
-        result['priority'] = 1
-        if product.price > 500:
-            result['tier'] = "premium"
-            if product.stock > 10:
-                result['availability'] = "high"
-                if product.category.name == "Electronics":
-                    result['promotion_eligible'] = True
-                    if datetime.datetime.now().weekday() < 5:
-                        result['business_hours'] = True
-                        if product.is_active:
-                            result['final_status'] = "available"
-                        else:
-                            result['final_status'] = "inactive"
-                    else:
-                        result['business_hours'] = False
-                        result['final_status'] = "weekend"
-                else:
-                    result['promotion_eligible'] = False
-            else:
-                result['availability'] = "low"
-        else:
-            result['tier'] = "basic"
-    elif product.name == "Mouse":
-        result['category_type'] = "accessories"
-        result['priority'] = 2
-    elif product.name == "Keyboard":
-        result['category_type'] = "accessories"
-        result['priority'] = 2
-    else:
-        result['category_type'] = "other"
-        result['priority'] = 3
-
-    return result
+    return PRODUCT_CLASSIFICATION.classify(product)
 
 
 # Duplicate complex price calculation functions
@@ -225,48 +105,10 @@ def calculate_total_cost_with_fees(base_price, discount=0, tax=0, shipping=0, ha
     return price
 
 
-# Duplicate recommendation functions
-def get_user_product_suggestions(user_history, current_product):
-    recommendations = []
-
-    if len(user_history) == 0:
-        return ["laptop", "mouse", "keyboard"]
-    elif len(user_history) == 1:
-        if "laptop" in user_history:
-            return ["mouse", "keyboard", "monitor"]
-        elif "mouse" in user_history:
-            return ["keyboard", "laptop", "mousepad"]
-        else:
-            return ["laptop", "mouse"]
-    elif len(user_history) == 2:
-        if "laptop" in user_history and "mouse" in user_history:
-            return ["keyboard", "monitor", "speakers"]
-        elif "laptop" in user_history and "keyboard" in user_history:
-            return ["mouse", "monitor", "webcam"]
-        else:
-            return ["laptop"]
-    else:
-        return ["monitor", "speakers", "webcam", "printer"]
-
-
-def generate_product_recommendations(user_history, current_product):
-    recommendations = []
-
-    if len(user_history) == 0:
-        return ["laptop", "mouse", "keyboard"]
-    elif len(user_history) == 1:
-        if "laptop" in user_history:
-            return ["mouse", "keyboard", "monitor"]
-        elif "mouse" in user_history:
-            return ["keyboard", "laptop", "mousepad"]
-        else:
-            return ["laptop", "mouse"]
-    elif len(user_history) == 2:
-        if "laptop" in user_history and "mouse" in user_history:
-            return ["keyboard", "monitor", "speakers"]
-        elif "laptop" in user_history and "keyboard" in user_history:
-            return ["mouse", "monitor", "webcam"]
-        else:
-            return ["laptop"]
-    else:
-        return ["monitor", "speakers", "webcam", "printer"]
\ No newline at end of file
+# Former copies of get_product_recommendation, kept for their callers.
+def get_user_product_suggestions(user_history, current_product=None):
+    return get_product_recommendation(user_history, current_product)
+
+
+def generate_product_recommendations(user_history, current_product=None):
+    return get_product_recommendation(user_history, current_product)
@@ -0,0 +1,122 @@
+"""
+Race-free stock changes.
+
+Stock moves with ``UPDATE ... SET stock = stock + n`` (guarded by
+``stock >= n`` when removing) instead of a read-modify-write on a model
+instance, so concurrent workers can neither lose updates nor oversell.
+Queryset updates bypass the Product signals; stock_changed() does the
+cache work they would have done.
+"""
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .cache import (
+    bump_fragment_versions,
+    category_products_fragment,
+    invalidate_products,
+)
+from .ledger import record_stock_movements
+from .low_stock import sync_low_stock
+from .models import Product
+
+STOCK_CHANGED = 'ok'
+INSUFFICIENT_STOCK = 'insufficient_stock'
+PRODUCT_NOT_FOUND = 'not_found'
+
+
+class InsufficientStock(ValueError):
+    pass
+
+
+def stock_changed(products):
+    """
+    Invalidate caches and re-check low-stock membership for
+    ``(product_id, category_id)`` pairs whose stock moved.
+    """
+    products = list(products)
+    if not products:
+        return
+    product_ids = [product_id for product_id, _ in products]
+    invalidate_products(product_ids)
+    bump_fragment_versions(sorted({category_products_fragment(category_id) for _, category_id in products}))
+    sync_low_stock(product_ids)
+
+
+def change_stock(product, quantity):
+    """
+    Atomically add ``quantity`` units (remove them when negative) and
+    refresh ``product.stock``. Raises InsufficientStock, leaving the row
+    untouched, if a removal would take stock below the reserved units.
+    """
+    if not quantity:
+        raise ValueError("Quantity must not be zero")
+
+    products = Product.objects.filter(pk=product.pk)
+    if quantity < 0:
+        # Reserved units (products.reservations) cannot be removed.
+        products = products.alias(available=F('stock') - F('reserved_stock')).filter(available__gte=-quantity)
+    with transaction.atomic():
+        if not products.update(stock=F('stock') + quantity, updated_at=timezone.now()):
+            raise InsufficientStock("Insufficient stock")
+        stock_changed([(product.pk, product.category_id)])
+        record_stock_movements([(product.pk, quantity)])
+    product.refresh_from_db(fields=['stock', 'reserved_stock', 'updated_at'])
+
+
+def apply_stock_changes(changes):
+    """
+    Apply many ``(product or product_id, quantity)`` changes in one
+    transaction and report each one as ``{'product_id', 'quantity',
+    'status'}``.
+
+    Changes are checked in order against the running stock, so a removal
+    that would oversell is rejected on its own while the rest still apply.
+    The affected rows are locked once, then written with a single UPDATE.
+    """
+    changes = [
+        (getattr(product, 'pk', product), quantity) for product, quantity in changes
+    ]
+    if any(not quantity for _, quantity in changes):
+        raise ValueError("Quantity must not be zero")
+
+    results = []
+    with transaction.atomic():
+        # Running available (unreserved) stock and category per product.
+        rows = {
+            pk: [stock - reserved_stock, category_id]
+            for pk, stock, reserved_stock, category_id in Product.objects.filter(pk__in={pk for pk, _ in changes})
+            .select_for_update()
+            .values_list('pk', 'stock', 'reserved_stock', 'category_id')
+        }
+
+        deltas = {}
+        for product_id, quantity in changes:
+            row = rows.get(product_id)
+            if row is None:
+                status = PRODUCT_NOT_FOUND
+            elif row[0] + quantity < 0:
+                status = INSUFFICIENT_STOCK
+            else:
+                row[0] += quantity
+                deltas[product_id] = deltas.get(product_id, 0) + quantity
+                status = STOCK_CHANGED
+            results.append({'product_id': product_id, 'quantity': quantity, 'status': status})
+
+        deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+        if deltas:
+            Product.objects.filter(pk__in=deltas).update(
+                stock=F('stock') + Case(
+                    *(When(pk=product_id, then=Value(delta)) for product_id, delta in deltas.items()),
+                    default=Value(0),
+                ),
+                updated_at=timezone.now(),
+            )
+            stock_changed((product_id, rows[product_id][1]) for product_id in deltas)
+            record_stock_movements(
+                (result['product_id'], result['quantity'])
+                for result in results
+                if result['status'] == STOCK_CHANGED
+            )
+    return results
@@ -0,0 +1,187 @@
+"""
+Buffered writes to the StockMovement ledger.
+
+Movements are handed to the buffer only once the transaction that moved
+the stock commits, so rolled-back changes never reach the ledger. The
+buffer then writes them with one bulk_create when it holds
+PRODUCTS_STOCK_LEDGER_BUFFER_SIZE rows, from a background timer once its
+oldest row is PRODUCTS_STOCK_LEDGER_MAX_AGE seconds old (so an idle
+worker does not sit on them), or at process exit. Set the buffer size to
+1 to write every movement through immediately.
+
+A failed write does not lose the batch: rows that can never be written
+(their product was deleted since, or a value the database rejects) are
+logged and dropped one by one, and after any other database error the
+rows go back into the buffer for the next flush. While the database stays
+down the buffer keeps at most PRODUCTS_STOCK_LEDGER_MAX_PENDING rows; the
+oldest ones beyond that are logged as dropped, so they can be replayed
+from the logs.
+"""
+
+import atexit
+import threading
+
+import structlog
+from django.conf import settings
+from django.db import DatabaseError, DataError, IntegrityError, connection, transaction
+
+from .models import StockMovement
+
+logger = structlog.get_logger(__name__)
+
+# Errors no retry can fix: the row itself is rejected.
+REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+
+class StockMovementBuffer:
+    def __init__(self, max_size=500, max_age=5.0, max_pending=10000):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_pending = max(max_pending, max_size)
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, movements):
+        movements = list(movements)
+        if not movements:
+            return
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.add(movements))
+        else:
+            self.add(movements)
+
+    def add(self, movements):
+        with self._lock:
+            self._pending.extend(movements)
+            due = len(self._pending) >= self.max_size
+            if not due:
+                self._schedule()
+        if due:
+            self.flush()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.max_age, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's own connection.
+            connection.close()
+
+    def flush(self):
+        """Write the buffered movements; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._cancel_timer()
+        if not pending:
+            return 0
+        try:
+            StockMovement.objects.bulk_create(pending, batch_size=self.max_size)
+        except REJECTED_ROW_ERRORS:
+            return self._write_each(pending)
+        except DatabaseError as exc:
+            logger.warning("stock_ledger_flush_failed", movements=len(pending), error=str(exc))
+            self._restore(pending)
+            return 0
+        return len(pending)
+
+    def _write_each(self, pending):
+        written, failed = 0, []
+        for movement in pending:
+            _reset(movement)
+            try:
+                with transaction.atomic():
+                    movement.save(force_insert=True)
+            except REJECTED_ROW_ERRORS as exc:
+                _log_dropped(movement, error=str(exc))
+            except DatabaseError as exc:
+                logger.warning("stock_ledger_flush_failed", movements=1, error=str(exc))
+                failed.append(movement)
+            else:
+                written += 1
+        if failed:
+            self._restore(failed)
+        return written
+
+    def _restore(self, movements):
+        for movement in movements:
+            _reset(movement)
+        with self._lock:
+            self._pending[:0] = movements
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                dropped, self._pending = self._pending[:overflow], self._pending[overflow:]
+            else:
+                dropped = []
+            self._schedule()
+        if dropped:
+            logger.warning("stock_ledger_overflow", dropped=len(dropped), max_pending=self.max_pending)
+            for movement in dropped:
+                _log_dropped(movement, error="ledger buffer full")
+
+    def clear(self):
+        """Drop the buffered movements without writing them."""
+        with self._lock:
+            self._pending = []
+            self._cancel_timer()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def _log_dropped(movement, error):
+    logger.error(
+        "stock_movement_dropped",
+        product_id=movement.product_id,
+        quantity=movement.quantity,
+        created_at=movement.created_at.isoformat(),
+        error=error,
+    )
+
+
+def _reset(movement):
+    # A rolled-back bulk_create may already have assigned primary keys.
+    movement.pk = None
+    movement._state.adding = True
+
+
+_buffer = None
+
+
+def get_stock_movement_buffer():
+    global _buffer
+    if _buffer is None:
+        _buffer = StockMovementBuffer(
+            max_size=getattr(settings, 'PRODUCTS_STOCK_LEDGER_BUFFER_SIZE', 500),
+            max_age=getattr(settings, 'PRODUCTS_STOCK_LEDGER_MAX_AGE', 5.0),
+            max_pending=getattr(settings, 'PRODUCTS_STOCK_LEDGER_MAX_PENDING', 10000),
+        )
+        atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_stock_movements(changes):
+    """Queue ``(product_id, quantity)`` pairs for the ledger."""
+    get_stock_movement_buffer().record(
+        StockMovement(product_id=product_id, quantity=quantity) for product_id, quantity in changes
+    )
+
+
+def get_stock_history(product_id, since=None, until=None):
+    """Ledger rows of one product, newest first, optionally within ``[since, until)``."""
+    movements = StockMovement.objects.filter(product_id=product_id)
+    if since is not None:
+        movements = movements.filter(created_at__gte=since)
+    if until is not None:
+        movements = movements.filter(created_at__lt=until)
+    return movements.order_by('-created_at', '-id')
@@ -0,0 +1,88 @@
+"""
+Maintained low-stock set and its change feed.
+
+A product is low on stock while it is active and its stock is at or
+below its category's low_stock_threshold (settings.PRODUCTS_LOW_STOCK_THRESHOLD
+when unset). Membership lives in LowStockProduct and is re-checked only
+for products whose stock, activity or category threshold just changed,
+each flip appending a LowStockEvent. Pollers read the set, or follow the
+events after the last id they saw, instead of rescanning the catalog.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import LowStockEvent, LowStockProduct, Product
+
+LOW_STOCK_FEED_LIMIT = 100
+
+
+def default_low_stock_threshold():
+    return getattr(settings, 'PRODUCTS_LOW_STOCK_THRESHOLD', 10)
+
+
+def _with_low_stock_state(products):
+    return products.annotate(
+        threshold=Coalesce('category__low_stock_threshold', Value(default_low_stock_threshold())),
+        listed=Exists(LowStockProduct.objects.filter(product=OuterRef('pk'))),
+    )
+
+
+def sync_low_stock(products=None):
+    """
+    Bring the low-stock set up to date for ``products`` (ids or a Product
+    queryset; everything when None) and record the flips. Only mismatched
+    rows leave the database, so the cost follows the changes.
+    """
+    if products is None:
+        products = Product.objects.all()
+    elif not hasattr(products, 'filter'):
+        products = Product.objects.filter(pk__in=list(products))
+
+    is_low = Q(is_active=True, stock__lte=F('threshold'))
+    # Joins the caller's transaction (stock updates call this) without a savepoint.
+    with transaction.atomic(savepoint=False):
+        mismatched = list(
+            _with_low_stock_state(products)
+            .filter((is_low & Q(listed=False)) | (~is_low & Q(listed=True)))
+            .select_for_update(of=('self',))
+            .values_list('pk', 'stock', 'threshold', 'listed')
+        )
+        if not mismatched:
+            return []
+
+        now = timezone.now()
+        events = [
+            LowStockEvent(
+                product_id=pk,
+                kind=LowStockEvent.LEFT if listed else LowStockEvent.ENTERED,
+                stock=stock,
+                threshold=threshold,
+                created_at=now,
+            )
+            for pk, stock, threshold, listed in mismatched
+        ]
+        entered = [event.product_id for event in events if event.kind == LowStockEvent.ENTERED]
+        left = [event.product_id for event in events if event.kind == LowStockEvent.LEFT]
+        if left:
+            LowStockProduct.objects.filter(product_id__in=left).delete()
+        if entered:
+            LowStockProduct.objects.bulk_create(
+                [LowStockProduct(product_id=pk, since=now) for pk in entered], ignore_conflicts=True
+            )
+        return LowStockEvent.objects.bulk_create(events)
+
+
+def record_low_stock_removal(product_id, stock, threshold):
+    """A deleted product leaves the set; its row went with it, so only log it."""
+    LowStockEvent.objects.create(
+        product_id=product_id, kind=LowStockEvent.LEFT, stock=stock, threshold=threshold
+    )
+
+
+def get_low_stock_events(after=0, limit=LOW_STOCK_FEED_LIMIT):
+    """Events with an id above ``after``, oldest first; pass the last id seen as ``after``."""
+    return list(LowStockEvent.objects.filter(pk__gt=after).order_by('pk')[:limit])
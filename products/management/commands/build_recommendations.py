@@ -0,0 +1,27 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from products.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed product neighbours from recorded views and purchases."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=90,
+            help="Only count interactions from the last N days (0 counts all of them).",
+        )
+        parser.add_argument('--neighbours', type=int, help="Neighbours kept per product.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError("--days must not be negative")
+        since = None
+        if options['days']:
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+
+        built = build_recommendations(since, options['neighbours'])
+        self.stdout.write(self.style.SUCCESS(f"Neighbours built for {built} product(s)."))
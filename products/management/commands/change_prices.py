@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Product
+from products.pricing import PRICE_CHANGE_BATCH_SIZE, change_prices
+
+
+class Command(BaseCommand):
+    help = "Apply a percentage or absolute price change to products with set-based UPDATEs."
+
+    def add_arguments(self, parser):
+        change = parser.add_mutually_exclusive_group(required=True)
+        change.add_argument(
+            '--percent', help="Relative change, e.g. -15 for a 15%% discount.",
+        )
+        change.add_argument(
+            '--amount', help="Absolute change, e.g. -5.00.",
+        )
+        parser.add_argument(
+            '--category', type=int, action='append', dest='categories',
+            help="Only change products of this category (repeatable).",
+        )
+        parser.add_argument(
+            '--include-inactive', action='store_true',
+            help="Also change inactive products.",
+        )
+        parser.add_argument('--batch-size', type=int, default=PRICE_CHANGE_BATCH_SIZE)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report how many products would change without writing.",
+        )
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if not options['include_inactive']:
+            products = products.filter(is_active=True)
+        if options['categories']:
+            products = products.filter(category_id__in=options['categories'])
+
+        try:
+            result = change_prices(
+                products,
+                percent=options['percent'],
+                amount=options['amount'],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+        except (ValueError, ArithmeticError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        verb = "would be updated" if options['dry_run'] else "updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['updated']} product(s) {verb}, {result['skipped']} skipped (price out of range)."
+        ))
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from products.classification import CLASSIFICATION_CHUNK_SIZE, classify_products
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Classify the whole catalog and write one NDJSON line per product."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', type=int, action='append', dest='categories',
+            help="Only classify this category (repeatable).",
+        )
+        parser.add_argument('--chunk-size', type=int, default=CLASSIFICATION_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options['categories']:
+            products = products.filter(category_id__in=options['categories'])
+
+        for product_id, result in classify_products(products, chunk_size=options['chunk_size']):
+            self.stdout.write(json.dumps({'id': product_id, **result}, separators=(',', ':')))
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.export import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    export_catalog,
+    parse_updated_since,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream the active product catalog as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument(
+            '--updated-since',
+            help="Only export products updated at or after this ISO date/datetime.",
+        )
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output.")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help="File to write to; '-' (the default) writes to stdout.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            updated_since = (
+                parse_updated_since(options['updated_since']) if options['updated_since'] else None
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        chunks = export_catalog(
+            options['format'], updated_since, options['gzip'], options['chunk_size']
+        )
+
+        if options['output'] == '-':
+            self._write(chunks, sys.stdout.buffer)
+        else:
+            with open(options['output'], 'wb') as stream:
+                self._write(chunks, stream)
+
+    def _write(self, chunks, stream):
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
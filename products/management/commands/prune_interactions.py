@@ -0,0 +1,24 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from products.recommendations import prune_interactions
+
+
+class Command(BaseCommand):
+    help = "Delete recorded views and purchases older than the recommendations window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'PRODUCTS_INTERACTION_RETENTION_DAYS', 90),
+            help="Keep interactions from the last N days.",
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] <= 0:
+            raise CommandError("--days must be positive")
+
+        pruned = prune_interactions(timezone.now() - datetime.timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"{pruned} interaction(s) deleted."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.related import rebuild_related_products
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed related products of every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', type=int, action='append', dest='categories',
+            help="Only rebuild this category (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_related_products(options['categories'])
+        self.stdout.write(self.style.SUCCESS(f"{written} related product entries written."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from products.models import Category
+
+
+class Command(BaseCommand):
+    help = "Recompute Category.product_count from the active products of each category."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report drifted categories without writing the corrected counts.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            categories = Category.objects.annotate(
+                active_count=Count('products', filter=Q(products__is_active=True))
+            )
+
+            drifted = []
+            for category in categories:
+                if category.product_count != category.active_count:
+                    self.stdout.write(
+                        f"{category.name}: {category.product_count} -> {category.active_count}"
+                    )
+                    category.product_count = category.active_count
+                    drifted.append(category)
+
+            if drifted and not options['dry_run']:
+                Category.objects.bulk_update(drifted, ['product_count'])
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} category count(s) {verb}."))
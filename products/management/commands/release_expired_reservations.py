@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.reservations import SWEEP_BATCH_SIZE, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Release expired stock reservations in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SWEEP_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float,
+            help="Keep running, sweeping every INTERVAL seconds (for a worker process).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_reservations(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{released} expired reservation(s) released."))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+from django.db import NotSupportedError
+from django.db.migrations import AddIndex
+
+
+class AddIndexConcurrently(AddIndex):
+    """
+    AddIndex built with CREATE INDEX CONCURRENTLY on PostgreSQL, so the
+    products table stays writable while the index builds. Other backends
+    get a plain CREATE INDEX. Migrations using it must set ``atomic = False``.
+
+    Unlike django.contrib.postgres.operations.AddIndexConcurrently this
+    does not need psycopg, so the same migration runs on SQLite.
+    """
+
+    def describe(self):
+        return f"Concurrently create index {self.index.name} on model {self.model_name}"
+
+    def _concurrently(self, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return False
+        if schema_editor.connection.in_atomic_block:
+            raise NotSupportedError(
+                "The AddIndexConcurrently operation cannot be executed inside a transaction "
+                "(set atomic = False on the migration)."
+            )
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            if self._concurrently(schema_editor):
+                schema_editor.add_index(model, self.index, concurrently=True)
+            else:
+                schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            if self._concurrently(schema_editor):
+                schema_editor.remove_index(model, self.index, concurrently=True)
+            else:
+                schema_editor.remove_index(model, self.index)
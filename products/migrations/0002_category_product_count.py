@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_product_count(apps, schema_editor):
+    Category = apps.get_model("products", "Category")
+    Product = apps.get_model("products", "Product")
+    active_counts = (
+        Product.objects.filter(category=OuterRef("pk"), is_active=True)
+        .values("category")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Category.objects.update(product_count=Coalesce(Subquery(active_counts), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = (
+        ("products", "0001_initial"),
+    )
+
+    operations = (
+        migrations.AddField(
+            model_name="category",
+            name="product_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_product_count, migrations.RunPython.noop),
+    )
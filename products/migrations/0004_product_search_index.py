@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:10
+
+from django.db import migrations
+
+from products.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = (
+        ("products", "0003_product_keyset_indexes"),
+    )
+
+    operations = (
+        migrations.RunPython(install, uninstall),
+    )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+from products.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = (
+        ("products", "0006_related_product"),
+    )
+
+    operations = (
+        AddIndexConcurrently(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at", "-id"],
+                name="product_active_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["category", "-created_at", "-id"],
+                name="product_active_category_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["stock"],
+                name="product_active_stock_idx",
+            ),
+        ),
+    )
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_low_stock(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    LowStockProduct = apps.get_model("products", "LowStockProduct")
+    default = getattr(settings, "PRODUCTS_LOW_STOCK_THRESHOLD", 10)
+    # No category has an override yet, so the default applies everywhere.
+    low = Product.objects.filter(is_active=True, stock__lte=default).values_list(
+        "pk", flat=True
+    )
+    now = timezone.now()
+    LowStockProduct.objects.bulk_create(
+        [LowStockProduct(product_id=pk, since=now) for pk in low.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = (
+        ("products", "0009_stock_reservation"),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name="LowStockProduct",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="low_stock",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("since", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="low_stock_threshold",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="LowStockEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("entered", "Entered low stock"),
+                            ("left", "Left low stock"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("stock", models.PositiveIntegerField()),
+                ("threshold", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="low_stock_events",
+                        to="products.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(populate_low_stock, migrations.RunPython.noop),
+    )
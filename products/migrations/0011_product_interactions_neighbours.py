@@ -0,0 +1,73 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = (
+        ("products", "0010_low_stock_watchlist"),
+    )
+
+    operations = (
+        migrations.CreateModel(
+            name="ProductNeighbours",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="neighbours",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                ("built_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name_plural": "product neighbours",
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductInteraction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("visitor", models.CharField(max_length=64)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("view", "Viewed"), ("purchase", "Purchased")],
+                        default="view",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="interactions",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["visitor", "created_at"], name="interaction_visitor_idx"
+                    )
+                ],
+            },
+        ),
+    )
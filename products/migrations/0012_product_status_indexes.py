@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+from products.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = (
+        ("products", "0011_product_interactions_neighbours"),
+    )
+
+    operations = (
+        AddIndexConcurrently(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "is_active", "stock"],
+                name="product_category_status_idx",
+            ),
+        ),
+    )
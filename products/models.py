@@ -1,13 +1,62 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 import datetime
 
+from .money import MoneyAttribute
+
+
+class LoadedStateModel(models.Model):
+    """
+    Remembers the TRACKED_FIELDS values an instance was loaded, refreshed
+    or last saved with, so products.signals can tell what a save changes
+    without reading the row again.
+    """
+    TRACKED_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        names = None if fields is None else {*fields, *(f'{name}_id' for name in fields)}
+        self.remember_state(names)
+
+    def remember_state(self, names=None):
+        state = getattr(self, '_loaded_state', {})
+        for name in self.TRACKED_FIELDS:
+            # Deferred fields are left out rather than loaded.
+            if (names is None or name in names) and name in self.__dict__:
+                state[name] = self.__dict__[name]
+        self._loaded_state = state
+
+    def loaded_state(self):
+        """The remembered values, or None unless all of them are known."""
+        state = getattr(self, '_loaded_state', None)
+        if state is None or len(state) < len(self.TRACKED_FIELDS):
+            return None
+        return dict(state)
+
+
+class Category(LoadedStateModel):
+    TRACKED_FIELDS = ('name', 'low_stock_threshold')
 
-class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized count of active products, kept in sync by products.signals
+    # and repaired with the reconcile_category_counts management command.
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    # Overrides settings.PRODUCTS_LOW_STOCK_THRESHOLD for this category.
+    low_stock_threshold = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return self.name
@@ -16,7 +65,67 @@ class Meta:
         verbose_name_plural = "categories"
 
 
-class Product(models.Model):
+# Product statuses as query-string slug -> label, in get_status() precedence.
+LOW_STOCK_STATUS_LIMIT = 10
+PRODUCT_STATUSES = {
+    'inactive': 'Inactive',
+    'out_of_stock': 'Out of Stock',
+    'low_stock': 'Low Stock',
+    'in_stock': 'In Stock',
+}
+# Plain column conditions, so status filters can use indexes.
+PRODUCT_STATUS_FILTERS = {
+    'inactive': models.Q(is_active=False),
+    'out_of_stock': models.Q(is_active=True, stock=0),
+    'low_stock': models.Q(is_active=True, stock__gt=0, stock__lt=LOW_STOCK_STATUS_LIMIT),
+    'in_stock': models.Q(is_active=True, stock__gte=LOW_STOCK_STATUS_LIMIT),
+}
+
+
+def product_status():
+    """SQL version of Product.get_status()."""
+    return models.Case(
+        *[
+            models.When(PRODUCT_STATUS_FILTERS[slug], then=models.Value(label))
+            for slug, label in PRODUCT_STATUSES.items()
+            if slug != 'in_stock'
+        ],
+        default=models.Value(PRODUCT_STATUSES['in_stock']),
+        output_field=models.CharField(),
+    )
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_status(self):
+        return self.annotate(status=product_status())
+
+    def filter_status(self, *statuses):
+        """Filter on status slugs (see PRODUCT_STATUSES); unknown slugs raise ValueError."""
+        condition = models.Q()
+        for status in statuses:
+            if status not in PRODUCT_STATUS_FILTERS:
+                raise ValueError(f"Invalid status: {status}")
+            condition |= PRODUCT_STATUS_FILTERS[status]
+        return self.filter(condition)
+
+    def status_counts_by_category(self):
+        """
+        One grouped query: ``{'category_id', 'category__name', <status slug>: count, ...}``
+        per category with products.
+        """
+        return (
+            self.order_by()
+            .values('category_id', 'category__name')
+            .annotate(**{
+                status: models.Count('pk', filter=condition)
+                for status, condition in PRODUCT_STATUS_FILTERS.items()
+            })
+            .order_by('category_id')
+        )
+
+
+class Product(LoadedStateModel):
+    TRACKED_FIELDS = ('category_id', 'is_active', 'price', 'stock')
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     price = models.DecimalField(
@@ -25,17 +134,66 @@ class Product(models.Model):
         validators=[MinValueValidator(Decimal('0.01'))]
     )
     stock = models.PositiveIntegerField(default=0)
+    # Units held by active StockReservations, only changed by the F()
+    # updates in products.reservations: code saving an instance loaded
+    # before a reservation must pass update_fields or refresh it first.
+    reserved_stock = models.PositiveIntegerField(default=0, editable=False)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Integer-cents view of price for pricing pipelines (products.money).
+    price_money = MoneyAttribute('price')
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            # Keyset pagination orderings used by products.views.PRODUCT_ORDERINGS.
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            # Hot filters on active products: newest first overall and per
+            # category, and the low-stock report.
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='product_active_created_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='product_active_category_idx',
+            ),
+            models.Index(
+                fields=['stock'],
+                condition=models.Q(is_active=True),
+                name='product_active_stock_idx',
+            ),
+            # Per-category status counts, answered from the index alone.
+            # Status filters on active products use product_active_stock_idx.
+            models.Index(
+                fields=['category', 'is_active', 'stock'],
+                name='product_category_status_idx',
+            ),
+        )
+        constraints = (
+            models.CheckConstraint(
+                condition=models.Q(reserved_stock__lte=models.F('stock')),
+                name='product_reserved_lte_stock',
+            ),
+        )
+
     def __str__(self):
         return self.name
 
     def is_in_stock(self):
         return self.stock > 0
 
+    @property
+    def available_stock(self):
+        return self.stock - self.reserved_stock
+
     def apply_discount(self, discount_percentage):
         if discount_percentage < 0 or discount_percentage > 100:
             raise ValueError("Discount must be between 0 and 100")
@@ -43,11 +201,12 @@ def apply_discount(self, discount_percentage):
         return self.price - discount_amount
 
     def get_status(self):
+        # Keep in step with product_status().
         if not self.is_active:
             return "Inactive"
         elif self.stock == 0:
             return "Out of Stock"
-        elif self.stock < 10:
+        elif self.stock < LOW_STOCK_STATUS_LIMIT:
             return "Low Stock"
         else:
             return "In Stock"
@@ -81,3 +240,114 @@ def get_legacy_data(self):
             data['day'] = "Sunday"
 
         return data
+
+
+class RelatedProduct(models.Model):
+    """Precomputed related products, maintained by products.related."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_by')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=['product', 'rank'], name='related_product_rank_uniq'),
+        )
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} (#{self.rank})"
+
+
+class StockMovement(models.Model):
+    """Append-only stock ledger, written in batches by products.ledger."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    # Positive for stock added, negative for stock removed.
+    quantity = models.IntegerField()
+    # Set when the change happens, not when the buffered row is flushed.
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=['product', 'created_at'], name='stock_movement_history_idx'),
+        )
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity:+d}"
+
+
+class StockReservation(models.Model):
+    """Units held for a checkout until confirmed, released or expired."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} until {self.expires_at:%Y-%m-%d %H:%M}"
+
+
+class LowStockProduct(models.Model):
+    """Membership of the low-stock set, maintained by products.low_stock."""
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='low_stock'
+    )
+    since = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.product_id} low since {self.since:%Y-%m-%d %H:%M}"
+
+
+class LowStockEvent(models.Model):
+    """Change feed of products entering or leaving the low-stock set."""
+    ENTERED = 'entered'
+    LEFT = 'left'
+    KIND_CHOICES = ((ENTERED, 'Entered low stock'), (LEFT, 'Left low stock'))
+
+    # No FK constraint: the feed outlives deleted products.
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, related_name='low_stock_events'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    stock = models.PositiveIntegerField()
+    threshold = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.product_id} {self.kind} ({self.stock}/{self.threshold})"
+
+
+class ProductInteraction(models.Model):
+    """Recorded product views and purchases, the input of products.recommendations."""
+    VIEW = 'view'
+    PURCHASE = 'purchase'
+    KIND_CHOICES = ((VIEW, 'Viewed'), (PURCHASE, 'Purchased'))
+
+    # Session key, user id or any other stable visitor identifier.
+    visitor = models.CharField(max_length=64)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='interactions')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=VIEW)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=['visitor', 'created_at'], name='interaction_visitor_idx'),
+        )
+
+    def __str__(self):
+        return f"{self.visitor} {self.kind} {self.product_id}"
+
+
+class ProductNeighbours(models.Model):
+    """Top co-occurring products of one product, packed by products.recommendations."""
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='neighbours'
+    )
+    # Little-endian int64 ids followed by float32 scores, best first.
+    data = models.BinaryField()
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = 'product neighbours'
+
+    def __str__(self):
+        return f"{self.product_id}: {len(self.data) // 12} neighbours"
@@ -0,0 +1,235 @@
+"""
+Integer-cents money for pricing hot paths.
+
+Money keeps an amount as an int number of cents, so adding and comparing
+never allocate Decimals. Only operations that can produce fractions of a
+cent (multiplying by a rate, taking a percentage) round, always to whole
+cents and always with an explicit rounding mode named after the decimal
+module constants. MoneyArray stores many amounts in an ``array('q')``
+for bulk math over a catalog or a cart.
+
+    Money.from_decimal(product.price).percentage(21)      # tax
+    MoneyArray.from_decimals(prices).multiply('0.9').total()
+"""
+
+import functools
+from array import array
+from decimal import (
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP,
+    Decimal,
+)
+
+CENTS_PER_UNIT = 100
+DEFAULT_ROUNDING = ROUND_HALF_EVEN
+ROUNDING_MODES = (
+    ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR, ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP,
+)
+
+
+def _as_decimal(value):
+    # Floats go through str() like everywhere else in the pricing code, so
+    # 0.1 means Decimal('0.1') and not its binary approximation.
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return Decimal(value)
+
+
+def _as_ratio(value):
+    """Exact ``(numerator, denominator)`` of an int, Decimal, str or float factor."""
+    if isinstance(value, int):
+        return value, 1
+    decimal = _as_decimal(value)
+    if not decimal.is_finite():
+        raise ValueError(f"Invalid factor: {value!r}")
+    return decimal.as_integer_ratio()
+
+
+def round_division(numerator, denominator, rounding=DEFAULT_ROUNDING):
+    """Divide two ints, rounding the exact quotient to an int with ``rounding``."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    if not remainder:
+        return quotient
+
+    # divmod floors, so quotient + 1 is the other candidate.
+    if rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + 1
+    if rounding == ROUND_DOWN:
+        return quotient + 1 if quotient < 0 else quotient
+    if rounding == ROUND_UP:
+        return quotient if quotient < 0 else quotient + 1
+
+    twice = 2 * remainder
+    if twice != denominator:
+        return quotient + 1 if twice > denominator else quotient
+    if rounding == ROUND_HALF_EVEN:
+        return quotient + (quotient & 1)
+    if rounding == ROUND_HALF_UP:
+        return quotient if quotient < 0 else quotient + 1
+    if rounding == ROUND_HALF_DOWN:
+        return quotient + 1 if quotient < 0 else quotient
+    raise ValueError(f"Unknown rounding mode: {rounding!r}")
+
+
+@functools.total_ordering
+class Money:
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        if not isinstance(cents, int) or isinstance(cents, bool):
+            raise TypeError("Money is built from integer cents; use Money.from_decimal() for amounts")
+        self.cents = cents
+
+    @classmethod
+    def from_decimal(cls, amount, rounding=DEFAULT_ROUNDING):
+        numerator, denominator = _as_ratio(amount)
+        return cls(round_division(numerator * CENTS_PER_UNIT, denominator, rounding))
+
+    def to_decimal(self):
+        """The amount as a two-place Decimal, as a DecimalField would store it."""
+        return Decimal(self.cents).scaleb(-2)
+
+    def multiply(self, factor, rounding=DEFAULT_ROUNDING):
+        numerator, denominator = _as_ratio(factor)
+        return Money(round_division(self.cents * numerator, denominator, rounding))
+
+    def percentage(self, percent, rounding=DEFAULT_ROUNDING):
+        numerator, denominator = _as_ratio(percent)
+        return Money(round_division(self.cents * numerator, denominator * 100, rounding))
+
+    def apply_discount(self, percent, rounding=DEFAULT_ROUNDING):
+        """Product.apply_discount() rounded to cents; the discount is what gets rounded."""
+        return self - self.percentage(percent, rounding)
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __mul__(self, other):
+        # Only exact integer multiples here; rates go through multiply().
+        if isinstance(other, int) and not isinstance(other, bool):
+            return Money(self.cents * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __bool__(self):
+        return bool(self.cents)
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def __repr__(self):
+        return f"Money('{self.to_decimal()}')"
+
+    def __str__(self):
+        return f"${self.to_decimal()}"
+
+
+class MoneyArray:
+    """A sequence of Money amounts stored as signed 64-bit cents."""
+
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=()):
+        self.cents = cents if isinstance(cents, array) else array('q', cents)
+
+    @classmethod
+    def from_decimals(cls, amounts, rounding=DEFAULT_ROUNDING):
+        return cls(Money.from_decimal(amount, rounding).cents for amount in amounts)
+
+    @classmethod
+    def from_queryset(cls, queryset, field='price', rounding=DEFAULT_ROUNDING):
+        """Load one money column without building model instances."""
+        return cls.from_decimals(queryset.values_list(field, flat=True).iterator(), rounding)
+
+    def to_decimals(self):
+        return [Decimal(cents).scaleb(-2) for cents in self.cents]
+
+    def total(self):
+        return Money(sum(self.cents))
+
+    def multiply(self, factor, rounding=DEFAULT_ROUNDING):
+        numerator, denominator = _as_ratio(factor)
+        if denominator == 1:
+            return MoneyArray(cents * numerator for cents in self.cents)
+        return MoneyArray(round_division(cents * numerator, denominator, rounding) for cents in self.cents)
+
+    def percentage(self, percent, rounding=DEFAULT_ROUNDING):
+        numerator, denominator = _as_ratio(percent)
+        return MoneyArray(
+            round_division(cents * numerator, denominator * 100, rounding) for cents in self.cents
+        )
+
+    def apply_discount(self, percent, rounding=DEFAULT_ROUNDING):
+        discounts = self.percentage(percent, rounding).cents
+        return MoneyArray(array('q', map(int.__sub__, self.cents, discounts)))
+
+    def __len__(self):
+        return len(self.cents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MoneyArray(self.cents[index])
+        return Money(self.cents[index])
+
+    def __iter__(self):
+        return map(Money, self.cents)
+
+    def __eq__(self, other):
+        if isinstance(other, MoneyArray):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __repr__(self):
+        return f"MoneyArray({[str(amount) for amount in self.to_decimals()]})"
+
+
+class MoneyAttribute:
+    """
+    Money view of a DecimalField, e.g. ``Product.price_money``.
+
+    Reading converts the stored Decimal once; assigning a Money writes its
+    two-place Decimal back to the field, so saving is unchanged.
+    """
+
+    def __init__(self, field_name, rounding=DEFAULT_ROUNDING):
+        self.field_name = field_name
+        self.rounding = rounding
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.field_name)
+        return None if value is None else Money.from_decimal(value, self.rounding)
+
+    def __set__(self, instance, money):
+        setattr(instance, self.field_name, None if money is None else money.to_decimal())
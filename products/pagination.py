@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last seen ordering key instead of
+    counting rows and using OFFSET, so every page costs the same.
+
+    ``ordering`` must end in a unique field (usually ``id``) and all fields
+    must sort in the same direction. Cursors are opaque url-safe tokens.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        descending = {field.startswith('-') for field in ordering}
+        if len(descending) != 1:
+            raise ValueError("Keyset ordering fields must share one direction")
+
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.descending = descending.pop()
+        self.fields = [self.queryset.model._meta.get_field(name.lstrip('-')) for name in ordering]
+
+    def get_page(self, cursor=None):
+        queryset, values, backwards = self._page_queryset(cursor)
+        return self._build_page(list(queryset), values, backwards)
+
+    async def aget_page(self, cursor=None):
+        queryset, values, backwards = self._page_queryset(cursor)
+        return self._build_page([obj async for obj in queryset], values, backwards)
+
+    def _page_queryset(self, cursor):
+        values, direction = None, 'next'
+        if cursor:
+            values, direction = self.decode_cursor(cursor)
+
+        backwards = direction == 'previous'
+        descending = self.descending != backwards
+        queryset = self.queryset.order_by(
+            *[('-' if descending else '') + field.name for field in self.fields]
+        )
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, descending))
+        return queryset[:self.per_page + 1], values, backwards
+
+    def _build_page(self, rows, values, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], 'previous') if has_previous else None,
+        )
+
+    def _seek(self, values, descending):
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f'{field.attname}__{lookup}': values[index]})
+            for previous, value in zip(self.fields[:index], values):
+                step &= Q(**{previous.attname: value})
+            condition |= step
+        if len(self.fields) > 1:
+            # Redundant bound on the leading column: lets the planner do one
+            # index range scan in order instead of OR-ing index lookups.
+            condition &= Q(**{f'{self.fields[0].attname}__{lookup}e': values[0]})
+        return condition
+
+    def encode_cursor(self, obj, direction):
+        payload = {
+            'o': ','.join(self.ordering),
+            'd': direction,
+            'v': [field.value_to_string(obj) for field in self.fields],
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            ordering, direction = payload['o'], payload['d']
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, payload['v'], strict=True)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+        if ordering != ','.join(self.ordering) or direction not in ('next', 'previous'):
+            raise InvalidCursor(cursor)
+        return values, direction
@@ -0,0 +1,110 @@
+"""
+Set-based price changes for promotions.
+
+Prices are rewritten with ``UPDATE ... SET price = ROUND(price * factor, 2)``
+(or ``price + amount``) in primary-key range batches, so each batch holds
+its row locks briefly and no model instances are loaded. Queryset updates
+bypass the Product signals, so the cache and related-products maintenance
+they would do is done here per batch.
+"""
+
+from decimal import Decimal
+
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .cache import (
+    bump_fragment_versions,
+    category_products_fragment,
+    invalidate_products,
+)
+from .models import Product
+from .related import rebuild_related_products
+
+PRICE_CHANGE_BATCH_SIZE = 1000
+
+
+def _price_field():
+    return Product._meta.get_field('price')
+
+
+def _price_bounds():
+    field = _price_field()
+    minimum = next(
+        validator.limit_value for validator in field.validators
+        if isinstance(validator, MinValueValidator)
+    )
+    # Largest value that fits the column unless a MaxValueValidator is stricter.
+    largest = Decimal(10) ** (field.max_digits - field.decimal_places) - Decimal(1).scaleb(-field.decimal_places)
+    maximum = next(
+        (validator.limit_value for validator in field.validators if isinstance(validator, MaxValueValidator)),
+        largest,
+    )
+    return minimum, maximum
+
+
+def price_change_expression(percent=None, amount=None):
+    """New-price expression for a relative (``percent``) or absolute (``amount``) change."""
+    if (percent is None) == (amount is None):
+        raise ValueError("Give exactly one of percent or amount")
+
+    field = _price_field()
+    output_field = DecimalField(max_digits=field.max_digits, decimal_places=field.decimal_places)
+    if percent is not None:
+        factor = 1 + Decimal(str(percent)) / 100
+        if factor < 0:
+            raise ValueError("Invalid percentage")
+        expression = F('price') * Value(factor, output_field=DecimalField())
+    else:
+        expression = F('price') + Value(Decimal(str(amount)), output_field=DecimalField())
+    return ExpressionWrapper(Round(expression, field.decimal_places), output_field=output_field)
+
+
+def change_prices(queryset, percent=None, amount=None, batch_size=PRICE_CHANGE_BATCH_SIZE, dry_run=False):
+    """
+    Apply a price change to every product in ``queryset``.
+
+    Products whose new price would fall outside the field's validators
+    (below 0.01, or beyond max_digits) are left untouched and counted as
+    skipped. Returns ``{'updated': n, 'skipped': n}``.
+    """
+    new_price = price_change_expression(percent, amount)
+    minimum, maximum = _price_bounds()
+    in_bounds = Q(new_price__gte=minimum, new_price__lte=maximum)
+
+    queryset = queryset.order_by('pk')
+    updated = skipped = 0
+    category_ids = set()
+
+    start = queryset.values_list('pk', flat=True).first()
+    while start is not None:
+        # The pk batch_size rows further on closes this range and opens the next.
+        following = queryset.filter(pk__gte=start).values_list('pk', flat=True)
+        end = next(iter(following[batch_size:batch_size + 1]), None)
+        batch = queryset.filter(pk__gte=start)
+        if end is not None:
+            batch = batch.filter(pk__lt=end)
+        batch = batch.alias(new_price=new_price)
+        start = end
+
+        with transaction.atomic():
+            rows = list(batch.filter(in_bounds).select_for_update().values_list('pk', 'category_id'))
+            skipped += batch.exclude(in_bounds).count()
+            if dry_run or not rows:
+                updated += len(rows)
+                continue
+
+            ids = [pk for pk, _ in rows]
+            updated += Product.objects.filter(pk__in=ids).update(price=new_price, updated_at=timezone.now())
+            batch_category_ids = {category_id for _, category_id in rows}
+            invalidate_products(ids)
+            bump_fragment_versions([category_products_fragment(pk) for pk in batch_category_ids])
+            category_ids.update(batch_category_ids)
+
+    if category_ids:
+        # Price proximity feeds the precomputed related products.
+        rebuild_related_products(sorted(category_ids))
+    return {'updated': updated, 'skipped': skipped}
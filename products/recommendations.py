@@ -0,0 +1,304 @@
+"""
+Item-to-item recommendations from recorded views and purchases.
+
+build_recommendations() runs offline: it groups ProductInteraction rows
+by visitor, accumulates a sparse co-occurrence matrix (dict of dicts,
+purchases weighing more than views), scores each pair by cosine
+similarity and stores the top neighbours of every product packed into
+one ProductNeighbours row.
+
+recommend() normally never touches the database: every process keeps the
+packed lists in memory and, at most once every
+PRODUCTS_RECOMMENDATION_RELOAD_INTERVAL seconds, checks the build time
+stored with them to pick up rebuilds made by any process. A request for a
+history of N products merges N precomputed lists.
+
+product_detail records views and confirm_reservation(visitor=...) records
+purchases. Until enough of them exist, recommend_products() fills up
+with the newest active products of the history's categories, then of the
+whole catalog.
+
+Views are the bulk of the rows, so record_view() keeps only the first view
+of a product by a visitor every PRODUCTS_INTERACTION_VIEW_DEDUP_SECONDS
+(repeats add nothing to a basket) and, with
+PRODUCTS_INTERACTION_VIEW_SAMPLE_RATE below 1, only that share of
+visitors, whole baskets at a time. prune_interactions() deletes rows older
+than the build window.
+"""
+
+import hashlib
+import heapq
+import itertools
+import math
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Product, ProductInteraction, ProductNeighbours
+
+RECOMMENDATIONS_LIMIT = 10
+INTERACTION_WEIGHTS = {
+    ProductInteraction.VIEW: 1.0,
+    ProductInteraction.PURCHASE: 3.0,
+}
+# Longer histories (crawlers, shared sessions) only add noise and make the
+# pair count quadratic; keep the most recent products of each visitor.
+MAX_VISITOR_PRODUCTS = 50
+VIEW_DEDUP_PREFIX = 'products:recommendations:viewed'
+PRUNE_BATCH_SIZE = 5000
+
+
+def neighbours_per_product():
+    return getattr(settings, 'PRODUCTS_RECOMMENDATION_NEIGHBOURS', 20)
+
+
+def reload_interval():
+    return getattr(settings, 'PRODUCTS_RECOMMENDATION_RELOAD_INTERVAL', 30)
+
+
+def pack_neighbours(neighbours):
+    """Pack ``[(product_id, score), ...]`` into ProductNeighbours.data."""
+    ids = array('q', [product_id for product_id, _ in neighbours])
+    scores = array('f', [score for _, score in neighbours])
+    if sys.byteorder == 'big':
+        ids.byteswap()
+        scores.byteswap()
+    return ids.tobytes() + scores.tobytes()
+
+
+def unpack_neighbours(data):
+    """Return ``(ids, scores)`` arrays from ProductNeighbours.data."""
+    data = bytes(data)
+    split = len(data) // 12 * 8
+    ids, scores = array('q'), array('f')
+    ids.frombytes(data[:split])
+    scores.frombytes(data[split:])
+    if sys.byteorder == 'big':
+        ids.byteswap()
+        scores.byteswap()
+    return ids, scores
+
+
+def record_interactions(visitor, product_ids, kind=ProductInteraction.VIEW):
+    """Record that ``visitor`` viewed (or purchased) each of ``product_ids``."""
+    ProductInteraction.objects.bulk_create(
+        [ProductInteraction(visitor=visitor, product_id=product_id, kind=kind) for product_id in product_ids]
+    )
+
+
+def _sampled(visitor, rate):
+    if rate >= 1:
+        return True
+    bucket = int.from_bytes(hashlib.blake2b(visitor.encode(), digest_size=4).digest(), 'big')
+    return bucket < rate * 2**32
+
+
+def record_view(visitor, product_id):
+    """
+    Record a product view unless this visitor is sampled out or already
+    viewed it within the dedup window. Returns whether a row was written.
+    """
+    if not _sampled(visitor, getattr(settings, 'PRODUCTS_INTERACTION_VIEW_SAMPLE_RATE', 1.0)):
+        return False
+    dedup = getattr(settings, 'PRODUCTS_INTERACTION_VIEW_DEDUP_SECONDS', 3600)
+    if dedup and not cache.add(f'{VIEW_DEDUP_PREFIX}:{visitor}:{product_id}', 1, timeout=dedup):
+        return False
+    record_interactions(visitor, [product_id])
+    return True
+
+
+def prune_interactions(before, batch_size=PRUNE_BATCH_SIZE):
+    """Delete interactions created before ``before``, in batches; returns how many."""
+    pruned = 0
+    while True:
+        ids = list(
+            ProductInteraction.objects.filter(created_at__lt=before)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return pruned
+        pruned += ProductInteraction.objects.filter(pk__in=ids).delete()[0]
+
+
+def _visitor_baskets(interactions):
+    """Yield ``{product_id: weight}`` per visitor from rows ordered by visitor, then time."""
+    for _, rows in itertools.groupby(interactions, key=lambda row: row[0]):
+        basket = {}
+        for _, product_id, kind in rows:
+            # Re-inserting moves the product to the end, so the slice below
+            # keeps the most recently touched ones.
+            weight = max(basket.pop(product_id, 0.0), INTERACTION_WEIGHTS[kind])
+            basket[product_id] = weight
+        yield dict(list(basket.items())[-MAX_VISITOR_PRODUCTS:])
+
+
+def build_cooccurrence(interactions):
+    """
+    Return ``(pairs, norms)`` for ``(visitor, product_id, kind)`` rows ordered
+    by visitor: ``pairs[a][b]`` is the summed weight of visitors touching
+    both, ``norms[a]`` the summed squared weight of those touching ``a``.
+    """
+    pairs = defaultdict(lambda: defaultdict(float))
+    norms = defaultdict(float)
+    for basket in _visitor_baskets(interactions):
+        items = sorted(basket.items())
+        for product_id, weight in items:
+            norms[product_id] += weight * weight
+        for (first, first_weight), (second, second_weight) in itertools.combinations(items, 2):
+            weight = first_weight * second_weight
+            pairs[first][second] += weight
+            pairs[second][first] += weight
+    return pairs, norms
+
+
+def top_neighbours(pairs, norms, limit):
+    """Yield ``(product_id, [(neighbour_id, score), ...])`` by cosine similarity, best first."""
+    for product_id, row in pairs.items():
+        norm = math.sqrt(norms[product_id])
+        scored = (
+            (weight / (norm * math.sqrt(norms[other])), -other)
+            for other, weight in row.items()
+        )
+        yield product_id, [(-negated_id, score) for score, negated_id in heapq.nlargest(limit, scored)]
+
+
+def build_recommendations(since=None, limit=None):
+    """
+    Rebuild every ProductNeighbours row from the interactions recorded since
+    ``since`` (all of them by default), counting active products only.
+    Returns the number of products with neighbours.
+    """
+    limit = limit or neighbours_per_product()
+    interactions = ProductInteraction.objects.filter(product__is_active=True)
+    if since is not None:
+        interactions = interactions.filter(created_at__gte=since)
+    rows = (
+        interactions.order_by('visitor', 'created_at', 'pk')
+        .values_list('visitor', 'product_id', 'kind')
+        .iterator(chunk_size=5000)
+    )
+
+    pairs, norms = build_cooccurrence(rows)
+    built_at = timezone.now()
+    entries = [
+        ProductNeighbours(product_id=product_id, data=pack_neighbours(neighbours), built_at=built_at)
+        for product_id, neighbours in top_neighbours(pairs, norms, limit)
+    ]
+
+    with transaction.atomic():
+        ProductNeighbours.objects.all().delete()
+        ProductNeighbours.objects.bulk_create(entries, batch_size=1000)
+        # Other processes notice the new built_at on their next check.
+        transaction.on_commit(_expire_index)
+    return len(entries)
+
+
+def built_version():
+    """When the stored neighbours were built (every row of a build shares it); None if empty."""
+    return ProductNeighbours.objects.aggregate(version=Max('built_at'))['version']
+
+
+class RecommendationIndex:
+    """In-memory ``product_id -> (neighbour ids, scores)`` for one build."""
+
+    def __init__(self, neighbours, version=None):
+        self.neighbours = neighbours
+        self.version = version
+
+    @classmethod
+    def load(cls):
+        neighbours, version = {}, None
+        for product_id, data, built_at in ProductNeighbours.objects.values_list('product_id', 'data', 'built_at'):
+            neighbours[product_id] = unpack_neighbours(data)
+            version = built_at if version is None else max(version, built_at)
+        return cls(neighbours, version)
+
+    def recommend(self, history, limit=RECOMMENDATIONS_LIMIT):
+        """
+        Return up to ``limit`` product ids for a history of product ids,
+        excluding the history itself. Scores of products neighbouring
+        several history items add up; ties go to the lower id.
+        """
+        seen = set(history)
+        scores = defaultdict(float)
+        for product_id in seen:
+            entry = self.neighbours.get(product_id)
+            if entry is None:
+                continue
+            for neighbour_id, score in zip(*entry):
+                scores[neighbour_id] += score
+
+        for product_id in seen:
+            scores.pop(product_id, None)
+        best = heapq.nlargest(limit, ((score, -product_id) for product_id, score in scores.items()))
+        return [-negated_id for _, negated_id in best]
+
+
+_index = None
+_checked_at = None
+_index_lock = threading.Lock()
+
+
+def _expire_index():
+    global _checked_at
+    _checked_at = None
+
+
+def get_recommendation_index():
+    """The current process's index, reloaded when the database holds a newer build."""
+    global _index, _checked_at
+    now = time.monotonic()
+    checked_at, index = _checked_at, _index
+    if index is not None and checked_at is not None and now - checked_at < reload_interval():
+        return index
+    with _index_lock:
+        if _index is None or _checked_at is None or now - _checked_at >= reload_interval():
+            if _index is None or _index.version != built_version():
+                _index = RecommendationIndex.load()
+            _checked_at = now
+        return _index
+
+
+def recommend(history, limit=RECOMMENDATIONS_LIMIT):
+    return get_recommendation_index().recommend(history, limit)
+
+
+def recommend_products(history, limit=RECOMMENDATIONS_LIMIT):
+    """
+    Active Product instances for ``recommend(history)``, in recommendation
+    order, topped up with fallback_products() when there are fewer than
+    ``limit``.
+    """
+    # Lists are only as fresh as the last build; over-fetch to make up for
+    # products deactivated since.
+    ids = recommend(history, limit * 2)
+    active = Product.objects.filter(is_active=True).select_related('category')
+    found = active.in_bulk(ids)
+    products = [found[product_id] for product_id in ids if product_id in found][:limit]
+    if len(products) < limit:
+        products += fallback_products(history, limit - len(products), exclude=[p.pk for p in products])
+    return products
+
+
+def fallback_products(history, limit, exclude=()):
+    """
+    Up to ``limit`` of the newest active products outside ``history`` and
+    ``exclude``: from the history's categories first, then from any.
+    """
+    excluded = {*history, *exclude}
+    active = Product.objects.filter(is_active=True).select_related('category').exclude(pk__in=excluded)
+    newest = ('-created_at', '-id')
+    categories = Product.objects.filter(pk__in=history).values('category_id')
+    products = list(active.filter(category__in=categories).order_by(*newest)[:limit]) if history else []
+    if len(products) < limit:
+        products += active.exclude(pk__in=[p.pk for p in products]).order_by(*newest)[:limit - len(products)]
+    return products
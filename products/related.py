@@ -0,0 +1,221 @@
+"""
+Precomputed related products for product_detail.
+
+Candidates are the other active products of the same category; each
+candidate is scored by the configured scorers and the best
+RELATED_PRODUCTS_LIMIT are stored in RelatedProduct. The detail page then
+reads them with one indexed lookup.
+
+A scorer is any object with ``score(product, candidate) -> float`` taking
+two ``values()`` rows (see CANDIDATE_FIELDS). It may also define
+``prepare(products, candidates)`` to bulk-load whatever it needs before
+scoring ``products`` (it may be called again for more products). Scorers
+and weights come from ``PRODUCTS_RELATED_SCORERS``.
+"""
+
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Product, ProductNeighbours, RelatedProduct
+from .recommendations import unpack_neighbours
+
+RELATED_PRODUCTS_LIMIT = 4
+CANDIDATE_FIELDS = ('id', 'category_id', 'price')
+DEFAULT_RELATED_SCORERS = [
+    ('products.related.PriceProximityScorer', 1.0),
+]
+
+
+def neighbour_updates():
+    return getattr(settings, 'PRODUCTS_RELATED_NEIGHBOUR_UPDATES', 20)
+
+
+class PriceProximityScorer:
+    """1.0 for identical prices, falling towards 0 as prices diverge."""
+
+    def score(self, product, candidate):
+        high = max(product['price'], candidate['price'])
+        if not high:
+            return 1.0
+        return float(1 - abs(product['price'] - candidate['price']) / high)
+
+
+class CoViewScorer:
+    """
+    Cosine similarity of the visitors who viewed or bought both products,
+    read from the ProductNeighbours lists of products.recommendations
+    (0.0 for pairs outside them, so it only counts after a build).
+    """
+
+    def __init__(self):
+        self.neighbours = {}
+
+    def prepare(self, products, candidates):
+        ids = [product['id'] for product in products if product['id'] not in self.neighbours]
+        for start in range(0, len(ids), 500):
+            rows = ProductNeighbours.objects.filter(product_id__in=ids[start:start + 500])
+            for product_id, data in rows.values_list('product_id', 'data'):
+                self.neighbours[product_id] = dict(zip(*unpack_neighbours(data)))
+
+    def score(self, product, candidate):
+        neighbours = self.neighbours.get(product['id'])
+        return neighbours.get(candidate['id'], 0.0) if neighbours else 0.0
+
+
+class RelatedProductsEngine:
+    def __init__(self, scorers=None, limit=RELATED_PRODUCTS_LIMIT):
+        if scorers is None:
+            config = getattr(settings, 'PRODUCTS_RELATED_SCORERS', DEFAULT_RELATED_SCORERS)
+            scorers = [(import_string(path)(), weight) for path, weight in config]
+        self.scorers = scorers
+        self.limit = limit
+
+    def prepare(self, products, candidates):
+        for scorer, _ in self.scorers:
+            if hasattr(scorer, 'prepare'):
+                scorer.prepare(products, candidates)
+
+    def score(self, product, candidate):
+        return sum(weight * scorer.score(product, candidate) for scorer, weight in self.scorers)
+
+    def top_related(self, product, candidates, limit=None):
+        """Return ``[(related_id, score), ...]`` best first; ties go to the lower id."""
+        scored = (
+            (self.score(product, candidate), -candidate['id'])
+            for candidate in candidates
+            if candidate['id'] != product['id']
+        )
+        return [(-negated_id, score) for score, negated_id in heapq.nlargest(limit or self.limit, scored)]
+
+    def build_entries(self, products, candidates_by_category):
+        entries = []
+        for product in products:
+            candidates = candidates_by_category.get(product['category_id'], [])
+            for rank, (related_id, score) in enumerate(self.top_related(product, candidates)):
+                entries.append(RelatedProduct(
+                    product_id=product['id'], related_id=related_id, score=score, rank=rank
+                ))
+        return entries
+
+
+def _candidates_by_category(category_ids):
+    candidates = defaultdict(list)
+    rows = Product.objects.filter(is_active=True, category_id__in=category_ids).values(*CANDIDATE_FIELDS)
+    for row in rows:
+        candidates[row['category_id']].append(row)
+    return candidates
+
+
+def refresh_related_products(product_ids, engine=None):
+    """Recompute the stored related products of the given products."""
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    engine = engine or RelatedProductsEngine()
+
+    products = list(
+        Product.objects.filter(pk__in=product_ids, is_active=True).values(*CANDIDATE_FIELDS)
+    )
+    candidates = _candidates_by_category({product['category_id'] for product in products})
+    engine.prepare(products, [row for rows in candidates.values() for row in rows])
+    entries = engine.build_entries(products, candidates)
+
+    with transaction.atomic():
+        RelatedProduct.objects.filter(product_id__in=product_ids).delete()
+        RelatedProduct.objects.bulk_create(entries, batch_size=1000)
+
+
+def _merge(entries, related_id, score, limit):
+    """``entries`` (best first) with ``related_id`` placed by ``score``, cut to ``limit``."""
+    merged = [entry for entry in entries if entry[0] != related_id] + [(related_id, score)]
+    merged.sort(key=lambda entry: (-entry[1], entry[0]))
+    return merged[:limit]
+
+
+def refresh_after_product_change(product_id, engine=None):
+    """
+    Refresh after a product was created or changed category, active state
+    or price, without rescoring its whole category for every save.
+
+    Its own list is recomputed, and the change is merged into the lists
+    of the products listing it and of its PRODUCTS_RELATED_NEIGHBOUR_UPDATES
+    closest products, the ones whose lists it is likeliest to enter. A
+    list is only rescored in full when the product drops down it and the
+    next best candidate is unknown. Lists elsewhere in the category that it
+    should enter catch up on the next rebuild_related_products.
+    """
+    engine = engine or RelatedProductsEngine()
+    referrers = set(RelatedProduct.objects.filter(related_id=product_id).values_list('product_id', flat=True))
+    product = Product.objects.filter(pk=product_id, is_active=True).values(*CANDIDATE_FIELDS).first()
+    if product is None:
+        refresh_related_products(referrers | {product_id}, engine)
+        return
+
+    candidates = _candidates_by_category([product['category_id']])[product['category_id']]
+    by_id = {row['id']: row for row in candidates}
+    engine.prepare([product], candidates)
+    closest = engine.top_related(product, candidates, limit=max(neighbour_updates(), engine.limit))
+    lists = {product_id: closest[:engine.limit]}
+    closest = closest[:neighbour_updates()]
+
+    # Referrers left in another category lose it entirely.
+    moved = referrers - by_id.keys()
+    touched = [by_id[related_id] for related_id in (referrers - moved) | {related_id for related_id, _ in closest}]
+    engine.prepare(touched, candidates)
+    stored = defaultdict(list)
+    for row in RelatedProduct.objects.filter(product_id__in=[row['id'] for row in touched]).order_by('rank').values(
+        'product_id', 'related_id', 'score'
+    ):
+        stored[row['product_id']].append((row['related_id'], row['score']))
+
+    for row in touched:
+        entries = stored[row['id']]
+        score = engine.score(row, product)
+        others = [entry for entry in entries if entry[0] != product_id]
+        if (
+            len(entries) >= engine.limit
+            and len(others) < len(entries)
+            and others
+            and score <= others[-1][1]
+        ):
+            # It fell to the bottom: the candidate that replaces it was never stored.
+            merged = engine.top_related(row, candidates)
+        else:
+            merged = _merge(entries, product_id, score, engine.limit)
+        if merged != entries:
+            lists[row['id']] = merged
+
+    with transaction.atomic():
+        RelatedProduct.objects.filter(product_id__in=lists).delete()
+        RelatedProduct.objects.bulk_create(
+            [
+                RelatedProduct(product_id=owner_id, related_id=related_id, score=score, rank=rank)
+                for owner_id, entries in lists.items()
+                for rank, (related_id, score) in enumerate(entries)
+            ],
+            batch_size=1000,
+        )
+    refresh_related_products(moved, engine)
+
+
+def rebuild_related_products(category_ids=None, engine=None):
+    """Recompute every stored list, one category at a time. Returns the number of rows written."""
+    engine = engine or RelatedProductsEngine()
+    if category_ids is None:
+        category_ids = Product.objects.order_by().values_list('category_id', flat=True).distinct()
+
+    written = 0
+    for category_id in list(category_ids):
+        candidates = _candidates_by_category([category_id])
+        products = candidates[category_id]
+        engine.prepare(products, products)
+        entries = engine.build_entries(products, candidates)
+        with transaction.atomic():
+            RelatedProduct.objects.filter(product__category_id=category_id).delete()
+            RelatedProduct.objects.bulk_create(entries, batch_size=1000)
+        written += len(entries)
+    return written
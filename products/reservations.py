@@ -0,0 +1,147 @@
+"""
+Time-limited stock reservations for checkout.
+
+Reserving moves units into Product.reserved_stock with one conditional
+UPDATE (``WHERE stock - reserved_stock >= n``), so concurrent checkouts
+never oversell and no row lock outlives the statement. Confirming turns
+the reserved units into a stock removal; releasing or expiring gives them
+back. Whoever deletes the StockReservation row first (confirm, release
+or the expiry sweep) owns the outcome, so each reservation is settled
+exactly once.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .inventory import InsufficientStock, stock_changed
+from .ledger import record_stock_movements
+from .models import Product, ProductInteraction, StockReservation
+from .recommendations import record_interactions
+
+SWEEP_BATCH_SIZE = 1000
+
+
+class ReservationExpired(ValueError):
+    pass
+
+
+class _SettledConcurrently(Exception):
+    pass
+
+
+def reserve_stock(product, quantity, ttl=None):
+    """Hold ``quantity`` units of an active product for ``ttl`` seconds."""
+    if quantity <= 0:
+        raise ValueError("Quantity must be positive")
+    if ttl is None:
+        ttl = getattr(settings, 'PRODUCTS_RESERVATION_TTL', 900)
+
+    product_id = getattr(product, 'pk', product)
+    now = timezone.now()
+    with transaction.atomic():
+        reserved = (
+            Product.objects.filter(pk=product_id, is_active=True)
+            .alias(available=F('stock') - F('reserved_stock'))
+            .filter(available__gte=quantity)
+            .update(reserved_stock=F('reserved_stock') + quantity)
+        )
+        if not reserved:
+            raise InsufficientStock("Insufficient stock")
+        reservation = StockReservation.objects.create(
+            product_id=product_id, quantity=quantity, created_at=now, expires_at=now + timedelta(seconds=ttl)
+        )
+    if isinstance(product, Product):
+        # Like change_stock(): a later save() of it must not write the old count back.
+        product.refresh_from_db(fields=['reserved_stock'])
+    return reservation
+
+
+def _claim(reservation, unexpired=False):
+    """Delete the reservation row; returns it as values, or None if someone else settled it."""
+    reservations = StockReservation.objects.filter(pk=getattr(reservation, 'pk', reservation))
+    row = reservations.values('product_id', 'product__category_id', 'quantity').first()
+    if unexpired:
+        reservations = reservations.filter(expires_at__gt=timezone.now())
+    if row is None or not reservations.delete()[0]:
+        return None
+    return row
+
+
+def confirm_reservation(reservation, visitor=None):
+    """
+    Turn a reservation into a stock removal, recorded as a purchase by
+    ``visitor`` when given; raises ReservationExpired if it is gone.
+    """
+    with transaction.atomic():
+        row = _claim(reservation, unexpired=True)
+        if row is None:
+            raise ReservationExpired("Reservation expired or already settled")
+        quantity = row['quantity']
+        Product.objects.filter(pk=row['product_id']).update(
+            stock=F('stock') - quantity,
+            reserved_stock=F('reserved_stock') - quantity,
+            updated_at=timezone.now(),
+        )
+        stock_changed([(row['product_id'], row['product__category_id'])])
+        record_stock_movements([(row['product_id'], -quantity)])
+        if visitor is not None:
+            record_interactions(visitor, [row['product_id']], kind=ProductInteraction.PURCHASE)
+
+
+def release_reservation(reservation):
+    """Give the units back; returns False if the reservation was already settled."""
+    with transaction.atomic():
+        row = _claim(reservation)
+        if row is None:
+            return False
+        Product.objects.filter(pk=row['product_id']).update(
+            reserved_stock=F('reserved_stock') - row['quantity']
+        )
+    return True
+
+
+def release_expired_reservations(now=None, batch_size=SWEEP_BATCH_SIZE):
+    """Release every reservation expired at ``now``, in batches; returns how many."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        try:
+            released_now = _release_expired_batch(now, batch_size)
+        except _SettledConcurrently:
+            continue
+        if not released_now:
+            return released
+        released += released_now
+
+
+def _release_expired_batch(now, batch_size):
+    with transaction.atomic():
+        # Rows a concurrent confirm/release is settling are skipped, not waited on.
+        rows = list(
+            StockReservation.objects.filter(expires_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by('expires_at')
+            .values_list('pk', 'product_id', 'quantity')[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        deleted, _ = StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        if deleted != len(rows):
+            # Only possible on backends without row locks; roll back and retry.
+            raise _SettledConcurrently
+        totals = Counter()
+        for _, product_id, quantity in rows:
+            totals[product_id] += quantity
+        Product.objects.filter(pk__in=totals).update(
+            reserved_stock=F('reserved_stock') - Case(
+                *(When(pk=product_id, then=Value(total)) for product_id, total in totals.items()),
+                default=Value(0),
+            )
+        )
+    return len(rows)
@@ -0,0 +1,181 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+PRODUCT_TABLE = 'products_product'
+SQLITE_FTS_TABLE = 'products_product_fts'
+POSTGRES_SEARCH_CONFIG = 'english'
+
+POSTGRES_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE {PRODUCT_TABLE} ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{POSTGRES_SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{POSTGRES_SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX product_search_vector_idx ON {PRODUCT_TABLE} USING GIN (search_vector)",
+    f"CREATE INDEX product_name_trgm_idx ON {PRODUCT_TABLE} USING GIN (name gin_trgm_ops)",
+]
+
+POSTGRES_DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS product_name_trgm_idx",
+    "DROP INDEX IF EXISTS product_search_vector_idx",
+    f"ALTER TABLE {PRODUCT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_SEARCH_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name, description,
+        content='{PRODUCT_TABLE}', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+"""
+
+# The SQLite schema editor rebuilds tables on many ALTERs, which silently
+# drops their triggers, so these are re-created after every migrate.
+SQLITE_SEARCH_TRIGGERS = {
+    f'{SQLITE_FTS_TABLE}_ai': f"""
+        AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    f'{SQLITE_FTS_TABLE}_ad': f"""
+        AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    f'{SQLITE_FTS_TABLE}_au': f"""
+        AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def install_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for statement in POSTGRES_SEARCH_SQL:
+                cursor.execute(statement)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(SQLITE_SEARCH_TABLE_SQL)
+            ensure_sqlite_search_triggers(connection)
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for statement in POSTGRES_DROP_SEARCH_SQL:
+                cursor.execute(statement)
+        elif connection.vendor == 'sqlite':
+            for trigger in SQLITE_SEARCH_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+
+def ensure_sqlite_search_triggers(connection):
+    """Re-create missing FTS triggers and rebuild the index if any were lost."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SQLITE_FTS_TABLE],
+        )
+        if cursor.fetchone() is None:
+            return
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_SEARCH_TRIGGERS if name not in existing]
+        if not missing:
+            return
+
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} {SQLITE_SEARCH_TRIGGERS[name]}")
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+class PostgresSearchBackend:
+    """Full-text search on the generated ``search_vector`` column plus trigram fuzzy matching on ``name``."""
+
+    trigram_weight = 0.5
+
+    def search(self, queryset, query, ranked=True):
+        tsquery = f"websearch_to_tsquery('{POSTGRES_SEARCH_CONFIG}', %s)"
+        matches = RawSQL(
+            f"{PRODUCT_TABLE}.search_vector @@ {tsquery} OR {PRODUCT_TABLE}.name %% %s",
+            (query, query),
+            output_field=BooleanField(),
+        )
+        queryset = queryset.filter(matches)
+        if not ranked:
+            return queryset
+
+        rank = RawSQL(
+            f"ts_rank({PRODUCT_TABLE}.search_vector, {tsquery})"
+            f" + %s * similarity({PRODUCT_TABLE}.name, %s)",
+            (query, self.trigram_weight, query),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', 'id')
+
+
+class SQLiteSearchBackend:
+    """FTS5 search over an external-content index kept in sync by triggers."""
+
+    def match_expression(self, query):
+        # Quote every term so user input can never be parsed as FTS5 syntax,
+        # and prefix-match it so partial words keep matching as they did.
+        terms = re.findall(r'\w+', query)
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, query, ranked=True):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s",
+            (match,),
+        ))
+        if not ranked:
+            return queryset
+
+        # bm25() is lower-is-better, so negate it for a descending rank.
+        rank = RawSQL(
+            f"SELECT -bm25({SQLITE_FTS_TABLE}, 2.0, 1.0) FROM {SQLITE_FTS_TABLE}"
+            f" WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = {PRODUCT_TABLE}.id",
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', 'id')
+
+
+class FallbackSearchBackend:
+    def search(self, queryset, query, ranked=True):
+        return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query))
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    vendor = connections[using].vendor
+    return SEARCH_BACKENDS.get(vendor, FallbackSearchBackend)()
+
+
+def search_products(queryset, query, ranked=True):
+    return get_search_backend(queryset.db).search(queryset, query, ranked=ranked)
@@ -0,0 +1,104 @@
+"""
+Product JSON built straight from values_list() rows.
+
+The status that Product.get_status() computes in Python is the
+product_status() Case/When annotation here and the category name is
+joined in, so serializing a product never instantiates a model or follows
+a relation.
+
+dumps() uses orjson when it is installed and falls back to the standard
+library encoder otherwise.
+"""
+
+import json
+
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+from .models import Product, product_status
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def dumps(data):
+    """Encode ``data`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), content_type=JSON_CONTENT_TYPE, status=status)
+
+
+class RowSerializer:
+    """
+    Serialize ``queryset`` rows as dicts from ``(key, source, converter)`` fields.
+
+    ``source`` is a values() lookup (``'category__name'``) or an expression,
+    which is annotated under ``key``; ``converter`` (or None) is applied to
+    the fetched value. The first field must be the primary key.
+    """
+
+    def __init__(self, queryset, fields):
+        self.queryset = queryset
+        self.keys = tuple(key for key, _, _ in fields)
+        self.annotations = {key: source for key, source, _ in fields if not isinstance(source, str)}
+        self.lookups = tuple(key if key in self.annotations else source for key, source, _ in fields)
+        self.converters = tuple(
+            (key, index, converter) for index, (key, _, converter) in enumerate(fields) if converter
+        )
+
+    def to_dict(self, row):
+        data = dict(zip(self.keys, row))
+        for key, index, converter in self.converters:
+            data[key] = converter(row[index])
+        return data
+
+    @cached_property
+    def base_rows(self):
+        # Resolving the annotations costs more than fetching a single row,
+        # so the lookups below filter this prepared queryset instead.
+        return self.rows(self.queryset)
+
+    def rows(self, queryset):
+        return queryset.annotate(**self.annotations).values_list(*self.lookups)
+
+    def serialize(self, queryset=None):
+        # A clone of base_rows, so its result cache never holds stale rows.
+        rows = self.base_rows.all() if queryset is None else self.rows(queryset)
+        return [self.to_dict(row) for row in rows]
+
+    async def aserialize(self, queryset=None):
+        rows = self.base_rows.all() if queryset is None else self.rows(queryset)
+        return [self.to_dict(row) async for row in rows]
+
+    def first(self, using=None, **filters):
+        row = self.base_rows.using(using).filter(**filters).first()
+        return None if row is None else self.to_dict(row)
+
+    async def afirst(self, using=None, **filters):
+        row = await self.base_rows.using(using).filter(**filters).afirst()
+        return None if row is None else self.to_dict(row)
+
+    def in_bulk(self, ids, **filters):
+        """``{pk: dict}`` for the given primary keys."""
+        return {row[0]: self.to_dict(row) for row in self.base_rows.filter(pk__in=ids, **filters)}
+
+    async def ain_bulk(self, ids, **filters):
+        return {row[0]: self.to_dict(row) async for row in self.base_rows.filter(pk__in=ids, **filters)}
+
+
+PRODUCT_SERIALIZER = RowSerializer(Product.objects.all(), (
+    ('id', 'id', None),
+    ('name', 'name', None),
+    ('price', 'price', str),
+    ('stock', 'stock', None),
+    ('status', product_status(), None),
+    ('category', 'category__name', None),
+))
@@ -0,0 +1,200 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import (
+    CATEGORIES_FRAGMENT,
+    bump_fragment_versions,
+    category_products_fragment,
+    invalidate_products,
+)
+from .low_stock import (
+    default_low_stock_threshold,
+    record_low_stock_removal,
+    sync_low_stock,
+)
+from .models import Category, LowStockProduct, Product, RelatedProduct
+from .related import refresh_after_product_change, refresh_related_products
+from .search import ensure_sqlite_search_triggers
+
+
+def adjust_category_product_count(category_id, delta):
+    categories = Category.objects.filter(pk=category_id)
+    if delta < 0:
+        # Never drive the counter negative; reconcile_category_counts fixes drift.
+        categories = categories.filter(product_count__gte=-delta)
+    categories.update(product_count=F('product_count') + delta)
+
+
+def _counted_category_id(category_id, is_active):
+    return category_id if is_active else None
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_state = instance.loaded_state()
+    if instance._previous_state is None:
+        # Not loaded from the database (or with tracked fields deferred).
+        instance._previous_state = (
+            Product.objects.filter(pk=instance.pk).values(*Product.TRACKED_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def update_category_count_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_state', None)
+    old_category_id = None
+    if previous:
+        old_category_id = _counted_category_id(previous['category_id'], previous['is_active'])
+    new_category_id = _counted_category_id(instance.category_id, instance.is_active)
+
+    if old_category_id == new_category_id:
+        return
+    if old_category_id is not None:
+        adjust_category_product_count(old_category_id, -1)
+    if new_category_id is not None:
+        adjust_category_product_count(new_category_id, 1)
+
+
+@receiver(post_delete, sender=Product)
+def update_category_count_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        adjust_category_product_count(instance.category_id, -1)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_api_cache(sender, instance, **kwargs):
+    invalidate_products([instance.pk])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_state = instance.loaded_state()
+    if instance._previous_state is None:
+        instance._previous_state = (
+            Category.objects.filter(pk=instance.pk).values(*Category.TRACKED_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def invalidate_renamed_category(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if previous is not None and previous['name'] != instance.name:
+        # Cached product payloads embed the category name.
+        invalidate_products(instance.products.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+def resync_low_stock_on_threshold_change(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if not raw and previous is not None and previous['low_stock_threshold'] != instance.low_stock_threshold:
+        sync_low_stock(instance.products.all())
+
+
+@receiver(post_save, sender=Product)
+def bump_product_fragments_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    category_ids = {instance.category_id}
+    if previous:
+        category_ids.add(previous['category_id'])
+    bump_fragment_versions([category_products_fragment(pk) for pk in category_ids])
+
+
+@receiver(post_delete, sender=Product)
+def bump_product_fragments_on_delete(sender, instance, **kwargs):
+    bump_fragment_versions([category_products_fragment(instance.category_id)])
+
+
+@receiver(post_save, sender=Product)
+def refresh_related_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if not created and previous is not None and (
+        previous['category_id'] == instance.category_id
+        and previous['is_active'] == instance.is_active
+        and previous['price'] == instance.price
+    ):
+        return
+    refresh_after_product_change(instance.pk)
+
+
+@receiver(pre_delete, sender=Product)
+def remember_related_referrers(sender, instance, **kwargs):
+    instance._related_referrers = list(
+        RelatedProduct.objects.filter(related_id=instance.pk).values_list('product_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def refresh_related_on_delete(sender, instance, **kwargs):
+    refresh_related_products(getattr(instance, '_related_referrers', []))
+
+
+@receiver(post_save, sender=Product)
+def sync_low_stock_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if not created and previous is not None and (
+        previous['category_id'] == instance.category_id
+        and previous['is_active'] == instance.is_active
+        and previous['stock'] == instance.stock
+    ):
+        return
+    sync_low_stock([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def remember_low_stock_membership(sender, instance, **kwargs):
+    instance._was_low_stock = LowStockProduct.objects.filter(pk=instance.pk).exists()
+
+
+@receiver(post_delete, sender=Product)
+def record_low_stock_on_delete(sender, instance, **kwargs):
+    if getattr(instance, '_was_low_stock', False):
+        threshold = instance.category.low_stock_threshold
+        record_low_stock_removal(
+            instance.pk, instance.stock, default_low_stock_threshold() if threshold is None else threshold
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_fragments(sender, instance, **kwargs):
+    bump_fragment_versions([CATEGORIES_FRAGMENT])
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    if sender.name != 'products':
+        return
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        ensure_sqlite_search_triggers(connection)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Product)
+def remember_saved_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    # The next save compares against what this one wrote.
+    if not raw:
+        names = None if update_fields is None else {*update_fields, *(f'{name}_id' for name in update_fields)}
+        instance.remember_state(names)
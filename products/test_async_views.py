@@ -0,0 +1,77 @@
+import json
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from products.models import Category, Product
+
+
+@pytest.mark.django_db
+@pytest.mark.urls('qualitydemo.asgi_urls')
+class TestAsyncReadApis:
+    def setup_method(self):
+        self.client = AsyncClient()
+        self.category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+        self.mouse = Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=5, category=self.category
+        )
+
+    def _get(self, path, data=None, **extra):
+        return async_to_sync(self.client.get)(path, data, **extra)
+
+    def test_product_api(self):
+        response = self._get(f'/api/products/{self.laptop.id}/')
+
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert data['category'] == 'Electronics'
+        assert data['status'] == 'In Stock'
+
+        response = self._get(
+            f'/api/products/{self.laptop.id}/', headers={'If-None-Match': response['ETag']}
+        )
+        assert response.status_code == 304
+
+    def test_product_api_cache_hit(self, settings, django_assert_num_queries):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        settings.PRODUCTS_API_CACHE_ENABLED = True
+        miss = self._get(f'/api/products/{self.laptop.id}/')
+
+        with django_assert_num_queries(0):
+            hit = self._get(f'/api/products/{self.laptop.id}/')
+        assert hit.content == miss.content
+        assert hit['ETag'] == miss['ETag']
+
+    def test_product_api_not_found(self):
+        assert self._get('/api/products/999/').status_code == 404
+
+    def test_product_list_api(self):
+        response = self._get('/api/products/list/', {'order': 'name', 'limit': 1})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Laptop']
+        assert data['next_cursor']
+
+    def test_product_batch_api(self):
+        response = self._get('/api/products/', {'ids': f'{self.mouse.id},999'})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Mouse']
+        assert data['missing'] == [999]
+
+    def test_category_products_count(self):
+        data = json.loads(self._get('/api/categories/count/').content)
+
+        assert data['categories'] == [{'category': 'Electronics', 'product_count': 2}]
+
+    def test_category_status_counts(self):
+        data = json.loads(self._get('/api/categories/status-counts/').content)
+
+        assert data['categories'] == [{
+            'category': 'Electronics', 'inactive': 0, 'out_of_stock': 0, 'low_stock': 1, 'in_stock': 1,
+        }]
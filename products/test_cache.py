@@ -0,0 +1,111 @@
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+
+from products.cache import get_api_cache_stats
+from products.models import Category, Product
+
+
+@pytest.fixture(params=[
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+])
+def api_cache(request, settings, tmp_path):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'products_api': {'BACKEND': request.param, 'LOCATION': str(tmp_path)},
+    }
+    settings.PRODUCTS_API_CACHE_ENABLED = True
+    settings.PRODUCTS_API_CACHE_ALIAS = 'products_api'
+    cache = caches['products_api']
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestProductApiCache:
+    def setup_method(self):
+        self.client = Client()
+
+    def _create_product(self):
+        self.category = Category.objects.create(name="Electronics")
+        return Product.objects.create(
+            name="Laptop",
+            price=Decimal("999.99"),
+            stock=10,
+            category=self.category
+        )
+
+    def _get(self, product):
+        return json.loads(self.client.get(f'/api/products/{product.id}/').content)
+
+    def test_second_request_is_served_from_cache(self, api_cache, django_assert_num_queries):
+        product = self._create_product()
+        self._get(product)
+
+        with django_assert_num_queries(0):
+            data = self._get(product)
+
+        assert data['name'] == 'Laptop'
+        stats = get_api_cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_hit_and_miss_send_identical_bodies(self, api_cache):
+        product = self._create_product()
+        miss = self.client.get(f'/api/products/{product.id}/')
+        hit = self.client.get(f'/api/products/{product.id}/')
+
+        assert hit.content == miss.content
+        assert hit['ETag'] == miss['ETag']
+        assert hit['Last-Modified'] == miss['Last-Modified']
+
+    def test_conditional_get_on_a_cache_hit(self, api_cache, django_assert_num_queries):
+        product = self._create_product()
+        etag = self.client.get(f'/api/products/{product.id}/')['ETag']
+
+        with django_assert_num_queries(0):
+            response = self.client.get(f'/api/products/{product.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        product.stock = 3
+        product.save()
+        assert self.client.get(f'/api/products/{product.id}/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_product_save_invalidates(self, api_cache):
+        product = self._create_product()
+        self._get(product)
+
+        product.stock = 0
+        product.save()
+
+        assert self._get(product)['status'] == 'Out of Stock'
+
+    def test_product_delete_invalidates(self, api_cache):
+        product = self._create_product()
+        self._get(product)
+
+        product.delete()
+
+        assert self.client.get(f'/api/products/{product.id}/').status_code == 404
+
+    def test_category_rename_invalidates(self, api_cache):
+        product = self._create_product()
+        self._get(product)
+
+        self.category.name = "Computers"
+        self.category.save()
+
+        assert self._get(product)['category'] == 'Computers'
+
+    def test_disabled_by_default(self, settings):
+        settings.PRODUCTS_API_CACHE_ENABLED = False
+        product = self._create_product()
+        self._get(product)
+
+        response = self.client.get('/api/cache/stats/')
+
+        assert json.loads(response.content)['enabled'] is False
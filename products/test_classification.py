@@ -0,0 +1,109 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from products.classification import PRODUCT_CLASSIFICATION, classify_products
+from products.helpers import ProductHelper, analyze_product_details
+from products.models import Category, Product
+
+MONDAY = datetime.datetime(2026, 10, 12, 10, 0)
+SUNDAY = datetime.datetime(2026, 10, 18, 10, 0)
+
+
+@pytest.mark.django_db
+class TestProductClassification:
+    def setup_method(self):
+        self.electronics = Category.objects.create(name="Electronics")
+        self.office = Category.objects.create(name="Office")
+
+    def create_product(self, name="Laptop", price="999.99", stock=20, category=None, **kwargs):
+        return Product.objects.create(
+            name=name,
+            price=Decimal(price),
+            stock=stock,
+            category=category or self.electronics,
+            **kwargs
+        )
+
+    def classify(self, product, now=MONDAY):
+        return PRODUCT_CLASSIFICATION.classify(product, now)
+
+    def test_premium_laptop_on_a_weekday(self):
+        assert self.classify(self.create_product()) == {
+            'category_type': 'electronics',
+            'priority': 1,
+            'tier': 'premium',
+            'availability': 'high',
+            'promotion_eligible': True,
+            'business_hours': True,
+            'final_status': 'available',
+        }
+
+    def test_premium_laptop_on_the_weekend(self):
+        result = self.classify(self.create_product(), now=SUNDAY)
+
+        assert result['business_hours'] is False
+        assert result['final_status'] == 'weekend'
+
+    def test_inactive_laptop(self):
+        assert self.classify(self.create_product(is_active=False))['final_status'] == 'inactive'
+
+    def test_laptop_branches_stop_early(self):
+        assert self.classify(self.create_product(price="300.00")) == {
+            'category_type': 'electronics', 'priority': 1, 'tier': 'basic',
+        }
+        assert self.classify(self.create_product(stock=5))['availability'] == 'low'
+        assert 'business_hours' not in self.classify(self.create_product(stock=5))
+
+        result = self.classify(self.create_product(category=self.office))
+        assert result['promotion_eligible'] is False
+        assert 'final_status' not in result
+
+    def test_other_names(self):
+        assert self.classify(self.create_product(name="Mouse")) == {'category_type': 'accessories', 'priority': 2}
+        assert self.classify(self.create_product(name="Keyboard")) == {'category_type': 'accessories', 'priority': 2}
+        assert self.classify(self.create_product(name="Monitor")) == {'category_type': 'other', 'priority': 3}
+
+    def test_only_laptops_load_the_category(self, django_assert_num_queries):
+        mouse = Product.objects.get(pk=self.create_product(name="Mouse").pk)
+        laptop = Product.objects.get(pk=self.create_product().pk)
+
+        with django_assert_num_queries(0):
+            self.classify(mouse)
+        with django_assert_num_queries(1):
+            self.classify(laptop)
+
+    def test_is_active_is_a_truthy_test(self):
+        product = self.create_product()
+        product.is_active = 1
+
+        assert self.classify(product)['final_status'] == 'available'
+
+    def test_helpers_delegate_to_the_engine(self):
+        product = self.create_product()
+
+        assert ProductHelper().process_product_data(product) == PRODUCT_CLASSIFICATION.classify(product)
+        assert analyze_product_details(product) == PRODUCT_CLASSIFICATION.classify(product)
+
+    def test_classify_products_matches_single_classification(self, django_assert_num_queries):
+        products = [
+            self.create_product(),
+            self.create_product(is_active=False),
+            self.create_product(category=self.office),
+            self.create_product(stock=1),
+            self.create_product(name="Mouse"),
+            self.create_product(name="Desk", category=self.office),
+        ]
+
+        with django_assert_num_queries(1):
+            results = dict(classify_products(now=SUNDAY))
+
+        assert results == {product.id: self.classify(product, now=SUNDAY) for product in products}
+
+    def test_results_are_independent_copies(self):
+        product = self.create_product(name="Mouse")
+
+        self.classify(product)['priority'] = 99
+
+        assert self.classify(product)['priority'] == 2
@@ -0,0 +1,78 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from products.models import Category, Product
+
+
+@pytest.mark.django_db
+class TestReconcileCategoryCounts:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+        Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=5, category=self.category
+        )
+        # Queryset updates bypass the signals and let the rollup drift.
+        Category.objects.update(product_count=7)
+
+    def test_reconcile_fixes_drift(self):
+        out = StringIO()
+        call_command('reconcile_category_counts', stdout=out)
+
+        self.category.refresh_from_db()
+        assert self.category.product_count == 2
+        assert "Electronics: 7 -> 2" in out.getvalue()
+
+    def test_reconcile_dry_run(self):
+        call_command('reconcile_category_counts', '--dry-run', stdout=StringIO())
+
+        self.category.refresh_from_db()
+        assert self.category.product_count == 7
+
+
+@pytest.mark.django_db
+class TestChangePricesCommand:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+        self.inactive = Product.objects.create(
+            name="Old Laptop", price=Decimal("499.99"), stock=0,
+            category=self.category, is_active=False,
+        )
+
+    def test_change_prices_active_only(self):
+        out = StringIO()
+        call_command('change_prices', '--percent', '-10', stdout=out)
+
+        self.laptop.refresh_from_db()
+        self.inactive.refresh_from_db()
+        assert self.laptop.price == Decimal("899.99")
+        assert self.inactive.price == Decimal("499.99")
+        assert "1 product(s) updated, 0 skipped" in out.getvalue()
+
+    def test_change_prices_invalid_amount(self):
+        with pytest.raises(CommandError):
+            call_command('change_prices', '--amount', 'ten', stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestClassifyProductsCommand:
+    def test_classify_products_writes_ndjson(self):
+        electronics = Category.objects.create(name="Electronics")
+        office = Category.objects.create(name="Office")
+        mouse = Product.objects.create(name="Mouse", price=Decimal("25.99"), stock=5, category=electronics)
+        Product.objects.create(name="Desk", price=Decimal("199.99"), stock=2, category=office)
+
+        out = StringIO()
+        call_command('classify_products', '--category', str(electronics.id), stdout=out)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert lines == [{'id': mouse.id, 'category_type': 'accessories', 'priority': 2}]
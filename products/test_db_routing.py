@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError
+from django.db import router as django_router
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+
+from products import db_routing
+from products.db_routing import (
+    PIN_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaLagMonitor,
+    replica_pinning_middleware,
+    request_routing,
+    sqlite_lag,
+)
+from products.models import Category, Product, ProductInteraction
+from products.serializers import PRODUCT_SERIALIZER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica_1', 'replica_2']
+    settings.DATABASE_REPLICA_APPS = ['products']
+    settings.DATABASE_REPLICA_MAX_LAG = 5
+    settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL = 10
+    return settings
+
+
+@pytest.fixture
+def lags():
+    return {'replica_1': 0.0, 'replica_2': 0.0}
+
+
+@pytest.fixture
+def router(replicas, lags):
+    def measure(alias):
+        if isinstance(lags[alias], Exception):
+            raise lags[alias]
+        return lags[alias]
+
+    return PrimaryReplicaRouter(ReplicaLagMonitor(measure, clock=FakeClock()))
+
+
+class TestPrimaryReplicaRouter:
+    def test_reads_outside_requests_use_the_primary(self, router):
+        assert router.db_for_read(Product) is None
+
+    def test_reads_alternate_between_replicas(self, router):
+        with request_routing():
+            assert [router.db_for_read(Product) for _ in range(3)] == ['replica_1', 'replica_2', 'replica_1']
+
+    def test_only_replicated_apps_read_from_replicas(self, router):
+        with request_routing():
+            assert router.db_for_read(Session) is None
+
+    def test_write_pins_the_rest_of_the_request(self, router):
+        with request_routing() as state:
+            assert router.db_for_write(Product) == 'default'
+            assert router.db_for_read(Product) is None
+            assert state.wrote is True
+
+    @pytest.mark.django_db
+    def test_replica_loaded_instances_are_saved_on_the_primary(self, router, monkeypatch):
+        monkeypatch.setattr(django_router, 'routers', [router])
+        category = Category.objects.create(name="Electronics")
+        product = Product.objects.create(name="Laptop", price=Decimal("999.99"), stock=5, category=category)
+        product._state.db = 'replica_1'
+
+        with request_routing():
+            assert router.db_for_write(Product, instance=product) == 'default'
+            product.stock = 4
+            product.save()
+
+        assert Product.objects.get(pk=product.pk).stock == 4
+
+    def test_recorded_views_do_not_pin(self, router):
+        with request_routing() as state:
+            router.db_for_write(ProductInteraction)
+            assert router.db_for_read(Product) == 'replica_1'
+            assert state.wrote is False
+
+    def test_lagging_or_failing_replicas_are_skipped(self, router, lags):
+        lags['replica_1'] = 30.0
+        lags['replica_2'] = DatabaseError("replica down")
+
+        with request_routing():
+            assert router.db_for_read(Product) is None
+
+    def test_lag_is_rechecked_after_the_interval(self, router, lags):
+        monitor = router.monitor
+        lags['replica_1'] = 30.0
+        assert monitor.is_healthy('replica_1') is False
+
+        lags['replica_1'] = 0.0
+        monitor.clock.now = 9
+        assert monitor.is_healthy('replica_1') is False
+        monitor.clock.now = 10
+        assert monitor.is_healthy('replica_1') is True
+
+    def test_lag_is_not_measured_on_the_event_loop(self, replicas):
+        measured = threading.Event()
+        threads = []
+
+        def measure(alias):
+            threads.append(threading.current_thread())
+            measured.set()
+            return 0.0
+
+        monitor = ReplicaLagMonitor(measure, clock=FakeClock())
+
+        async def check():
+            return monitor.is_healthy('replica_1')
+
+        assert async_to_sync(check)() is False
+        assert measured.wait(5)
+        assert threads[0] is not threading.current_thread()
+        for _ in range(100):
+            if async_to_sync(check)():
+                break
+            time.sleep(0.01)
+        assert async_to_sync(check)() is True
+        assert len(threads) == 1
+
+    def test_migrations_skip_replicas(self, router):
+        assert router.allow_migrate('replica_1', 'products') is False
+        assert router.allow_migrate('default', 'products') is None
+
+
+def test_sqlite_lag(tmp_path):
+    primary, replica = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+    primary.touch()
+    replica.touch()
+    os.utime(primary, (1000, 1000))
+    os.utime(replica, (990, 990))
+
+    assert sqlite_lag(primary, replica, now=1000) == 10
+    os.utime(replica, (1010, 1010))
+    assert sqlite_lag(primary, replica, now=1020) == 0
+
+
+def test_sqlite_lag_grows_while_the_replica_is_not_refreshed(tmp_path):
+    primary, replica = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+    primary.touch()
+    replica.touch()
+    # Copied, then one more write to the primary a second later.
+    os.utime(replica, (1000, 1000))
+    os.utime(primary, (1001, 1001))
+
+    assert sqlite_lag(primary, replica, now=1002) == 2
+    assert sqlite_lag(primary, replica, now=1060) == 60
+
+
+class TestReplicaPinningMiddleware:
+    def setup_method(self):
+        self.factory = RequestFactory()
+
+    def view(self, write=False):
+        def get_response(request):
+            state = db_routing._request_routing.get()
+            if write:
+                PrimaryReplicaRouter().db_for_write(Product)
+            return HttpResponse('pinned' if state.pinned else 'replica')
+        return get_response
+
+    def test_reads_are_not_pinned(self, replicas):
+        response = replica_pinning_middleware(self.view())(self.factory.get('/'))
+
+        assert response.content == b'replica'
+        assert PIN_COOKIE not in response.cookies
+
+    def test_write_sets_the_pin_cookie(self, replicas):
+        replicas.DATABASE_PRIMARY_PIN_SECONDS = 10
+
+        response = replica_pinning_middleware(self.view(write=True))(self.factory.post('/'))
+
+        assert response.content == b'pinned'
+        assert response.cookies[PIN_COOKIE]['max-age'] == 10
+
+    def test_pin_cookie_pins_later_reads(self, replicas):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+
+        assert replica_pinning_middleware(self.view())(request).content == b'pinned'
+
+    def test_async_requests(self, replicas):
+        async def get_response(request):
+            return self.view(write=True)(request)
+
+        response = async_to_sync(replica_pinning_middleware(get_response))(self.factory.get('/'))
+
+        assert response.content == b'pinned'
+        assert PIN_COOKIE in response.cookies
+
+
+# Outside a test transaction: the router keeps reads in transactions on the primary.
+@pytest.mark.django_db(transaction=True)
+class TestCachedReadsUseThePrimary:
+    """Data cached under a freshly bumped version must not come from a lagging replica."""
+
+    def setup_method(self):
+        category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(name="Laptop", price=Decimal("999.99"), stock=5, category=category)
+
+    def test_fragment_querysets(self, settings, monkeypatch):
+        client = Client()
+        categories = client.get('/').context['categories']
+        related = client.get(f'/product/{self.product.pk}/').context['related_products']
+
+        settings.DATABASE_REPLICAS = ['replica_1']
+        monkeypatch.setattr(django_router, 'routers', [PrimaryReplicaRouter(ReplicaLagMonitor(lambda alias: 0.0))])
+        with request_routing():
+            assert Category.objects.all().db == 'replica_1'
+            assert categories.db == related.db == 'default'
+
+    def test_product_api_cache_miss(self, settings, monkeypatch):
+        settings.PRODUCTS_API_CACHE_ENABLED = True
+        reads = []
+        first = PRODUCT_SERIALIZER.first
+
+        def spy(**kwargs):
+            reads.append(kwargs.get('using'))
+            return first(**kwargs)
+
+        monkeypatch.setattr(PRODUCT_SERIALIZER, 'first', spy)
+        client = Client()
+        assert client.get(f'/api/products/{self.product.pk}/').status_code == 200
+        assert client.get(f'/api/products/{self.product.pk}/').status_code == 200
+
+        assert reads == ['default']
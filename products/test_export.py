@@ -0,0 +1,81 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from products.export import parse_updated_since
+from products.models import Category, Product
+
+
+@pytest.mark.django_db
+class TestCatalogExport:
+    def setup_method(self):
+        self.client = Client()
+        category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Laptop", description='15" screen, backlit',
+            price=Decimal("999.99"), stock=10, category=category
+        )
+        self.mouse = Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=5, category=category
+        )
+        Product.objects.create(
+            name="Old Mouse", price=Decimal("5.00"), stock=1,
+            category=category, is_active=False
+        )
+
+    def _content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/products/export/')
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        assert [row['name'] for row in rows] == ['Laptop', 'Mouse']
+        assert rows[0]['price'] == '999.99'
+        assert rows[1]['status'] == 'Low Stock'
+
+    def test_csv_export_gzip(self):
+        response = self.client.get('/api/products/export/', {'format': 'csv', 'gzip': '1'})
+
+        assert response['Content-Encoding'] == 'gzip'
+        text = gzip.decompress(self._content(response)).decode()
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [row['name'] for row in rows] == ['Laptop', 'Mouse']
+        assert rows[0]['description'] == '15" screen, backlit'
+
+    def test_updated_since_filter(self):
+        Product.objects.filter(pk=self.laptop.pk).update(
+            updated_at=timezone.now() - datetime.timedelta(days=10)
+        )
+        since = (timezone.now() - datetime.timedelta(days=1)).date().isoformat()
+
+        response = self.client.get('/api/products/export/', {'updated_since': since})
+
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        assert [row['name'] for row in rows] == ['Mouse']
+
+    def test_invalid_parameters(self):
+        assert self.client.get('/api/products/export/', {'format': 'xml'}).status_code == 400
+        assert self.client.get('/api/products/export/', {'updated_since': 'soon'}).status_code == 400
+
+    def test_export_command_writes_file(self, tmp_path):
+        output = tmp_path / 'catalog.csv.gz'
+
+        call_command('export_catalog', '--format', 'csv', '--gzip', '--output', str(output))
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(output.read_bytes()).decode())))
+        assert len(rows) == 2
+
+    def test_parse_updated_since_defaults_to_utc(self):
+        parsed = parse_updated_since('2025-01-02T03:04:05')
+
+        assert parsed == datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from products.feeds import new_products_since, recent_products_page
+from products.models import Category, Product
+from products.pagination import InvalidCursor
+
+
+@pytest.mark.django_db
+class TestRecentProductsFeed:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.products = [self.create_product(f"Product {i}") for i in range(5)]
+
+    def create_product(self, name, **kwargs):
+        return Product.objects.create(
+            name=name,
+            price=Decimal("10.00"),
+            stock=20,
+            category=self.category,
+            **kwargs
+        )
+
+    def test_pages_newest_first(self):
+        page, since_cursor = recent_products_page(limit=2)
+
+        assert [p.name for p in page] == ["Product 4", "Product 3"]
+        assert since_cursor is not None
+
+        page, next_since = recent_products_page(page.next_cursor, limit=2)
+        assert [p.name for p in page] == ["Product 2", "Product 1"]
+        assert next_since is None
+
+        page, _ = recent_products_page(page.next_cursor, limit=2)
+        assert [p.name for p in page] == ["Product 0"]
+        assert page.next_cursor is None
+
+    def test_skips_old_and_inactive_products(self):
+        old = self.create_product("Old")
+        Product.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        self.create_product("Hidden", is_active=False)
+
+        page, _ = recent_products_page(limit=10)
+
+        assert [p.name for p in page] == [f"Product {i}" for i in range(4, -1, -1)]
+
+    def test_new_products_since_returns_only_newer_rows(self):
+        _, since_cursor = recent_products_page(limit=2)
+
+        page, same_cursor = new_products_since(since_cursor)
+        assert list(page) == []
+        assert same_cursor == since_cursor
+
+        self.create_product("New 1")
+        self.create_product("New 2")
+        self.create_product("New 3")
+
+        page, since_cursor = new_products_since(since_cursor, limit=2)
+        assert [p.name for p in page] == ["New 1", "New 2"]
+
+        page, since_cursor = new_products_since(since_cursor, limit=2)
+        assert [p.name for p in page] == ["New 3"]
+
+        page, _ = new_products_since(since_cursor)
+        assert list(page) == []
+
+    def test_rejects_cursor_from_the_other_direction(self):
+        page, since_cursor = recent_products_page(limit=2)
+
+        with pytest.raises(InvalidCursor):
+            new_products_since(page.next_cursor)
+        with pytest.raises(InvalidCursor):
+            recent_products_page(since_cursor)
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+import pytest
+from django.test import Client
+
+from products.inventory import (
+    INSUFFICIENT_STOCK,
+    PRODUCT_NOT_FOUND,
+    STOCK_CHANGED,
+    InsufficientStock,
+    apply_stock_changes,
+    change_stock,
+)
+from products.models import Category, Product
+from products.utils import InventoryManager
+
+
+@pytest.mark.django_db
+class TestStockChanges:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+        self.mouse = Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=2, category=self.category
+        )
+
+    def test_change_stock_uses_database_value(self, django_assert_num_queries):
+        stale = Product.objects.get(pk=self.laptop.pk)
+        change_stock(self.laptop, -3)
+
+        # A stale instance neither loses the first update nor oversells.
+        # UPDATE, low-stock check and refresh, plus the SAVEPOINT/RELEASE
+        # pair of the test transaction.
+        with django_assert_num_queries(5):
+            change_stock(stale, -7)
+        assert stale.stock == 0
+        with pytest.raises(InsufficientStock):
+            change_stock(stale, -1)
+
+        self.laptop.refresh_from_db()
+        assert self.laptop.stock == 0
+
+    def test_change_stock_rejects_zero(self):
+        with pytest.raises(ValueError):
+            change_stock(self.laptop, 0)
+
+    def test_apply_stock_changes_reports_each_item(self, django_assert_num_queries):
+        # Locking SELECT, one UPDATE and the low-stock check, plus SAVEPOINT/RELEASE.
+        with django_assert_num_queries(5):
+            results = apply_stock_changes([
+                (self.laptop, -4),
+                (self.mouse, -3),
+                (self.mouse.pk, 5),
+                (self.mouse, -3),
+                (999, 1),
+            ])
+
+        assert [result['status'] for result in results] == [
+            STOCK_CHANGED, INSUFFICIENT_STOCK, STOCK_CHANGED, STOCK_CHANGED, PRODUCT_NOT_FOUND,
+        ]
+        assert dict(Product.objects.values_list('name', 'stock')) == {'Laptop': 6, 'Mouse': 4}
+
+    def test_stock_change_refreshes_rendered_status(self):
+        client = Client()
+        assert b'Low Stock' in client.get(f'/product/{self.mouse.pk}/').content
+
+        change_stock(self.mouse, -2)
+
+        assert b'Out of Stock' in client.get(f'/product/{self.mouse.pk}/').content
+
+
+@pytest.mark.django_db
+class TestInventoryManagerStock:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=5, category=self.category
+        )
+        self.inventory = InventoryManager()
+
+    def test_remove_stock_insufficient(self):
+        with pytest.raises(ValueError):
+            self.inventory.remove_stock(self.product, 6)
+
+        self.product.refresh_from_db()
+        assert self.product.stock == 5
+        assert self.inventory.get_operation_history() == []
+
+    def test_remove_stock_only_writes_stock(self):
+        self.product.name = "Unsaved rename"
+        self.inventory.remove_stock(self.product, 2)
+
+        assert self.product.stock == 3
+        assert Product.objects.get(pk=self.product.pk).name == "Laptop"
+
+    def test_apply_stock_changes_records_applied_items(self):
+        results = self.inventory.apply_stock_changes([(self.product, -2), (self.product, -9)])
+
+        assert [result['status'] for result in results] == [STOCK_CHANGED, INSUFFICIENT_STOCK]
+        history = self.inventory.get_operation_history()
+        assert [(entry['type'], entry['quantity']) for entry in history] == [('remove', 2)]
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import DataError, OperationalError
+from django.utils import timezone
+
+from products import ledger
+from products.inventory import apply_stock_changes, change_stock
+from products.ledger import StockMovementBuffer, get_stock_history
+from products.models import Category, Product, StockMovement
+from products.utils import InventoryManager
+
+
+@pytest.fixture
+def write_through(settings, monkeypatch):
+    settings.PRODUCTS_STOCK_LEDGER_BUFFER_SIZE = 1
+    monkeypatch.setattr(ledger, '_buffer', None)
+
+
+@pytest.mark.django_db
+class TestStockLedger:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+
+    def test_movements_written_on_commit(self, write_through, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            change_stock(self.product, -3)
+            apply_stock_changes([(self.product, 5), (self.product, -50)])
+
+        assert [m.quantity for m in get_stock_history(self.product.pk)] == [5, -3]
+
+    def test_rolled_back_changes_are_not_recorded(self, write_through, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            change_stock(self.product, -3)
+        # The test transaction never commits, so nothing is handed over.
+        assert StockMovement.objects.count() == 0
+        assert len(callbacks) == 1
+
+    def test_buffer_flushes_on_size(self):
+        buffer = StockMovementBuffer(max_size=3, max_age=3600)
+        buffer.add([StockMovement(product=self.product, quantity=1) for _ in range(2)])
+        assert StockMovement.objects.count() == 0
+
+        buffer.add([StockMovement(product=self.product, quantity=1)])
+        assert StockMovement.objects.count() == 3
+        assert len(buffer) == 0
+
+    def test_failed_flush_keeps_movements(self, monkeypatch):
+        buffer = StockMovementBuffer(max_size=100, max_age=3600)
+        buffer.add([StockMovement(product=self.product, quantity=quantity) for quantity in (1, 2)])
+
+        def locked(*args, **kwargs):
+            raise OperationalError("database is locked")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(StockMovement.objects, 'bulk_create', locked)
+            assert buffer.flush() == 0
+        assert len(buffer) == 2
+
+        assert buffer.flush() == 2
+        assert sorted(StockMovement.objects.values_list('quantity', flat=True)) == [1, 2]
+
+    def test_buffer_is_capped_while_flushes_fail(self, monkeypatch):
+        buffer = StockMovementBuffer(max_size=2, max_age=3600, max_pending=3)
+
+        def locked(*args, **kwargs):
+            raise OperationalError("database is locked")
+
+        monkeypatch.setattr(StockMovement.objects, 'bulk_create', locked)
+        for quantity in range(1, 6):
+            buffer.add([StockMovement(product=self.product, quantity=quantity)])
+        buffer.flush()
+
+        assert [m.quantity for m in buffer._pending] == [3, 4, 5]
+
+    def test_rejected_rows_are_not_retried(self, monkeypatch):
+        buffer = StockMovementBuffer(max_size=100, max_age=3600)
+        buffer.add([StockMovement(product=self.product, quantity=quantity) for quantity in (1, 2)])
+
+        def rejected(*args, **kwargs):
+            raise DataError("value out of range")
+
+        monkeypatch.setattr(StockMovement.objects, 'bulk_create', rejected)
+        monkeypatch.setattr(StockMovement, 'save', rejected)
+        assert buffer.flush() == 0
+        assert len(buffer) == 0
+
+    def test_history_time_range(self):
+        now = timezone.now()
+        StockMovement.objects.bulk_create([
+            StockMovement(product=self.product, quantity=quantity, created_at=now - timedelta(days=days))
+            for quantity, days in ((1, 10), (2, 5), (3, 1))
+        ])
+
+        history = get_stock_history(self.product.pk, since=now - timedelta(days=7), until=now - timedelta(days=2))
+        assert [m.quantity for m in history] == [2]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStockLedgerFlushes:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+
+    def test_buffer_flushes_on_age_without_further_writes(self):
+        buffer = StockMovementBuffer(max_size=100, max_age=0.01)
+        buffer.add([StockMovement(product=self.product, quantity=1)])
+        timer = buffer._timer
+        assert StockMovement.objects.count() == 0
+
+        timer.join(timeout=5)
+        assert StockMovement.objects.count() == 1
+        assert len(buffer) == 0
+
+    def test_rows_for_deleted_products_are_dropped_alone(self):
+        doomed = Product.objects.create(name="Mouse", price=Decimal("9.99"), stock=10, category=self.category)
+        buffer = StockMovementBuffer(max_size=100, max_age=3600)
+        buffer.add([
+            StockMovement(product=self.product, quantity=1),
+            StockMovement(product_id=doomed.pk, quantity=2),
+            StockMovement(product=self.product, quantity=3),
+        ])
+        doomed.delete()
+
+        assert buffer.flush() == 2
+        assert len(buffer) == 0
+        assert sorted(StockMovement.objects.values_list('quantity', flat=True)) == [1, 3]
+
+
+@pytest.mark.django_db
+class TestInventoryManagerHistory:
+    def test_history_is_bounded(self):
+        category = Category.objects.create(name="Electronics")
+        product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=0, category=category
+        )
+        inventory = InventoryManager(history_size=3)
+
+        for quantity in range(1, 6):
+            inventory.add_stock(product, quantity)
+
+        assert [entry['quantity'] for entry in inventory.get_operation_history()] == [3, 4, 5]
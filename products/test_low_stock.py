@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+
+from products.inventory import apply_stock_changes, change_stock
+from products.low_stock import get_low_stock_events, sync_low_stock
+from products.models import Category, LowStockEvent, Product
+from products.utils import InventoryManager, ProductUtils
+
+
+def feed(after=0):
+    return [(event.product_id, event.kind) for event in get_low_stock_events(after)]
+
+
+@pytest.mark.django_db
+class TestLowStockWatchlist:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=50, category=self.category
+        )
+        self.mouse = Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=5, category=self.category
+        )
+
+    def low_stock(self):
+        return set(ProductUtils.get_low_stock_products().values_list('name', flat=True))
+
+    def test_new_products_are_classified(self):
+        assert self.low_stock() == {"Mouse"}
+        assert feed() == [(self.mouse.pk, LowStockEvent.ENTERED)]
+
+    def test_stock_changes_cross_the_threshold(self):
+        cursor = get_low_stock_events()[-1].pk
+
+        InventoryManager().remove_stock(self.laptop, 45)
+        apply_stock_changes([(self.mouse, 20)])
+        change_stock(self.laptop, -1)
+
+        assert self.low_stock() == {"Laptop"}
+        assert feed(cursor) == [
+            (self.laptop.pk, LowStockEvent.ENTERED),
+            (self.mouse.pk, LowStockEvent.LEFT),
+        ]
+
+    def test_saves_and_deletes_update_the_set(self):
+        cursor = get_low_stock_events()[-1].pk
+
+        self.mouse.is_active = False
+        self.mouse.save()
+        self.laptop.stock = 3
+        self.laptop.save()
+        laptop_id = self.laptop.pk
+        self.laptop.delete()
+
+        assert self.low_stock() == set()
+        assert feed(cursor) == [
+            (self.mouse.pk, LowStockEvent.LEFT),
+            (laptop_id, LowStockEvent.ENTERED),
+            (laptop_id, LowStockEvent.LEFT),
+        ]
+
+    def test_category_threshold_override(self):
+        self.category.low_stock_threshold = 60
+        self.category.save()
+        assert self.low_stock() == {"Laptop", "Mouse"}
+
+        self.category.low_stock_threshold = 1
+        self.category.save()
+        assert self.low_stock() == set()
+        assert LowStockEvent.objects.filter(kind=LowStockEvent.LEFT).count() == 2
+
+    def test_explicit_threshold_still_scans(self):
+        assert set(ProductUtils.get_low_stock_products(threshold=60)) == {self.laptop, self.mouse}
+
+    def test_sync_without_changes_is_a_single_query(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert sync_low_stock() == []
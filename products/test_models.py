@@ -1,7 +1,9 @@
 import pytest
 from decimal import Decimal
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from products.models import Category, Product
 
 
@@ -118,4 +120,135 @@ def test_get_status_method(self):
         assert inactive_product.get_status() == "Inactive"
         assert out_of_stock_product.get_status() == "Out of Stock"
         assert low_stock_product.get_status() == "Low Stock"
-        assert in_stock_product.get_status() == "In Stock"
\ No newline at end of file
+        assert in_stock_product.get_status() == "In Stock"
+
+
+@pytest.mark.django_db
+class TestCategoryProductCount:
+    def setup_method(self):
+        self.electronics = Category.objects.create(name="Electronics")
+        self.books = Category.objects.create(name="Books")
+
+    def _counts(self):
+        self.electronics.refresh_from_db()
+        self.books.refresh_from_db()
+        return self.electronics.product_count, self.books.product_count
+
+    def test_create_and_delete(self):
+        product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.electronics
+        )
+        Product.objects.create(
+            name="Old Laptop", price=Decimal("99.99"), stock=1,
+            category=self.electronics, is_active=False
+        )
+        assert self._counts() == (1, 0)
+
+        product.delete()
+        assert self._counts() == (0, 0)
+
+    def test_deactivate_and_reactivate(self):
+        product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.electronics
+        )
+        product.is_active = False
+        product.save()
+        assert self._counts() == (0, 0)
+
+        product.is_active = True
+        product.save()
+        assert self._counts() == (1, 0)
+
+    def test_move_category(self):
+        product = Product.objects.create(
+            name="Manual", price=Decimal("9.99"), stock=10, category=self.electronics
+        )
+        product.category = self.books
+        product.save()
+        assert self._counts() == (0, 1)
+
+        product.name = "User Manual"
+        product.save()
+        assert self._counts() == (0, 1)
+
+    def test_saves_compare_with_the_loaded_state(self):
+        Product.objects.create(name="Manual", price=Decimal("9.99"), stock=10, category=self.electronics)
+        product = Product.objects.get()
+        product.category = self.books
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+        assert self._counts() == (0, 1)
+        assert not any(
+            query['sql'].startswith('SELECT "products_product"."category_id", "products_product"."is_active"')
+            for query in queries
+        )
+
+    def test_refresh_updates_the_loaded_state(self):
+        product = Product.objects.create(name="Manual", price=Decimal("9.99"), stock=10, category=self.electronics)
+        Product.objects.filter(pk=product.pk).update(is_active=False)
+        product.refresh_from_db(fields=['is_active'])
+
+        product.is_active = True
+        product.save()
+        assert product.loaded_state()['is_active'] is True
+        # The counter was not touched by the queryset update, so the
+        # reactivation adds one on top.
+        assert self._counts() == (2, 0)
+
+    def test_unsaved_fields_are_not_remembered(self):
+        product = Product.objects.create(name="Manual", price=Decimal("9.99"), stock=10, category=self.electronics)
+        product.is_active = False
+        product.save(update_fields=['name'])
+
+        assert product.loaded_state()['is_active'] is True
+
+
+@pytest.mark.django_db
+class TestProductStatusQueries:
+    def setup_method(self):
+        self.electronics = Category.objects.create(name="Electronics")
+        self.books = Category.objects.create(name="Books")
+        for name, stock, active, category in (
+            ("Old Laptop", 20, False, self.electronics),
+            ("Cable", 0, True, self.electronics),
+            ("Mouse", 9, True, self.electronics),
+            ("Laptop", 10, True, self.electronics),
+            ("Manual", 1, True, self.books),
+        ):
+            Product.objects.create(
+                name=name, price=Decimal("10.00"), stock=stock, is_active=active, category=category
+            )
+
+    def test_with_status_matches_get_status(self):
+        for product in Product.objects.with_status():
+            assert product.status == product.get_status()
+
+    def test_filter_status(self):
+        def names(*statuses):
+            return set(Product.objects.filter_status(*statuses).values_list('name', flat=True))
+
+        assert names('inactive') == {"Old Laptop"}
+        assert names('out_of_stock') == {"Cable"}
+        assert names('low_stock') == {"Mouse", "Manual"}
+        assert names('in_stock') == {"Laptop"}
+        assert names('out_of_stock', 'low_stock') == {"Cable", "Mouse", "Manual"}
+
+    def test_filter_status_rejects_unknown_status(self):
+        with pytest.raises(ValueError):
+            Product.objects.filter_status('sold_out')
+
+    def test_status_counts_by_category(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            rows = list(Product.objects.status_counts_by_category())
+
+        assert rows == [
+            {
+                'category_id': self.electronics.id, 'category__name': "Electronics",
+                'inactive': 1, 'out_of_stock': 1, 'low_stock': 1, 'in_stock': 1,
+            },
+            {
+                'category_id': self.books.id, 'category__name': "Books",
+                'inactive': 0, 'out_of_stock': 0, 'low_stock': 1, 'in_stock': 0,
+            },
+        ]
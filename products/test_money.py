@@ -0,0 +1,121 @@
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal, localcontext
+
+import pytest
+
+from products.helpers import ProductHelper
+from products.models import Category, Product
+from products.money import ROUNDING_MODES, Money, MoneyArray, round_division
+
+
+class TestRoundDivision:
+    @pytest.mark.parametrize('rounding', ROUNDING_MODES)
+    def test_matches_decimal_quantize(self, rounding):
+        for numerator in range(-25, 26):
+            for denominator in (1, 2, 3, 4, 10, -4):
+                with localcontext() as context:
+                    context.prec = 50
+                    expected = (Decimal(numerator) / denominator).quantize(Decimal(1), rounding=rounding)
+                assert round_division(numerator, denominator, rounding) == int(expected)
+
+    def test_unknown_rounding_mode(self):
+        with pytest.raises(ValueError):
+            round_division(1, 2, 'ROUND_SIDEWAYS')
+
+
+class TestMoney:
+    def test_decimal_round_trip(self):
+        money = Money.from_decimal(Decimal('19.99'))
+        assert money.cents == 1999
+        assert str(money.to_decimal()) == '19.99'
+        assert str(money) == '$19.99'
+
+    def test_explicit_rounding(self):
+        assert Money.from_decimal('0.125').cents == 12
+        assert Money.from_decimal('0.125', ROUND_HALF_UP).cents == 13
+        assert Money.from_decimal(0.1).cents == 10
+
+    def test_arithmetic_stays_in_cents(self):
+        laptop = Money.from_decimal('999.99')
+        mouse = Money.from_decimal('25.99')
+        assert laptop + mouse == Money(102598)
+        assert laptop - mouse == Money(97400)
+        assert mouse * 3 == 3 * mouse == Money(7797)
+        assert mouse < laptop
+
+    def test_rates_round_to_cents(self):
+        price = Money.from_decimal('19.99')
+        assert price.percentage(21) == Money(420)
+        assert price.multiply('1.21') == Money(2419)
+        assert price.apply_discount(15, ROUND_DOWN) == Money(1700)
+
+    def test_rejects_non_integer_cents(self):
+        with pytest.raises(TypeError):
+            Money(Decimal('1.50'))
+        with pytest.raises(TypeError):
+            Money(150) + Decimal(1)
+
+    def test_has_no_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Money(1).currency = 'EUR'
+
+
+class TestMoneyArray:
+    def test_bulk_math_matches_scalar(self):
+        prices = [Decimal('999.99'), Decimal('25.99'), Decimal('0.05')]
+        amounts = MoneyArray.from_decimals(prices)
+
+        discounted = amounts.apply_discount(12.5)
+        assert list(discounted) == [Money.from_decimal(p).apply_discount(12.5) for p in prices]
+        assert amounts.multiply(2) == MoneyArray([199998, 5198, 10])
+        assert amounts.total() == Money(102603)
+        assert amounts.to_decimals() == prices
+        assert amounts[1:].total() == Money(2604)
+
+    def test_half_even_is_the_default(self):
+        amounts = MoneyArray([5, 15])
+        assert amounts.multiply('0.1') == amounts.multiply('0.1', ROUND_HALF_EVEN) == MoneyArray([0, 2])
+
+
+@pytest.mark.django_db
+class TestProductPriceMoney:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+
+    def test_reads_and_writes_price(self):
+        assert self.product.price_money == Money(99999)
+
+        self.product.price_money = self.product.price_money.apply_discount(10)
+        self.product.save()
+        self.product.refresh_from_db()
+        assert self.product.price == Decimal("899.99")
+
+    def test_from_queryset(self):
+        Product.objects.create(name="Mouse", price=Decimal("25.99"), stock=5, category=self.category)
+        amounts = MoneyArray.from_queryset(Product.objects.order_by('id'))
+        assert amounts == MoneyArray([99999, 2599])
+
+
+class TestComplexPrice:
+    @staticmethod
+    def decimal_price(base_price, discount, tax, *charges):
+        # The former Decimal arithmetic, rounding each percentage to a cent.
+        cent = Decimal('0.01')
+        price = Decimal(str(base_price))
+        price -= (price * Decimal(str(discount)) / 100).quantize(cent, ROUND_HALF_EVEN)
+        price += (price * Decimal(str(tax)) / 100).quantize(cent, ROUND_HALF_EVEN)
+        return price + sum(Decimal(str(charge)) for charge in charges)
+
+    def test_matches_decimal_arithmetic(self):
+        helper = ProductHelper()
+        for base_price in ("999.99", "25.99", "0.01", "10.05"):
+            for discount, tax in ((0, 0), (10, 21), (12.5, 7.25), (33, 0), (0, 15)):
+                for charges in ((0, 0, 0), (4.99, 1.5, Decimal("0.35"))):
+                    result = helper.calculate_complex_price(Decimal(base_price), discount, tax, *charges)
+                    assert result == self.decimal_price(base_price, discount, tax, *charges)
+                    assert result.as_tuple().exponent == -2
+
+    def test_exact_prices_are_unchanged(self):
+        assert ProductHelper().calculate_complex_price(Decimal("100.00"), 10, 20, 5) == Decimal("113.00")
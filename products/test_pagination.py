@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+
+from products.models import Category, Product
+from products.pagination import InvalidCursor, KeysetPaginator
+
+
+@pytest.mark.django_db
+class TestKeysetPaginator:
+    def setup_method(self):
+        category = Category.objects.create(name="Electronics")
+        for index in range(7):
+            Product.objects.create(
+                name=f"Product {index % 3}",
+                price=Decimal("10.00"),
+                stock=5,
+                category=category
+            )
+        self.queryset = Product.objects.all()
+
+    def _walk_forward(self, paginator):
+        page = paginator.get_page()
+        pages = [page]
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            pages.append(page)
+        return pages
+
+    def test_pages_cover_ordering_without_gaps(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=('name', 'id'))
+
+        pages = self._walk_forward(paginator)
+
+        seen = [product.id for page in pages for product in page]
+        expected = list(self.queryset.order_by('name', 'id').values_list('id', flat=True))
+        assert seen == expected
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert not pages[0].has_previous()
+
+    def test_previous_cursor_returns_preceding_page(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=('-created_at', '-id'))
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+
+        back = paginator.get_page(second.previous_cursor)
+
+        assert [p.id for p in back] == [p.id for p in first]
+        assert back.has_next()
+        assert not back.has_previous()
+
+    def test_constant_query_count_on_deep_pages(self, django_assert_num_queries):
+        paginator = KeysetPaginator(self.queryset, 2, ordering=('name', 'id'))
+        cursor = self._walk_forward(paginator)[-2].next_cursor
+
+        with django_assert_num_queries(1):
+            paginator.get_page(cursor)
+
+    def test_rejects_tampered_or_foreign_cursor(self):
+        by_name = KeysetPaginator(self.queryset, 3, ordering=('name', 'id'))
+        by_date = KeysetPaginator(self.queryset, 3, ordering=('-created_at', '-id'))
+        cursor = by_name.get_page().next_cursor
+
+        with pytest.raises(InvalidCursor):
+            by_date.get_page(cursor)
+        with pytest.raises(InvalidCursor):
+            by_name.get_page('not-a-cursor')
+
+    def test_mixed_directions_not_supported(self):
+        with pytest.raises(ValueError):
+            KeysetPaginator(self.queryset, 3, ordering=('name', '-id'))
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+import pytest
+from django.test import Client
+
+from products.models import Category, Product, RelatedProduct
+from products.pricing import change_prices
+
+
+@pytest.mark.django_db
+class TestChangePrices:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.other_category = Category.objects.create(name="Books")
+        self.laptop = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=10, category=self.category
+        )
+        self.mouse = Product.objects.create(
+            name="Mouse", price=Decimal("25.99"), stock=5, category=self.category
+        )
+        self.book = Product.objects.create(
+            name="Novel", price=Decimal("15.00"), stock=5, category=self.other_category
+        )
+
+    def prices(self):
+        return dict(Product.objects.values_list('name', 'price'))
+
+    def test_percentage_change_rounds_to_cents(self):
+        result = change_prices(Product.objects.filter(category=self.category), percent=-10)
+
+        assert result == {'updated': 2, 'skipped': 0}
+        assert self.prices() == {
+            'Laptop': Decimal("899.99"),
+            'Mouse': Decimal("23.39"),
+            'Novel': Decimal("15.00"),
+        }
+
+    def test_absolute_change_skips_prices_below_minimum(self):
+        result = change_prices(Product.objects.all(), amount=Decimal("-20.00"))
+
+        assert result == {'updated': 2, 'skipped': 1}
+        assert self.prices() == {
+            'Laptop': Decimal("979.99"),
+            'Mouse': Decimal("5.99"),
+            'Novel': Decimal("15.00"),
+        }
+
+    def test_small_batches_cover_every_product(self):
+        result = change_prices(Product.objects.all(), percent=100, batch_size=1)
+
+        assert result == {'updated': 3, 'skipped': 0}
+        assert self.prices()['Novel'] == Decimal("30.00")
+
+    def test_dry_run_writes_nothing(self):
+        result = change_prices(Product.objects.all(), percent=50, dry_run=True)
+
+        assert result == {'updated': 3, 'skipped': 0}
+        assert self.prices()['Laptop'] == Decimal("999.99")
+
+    def test_requires_exactly_one_change(self):
+        with pytest.raises(ValueError):
+            change_prices(Product.objects.all())
+        with pytest.raises(ValueError):
+            change_prices(Product.objects.all(), percent=10, amount=1)
+
+    def test_updated_products_are_refreshed(self):
+        client = Client()
+        previous_updated_at = self.mouse.updated_at
+        assert b'$25.99' in client.get('/').content
+
+        change_prices(Product.objects.filter(pk=self.mouse.pk), percent=-50)
+
+        self.mouse.refresh_from_db()
+        assert self.mouse.updated_at > previous_updated_at
+        assert b'$13.00' in client.get('/').content
+        assert RelatedProduct.objects.get(product=self.laptop).related == self.mouse
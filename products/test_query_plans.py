@@ -0,0 +1,108 @@
+"""
+EXPLAIN the hot product querysets against a seeded catalog and fail when
+the planner falls back to a sequential scan (or, for ordered querysets, to
+sorting the rows itself). Guards the indexes declared on Product.Meta.
+"""
+import re
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+
+from products.feeds import (
+    new_products_paginator,
+    recent_products_page,
+    recent_products_paginator,
+)
+from products.models import Category, Product
+from products.utils import ProductUtils
+from products.views import PRODUCT_ORDERINGS, get_active_products_by_category
+
+SEQ_SCAN_PATTERNS = {
+    # "SCAN t USING [COVERING] INDEX i" walks an index in order, that's fine.
+    'sqlite': re.compile(r'\bSCAN products_product\b(?! USING (COVERING )?INDEX)'),
+    'postgresql': re.compile(r'Seq Scan on products_product\b'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY'),
+    'postgresql': re.compile(r'^\s*(->\s*)?(Incremental )?Sort\b', re.MULTILINE),
+}
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # The seeded table is small enough that Postgres would rightly prefer
+        # a sequential scan; only fall back to one when no index applies.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestHotQueryPlans:
+    def setup_method(self):
+        if connection.vendor not in SEQ_SCAN_PATTERNS:
+            pytest.skip(f"No plan checks for {connection.vendor}")
+
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Category {i}") for i in range(20)]
+        )
+        self.category = categories[0]
+        Product.objects.bulk_create([
+            Product(
+                name=f"Product {i}",
+                price=Decimal("9.99"),
+                stock=i % 50,
+                category=categories[i % len(categories)],
+                is_active=i % 10 != 0,
+            )
+            for i in range(2000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assert_uses_index(self, queryset, index=None, ordered=False):
+        plan = explain(queryset)
+        assert not SEQ_SCAN_PATTERNS[connection.vendor].search(plan), plan
+        if index:
+            assert index in plan, plan
+        if ordered:
+            assert not SORT_PATTERNS[connection.vendor].search(plan), plan
+
+    def test_newest_products(self):
+        queryset = get_active_products_by_category().order_by(*PRODUCT_ORDERINGS['newest'])
+        self.assert_uses_index(queryset[:10], 'product_active_created_idx', ordered=True)
+
+    def test_newest_products_in_category(self):
+        queryset = get_active_products_by_category(self.category.id).order_by(*PRODUCT_ORDERINGS['newest'])
+        self.assert_uses_index(queryset[:10], 'product_active_category_idx', ordered=True)
+
+    def test_products_by_name(self):
+        queryset = get_active_products_by_category().order_by(*PRODUCT_ORDERINGS['name'])
+        self.assert_uses_index(queryset[:10], 'product_name_id_idx', ordered=True)
+
+    def test_low_stock_products(self):
+        self.assert_uses_index(ProductUtils.get_low_stock_products(5), 'product_active_stock_idx')
+
+    def test_recent_products(self):
+        self.assert_uses_index(ProductUtils.get_recent_products(30), 'product_active_created_idx', ordered=True)
+
+    def test_recent_feed_pages(self):
+        page, since_cursor = recent_products_page(limit=10)
+        queryset, _, _ = recent_products_paginator(10)._page_queryset(page.next_cursor)
+        self.assert_uses_index(queryset, 'product_active_created_idx', ordered=True)
+
+        queryset, _, _ = new_products_paginator(10)._page_queryset(since_cursor)
+        self.assert_uses_index(queryset, 'product_active_created_idx', ordered=True)
+
+    def test_status_filters(self):
+        for status in ('out_of_stock', 'low_stock'):
+            queryset = get_active_products_by_category().filter_status(status).order_by(*PRODUCT_ORDERINGS['newest'])
+            self.assert_uses_index(queryset[:10])
+
+    def test_status_counts_by_category(self):
+        self.assert_uses_index(Product.objects.status_counts_by_category(), 'product_category_status_idx')
+
+    def test_related_candidates(self):
+        queryset = Product.objects.filter(is_active=True, category_id__in=[self.category.id])
+        self.assert_uses_index(queryset)
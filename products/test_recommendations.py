@@ -0,0 +1,196 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from products import recommendations
+from products.helpers import get_product_recommendation
+from products.models import Category, Product, ProductInteraction, ProductNeighbours
+from products.recommendations import (
+    build_cooccurrence,
+    build_recommendations,
+    pack_neighbours,
+    recommend,
+    recommend_products,
+    record_interactions,
+    record_view,
+    unpack_neighbours,
+)
+from products.reservations import confirm_reservation, reserve_stock
+
+
+def test_pack_round_trip():
+    ids, scores = unpack_neighbours(pack_neighbours([(7, 0.5), (2**40, 0.25)]))
+
+    assert list(ids) == [7, 2**40]
+    assert list(scores) == [0.5, 0.25]
+
+
+def test_cooccurrence_counts_each_visitor_once():
+    rows = [
+        ('a', 1, 'view'), ('a', 2, 'view'), ('a', 1, 'purchase'),
+        ('b', 1, 'view'), ('b', 3, 'view'),
+    ]
+
+    pairs, norms = build_cooccurrence(rows)
+
+    assert pairs[1] == {2: 3.0, 3: 1.0}
+    assert pairs[2] == {1: 3.0}
+    assert norms == {1: 10.0, 2: 1.0, 3: 1.0}
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    # Each process keeps its index between checks; start every test without one.
+    monkeypatch.setattr(recommendations, '_index', None)
+    monkeypatch.setattr(recommendations, '_checked_at', None)
+
+
+@pytest.mark.django_db
+class TestRecommendations:
+    def setup_method(self):
+        cache.clear()
+        category = Category.objects.create(name="Electronics")
+        self.laptop, self.mouse, self.keyboard, self.monitor, self.webcam = [
+            Product.objects.create(name=name, price=Decimal("10.00"), stock=5, category=category)
+            for name in ("Laptop", "Mouse", "Keyboard", "Monitor", "Webcam")
+        ]
+        record_interactions('v1', [self.laptop.id, self.mouse.id, self.keyboard.id])
+        record_interactions('v2', [self.laptop.id, self.mouse.id])
+        record_interactions('v3', [self.laptop.id, self.monitor.id])
+        record_interactions('v4', [self.monitor.id, self.webcam.id])
+
+    def test_build_stores_neighbours(self):
+        assert build_recommendations() == 5
+
+        ids, _ = unpack_neighbours(ProductNeighbours.objects.get(pk=self.laptop.id).data)
+        assert list(ids) == [self.mouse.id, self.keyboard.id, self.monitor.id]
+
+    def test_recommend_merges_lists_without_queries(self, django_assert_num_queries):
+        build_recommendations()
+        recommend([self.laptop.id])
+
+        with django_assert_num_queries(0):
+            result = recommend([self.laptop.id, self.monitor.id])
+
+        assert result[0] == self.mouse.id
+        assert set(result) == {self.mouse.id, self.keyboard.id, self.webcam.id}
+
+    def test_purchases_outweigh_views(self):
+        record_interactions('v5', [self.laptop.id, self.monitor.id], kind=ProductInteraction.PURCHASE)
+        build_recommendations()
+
+        assert recommend([self.laptop.id])[0] == self.monitor.id
+
+    def test_rebuild_reloads_the_index(self, django_capture_on_commit_callbacks):
+        build_recommendations()
+        assert recommend([self.webcam.id]) == [self.monitor.id]
+
+        record_interactions('v6', [self.webcam.id, self.keyboard.id], kind=ProductInteraction.PURCHASE)
+        with django_capture_on_commit_callbacks(execute=True):
+            build_recommendations()
+
+        assert recommend([self.webcam.id]) == [self.keyboard.id, self.monitor.id]
+
+    def test_rebuild_by_another_process_is_picked_up(self, settings):
+        build_recommendations()
+        assert recommend([self.webcam.id]) == [self.monitor.id]
+
+        record_interactions('v6', [self.webcam.id, self.keyboard.id], kind=ProductInteraction.PURCHASE)
+        # Built elsewhere: this process runs none of the build's callbacks.
+        build_recommendations()
+        assert recommend([self.webcam.id]) == [self.monitor.id]
+
+        settings.PRODUCTS_RECOMMENDATION_RELOAD_INTERVAL = 0
+        assert recommend([self.webcam.id]) == [self.keyboard.id, self.monitor.id]
+
+    def test_unknown_history_gets_nothing(self):
+        build_recommendations()
+
+        assert recommend([999]) == []
+
+    def test_inactive_products_are_left_out(self):
+        self.keyboard.is_active = False
+        self.keyboard.save()
+        build_recommendations()
+
+        assert self.keyboard.id not in recommend([self.laptop.id, self.mouse.id])
+
+    def test_helper_adds_current_product(self):
+        build_recommendations()
+
+        assert get_product_recommendation([self.monitor.id], self.laptop) == recommend([self.monitor.id, self.laptop.id])
+
+    def test_recommendations_api(self):
+        build_recommendations()
+        Product.objects.filter(pk=self.mouse.id).update(is_active=False)
+
+        response = Client().get('/api/products/recommendations/', {'ids': str(self.laptop.id), 'limit': 2})
+
+        assert response.status_code == 200
+        assert [p['name'] for p in response.json()['products']] == ['Keyboard', 'Monitor']
+
+    def test_recommendations_api_requires_ids(self):
+        assert Client().get('/api/products/recommendations/').status_code == 400
+
+    def test_fallback_fills_from_history_categories_first(self):
+        other = Category.objects.create(name="Garden")
+        hose = Product.objects.create(name="Hose", price=Decimal("10.00"), stock=5, category=other)
+        build_recommendations()
+
+        # Nothing co-occurs with the hose yet.
+        assert [p.pk for p in recommend_products([hose.pk], limit=2)] == [self.webcam.pk, self.monitor.pk]
+        assert get_product_recommendation([])[:2] == [hose.pk, self.webcam.pk]
+
+        garden_tool = Product.objects.create(name="Rake", price=Decimal("10.00"), stock=5, category=other)
+        assert [p.pk for p in recommend_products([hose.pk], limit=2)] == [garden_tool.pk, self.webcam.pk]
+
+    def test_product_detail_records_views(self):
+        client = Client()
+        client.get(f'/product/{self.webcam.id}/')
+        visitor = client.cookies['visitor'].value
+        client.get(f'/product/{self.keyboard.id}/')
+
+        assert list(
+            ProductInteraction.objects.filter(visitor=visitor).order_by('pk').values_list('product_id', flat=True)
+        ) == [self.webcam.id, self.keyboard.id]
+        build_recommendations()
+        assert recommend([self.webcam.id])[0] == self.keyboard.id
+
+    def test_repeat_views_are_recorded_once(self):
+        client = Client()
+        for _ in range(3):
+            client.get(f'/product/{self.webcam.id}/')
+        client.get(f'/product/{self.keyboard.id}/')
+
+        views = ProductInteraction.objects.filter(visitor=client.cookies['visitor'].value)
+        assert sorted(views.values_list('product_id', flat=True)) == sorted([self.webcam.id, self.keyboard.id])
+
+    def test_views_are_sampled_by_visitor(self, settings):
+        settings.PRODUCTS_INTERACTION_VIEW_SAMPLE_RATE = 0.5
+        recorded = {
+            visitor for visitor in (f'v{index}' for index in range(200))
+            if record_view(visitor, self.webcam.id)
+        }
+
+        assert 60 < len(recorded) < 140
+        # Whole baskets: a sampled-out visitor's other views are skipped too.
+        assert {visitor for visitor in (f'v{index}' for index in range(200)) if record_view(visitor, self.mouse.id)} == recorded
+
+    def test_prune_command(self):
+        ProductInteraction.objects.exclude(visitor='v4').update(created_at=timezone.now() - timedelta(days=100))
+        out = StringIO()
+        call_command('prune_interactions', '--days', '90', stdout=out)
+
+        assert list(ProductInteraction.objects.values_list('visitor', flat=True)) == ['v4', 'v4']
+        assert "7 interaction(s) deleted." in out.getvalue()
+
+    def test_confirmed_reservations_are_purchases(self):
+        confirm_reservation(reserve_stock(self.webcam, 1), visitor='v1')
+
+        assert ProductInteraction.objects.get(visitor='v1', product=self.webcam).kind == ProductInteraction.PURCHASE
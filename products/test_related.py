@@ -0,0 +1,130 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from products.models import Category, Product, ProductInteraction, RelatedProduct
+from products.recommendations import build_recommendations, record_interactions
+from products.related import (
+    CoViewScorer,
+    PriceProximityScorer,
+    RelatedProductsEngine,
+    rebuild_related_products,
+)
+
+
+def related_ids(product):
+    return list(
+        RelatedProduct.objects.filter(product=product).order_by('rank').values_list('related_id', flat=True)
+    )
+
+
+@pytest.mark.django_db
+class TestRelatedProducts:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.other_category = Category.objects.create(name="Books")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {price}", price=Decimal(price), stock=1, category=self.category
+            )
+            for price in ("100.00", "90.00", "50.00", "10.00", "110.00", "500.00")
+        ]
+        self.book = Product.objects.create(
+            name="Novel", price=Decimal("100.00"), stock=1, category=self.other_category
+        )
+
+    def test_ranked_by_price_proximity_within_category(self):
+        laptop, p90, p50, _, p110, p500 = self.products
+        # 500 is relatively closer to 100 than 10 is.
+        assert related_ids(laptop) == [p110.id, p90.id, p50.id, p500.id]
+        assert self.book.id not in related_ids(laptop)
+
+    def test_ties_go_to_lower_id(self):
+        engine = RelatedProductsEngine([(PriceProximityScorer(), 1.0)], limit=2)
+        product = {'id': 1, 'category_id': 1, 'price': Decimal(10)}
+        candidates = [
+            {'id': 3, 'category_id': 1, 'price': Decimal(10)},
+            {'id': 2, 'category_id': 1, 'price': Decimal(10)},
+            {'id': 1, 'category_id': 1, 'price': Decimal(10)},
+        ]
+        assert [related_id for related_id, _ in engine.top_related(product, candidates)] == [2, 3]
+
+    def test_new_product_enters_existing_lists(self):
+        laptop = self.products[0]
+        twin = Product.objects.create(
+            name="Twin", price=Decimal("100.00"), stock=1, category=self.category
+        )
+        assert related_ids(laptop)[0] == twin.id
+
+    def test_deactivated_product_leaves_lists(self):
+        laptop, p90 = self.products[:2]
+        p90.is_active = False
+        p90.save()
+
+        assert p90.id not in related_ids(laptop)
+        assert len(related_ids(laptop)) == 4
+        assert related_ids(p90) == []
+
+    def test_price_change_matches_a_full_rebuild(self):
+        p50 = self.products[2]
+        p50.price = Decimal("105.00")
+        p50.save()
+        p90 = self.products[1]
+        p90.price = Decimal("400.00")
+        p90.save()
+        incremental = {product.id: related_ids(product) for product in self.products}
+
+        rebuild_related_products()
+        assert incremental == {product.id: related_ids(product) for product in self.products}
+
+    def test_price_change_does_not_rescore_the_category(self, django_assert_max_num_queries):
+        Product.objects.bulk_create([
+            Product(name=f"Filler {index}", price=Decimal(1000 + index), stock=1, category=self.category)
+            for index in range(200)
+        ])
+        rebuild_related_products([self.category.id])
+        laptop = self.products[0]
+        laptop.price = Decimal("95.00")
+
+        with django_assert_max_num_queries(20):
+            laptop.save()
+        assert related_ids(laptop) == [self.products[1].id, self.products[4].id, self.products[2].id, self.products[5].id]
+
+    def test_co_view_scorer(self):
+        laptop, _, p50 = self.products[:3]
+        for visitor in ("a", "b"):
+            record_interactions(visitor, [laptop.id, p50.id])
+        build_recommendations()
+        assert ProductInteraction.objects.count() == 4
+
+        engine = RelatedProductsEngine([(CoViewScorer(), 1.0), (PriceProximityScorer(), 0.1)])
+        rebuild_related_products([self.category.id], engine)
+        assert related_ids(laptop)[:2] == [p50.id, self.products[4].id]
+
+    def test_deleted_product_is_replaced(self):
+        laptop, p90 = self.products[:2]
+        p90.delete()
+
+        assert len(related_ids(laptop)) == 4
+
+    def test_rebuild_command_repairs_lists(self):
+        laptop = self.products[0]
+        RelatedProduct.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_related_products', '--category', str(self.category.id), stdout=out)
+
+        assert len(related_ids(laptop)) == 4
+        assert related_ids(self.book) == []
+        assert "24 related product entries written." in out.getvalue()
+
+    def test_product_detail_reads_precomputed_list(self):
+        laptop = self.products[0]
+        client = Client()
+
+        response = client.get(f'/product/{laptop.id}/')
+        assert [product.id for product in response.context['related_products']] == related_ids(laptop)
+        assert b'Novel' not in response.content
@@ -0,0 +1,183 @@
+import random
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.models import Sum
+from django.utils import timezone
+
+from products import ledger
+from products.inventory import InsufficientStock, change_stock
+from products.ledger import get_stock_movement_buffer
+from products.models import Category, Product, StockMovement, StockReservation
+from products.reservations import (
+    ReservationExpired,
+    confirm_reservation,
+    release_expired_reservations,
+    release_reservation,
+    reserve_stock,
+)
+
+
+@pytest.mark.django_db
+class TestStockReservations:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            name="Laptop", price=Decimal("999.99"), stock=5, category=self.category
+        )
+
+    def stock(self):
+        self.product.refresh_from_db()
+        return self.product.stock, self.product.reserved_stock, self.product.available_stock
+
+    def test_reserve_holds_available_stock(self):
+        reserve_stock(self.product, 3)
+        assert self.stock() == (5, 3, 2)
+
+        with pytest.raises(InsufficientStock):
+            reserve_stock(self.product, 3)
+        # Reserved units cannot be removed either.
+        with pytest.raises(InsufficientStock):
+            change_stock(self.product, -3)
+        assert self.stock() == (5, 3, 2)
+
+    def test_reserve_inactive_product(self):
+        self.product.is_active = False
+        self.product.save()
+        with pytest.raises(InsufficientStock):
+            reserve_stock(self.product, 1)
+
+    def test_confirm_removes_stock(self):
+        reservation = reserve_stock(self.product, 2)
+        confirm_reservation(reservation)
+
+        assert self.stock() == (3, 0, 3)
+        assert not StockReservation.objects.exists()
+        with pytest.raises(ReservationExpired):
+            confirm_reservation(reservation)
+
+    def test_release_returns_stock(self):
+        reservation = reserve_stock(self.product, 2)
+
+        assert release_reservation(reservation.pk) is True
+        assert release_reservation(reservation.pk) is False
+        assert self.stock() == (5, 0, 5)
+
+    def test_expired_reservation_cannot_be_confirmed(self):
+        reservation = reserve_stock(self.product, 2, ttl=-1)
+        with pytest.raises(ReservationExpired):
+            confirm_reservation(reservation)
+        assert self.stock() == (5, 2, 3)
+
+    def test_sweep_releases_expired_in_batches(self):
+        for _ in range(3):
+            reserve_stock(self.product, 1, ttl=-1)
+        active = reserve_stock(self.product, 1)
+
+        assert release_expired_reservations(batch_size=2) == 3
+        assert self.stock() == (5, 1, 4)
+        assert list(StockReservation.objects.all()) == [active]
+
+    def test_sweep_command(self):
+        reserve_stock(self.product, 2, ttl=-1)
+        reserve_stock(self.product, 1)
+
+        out = StringIO()
+        call_command('release_expired_reservations', stdout=out)
+
+        assert "1 expired reservation(s) released." in out.getvalue()
+        assert self.stock() == (5, 1, 4)
+
+    def test_sweep_leaves_future_reservations(self):
+        reserve_stock(self.product, 2)
+        assert release_expired_reservations(now=timezone.now() - timedelta(minutes=1)) == 0
+
+    def test_saving_the_reserved_instance_keeps_reserved_stock(self):
+        reserve_stock(self.product, 3)
+        self.product.name = "Gaming laptop"
+        self.product.save()
+
+        assert self.stock() == (5, 3, 2)
+        assert release_expired_reservations(now=timezone.now() + timedelta(days=1)) == 1
+        assert self.stock() == (5, 0, 5)
+
+    def test_stale_instance_saved_with_update_fields(self):
+        editor = Product.objects.get(pk=self.product.pk)
+        reserve_stock(self.product, 3)
+        editor.name = "Gaming laptop"
+        editor.save(update_fields=['name', 'updated_at'])
+
+        assert self.stock() == (5, 3, 2)
+        assert self.product.name == "Gaming laptop"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReservations:
+    """Smaller, in-process version of benchmarks/reservation_stress.py."""
+
+    WORKERS = 4
+    OPERATIONS = 40
+    INITIAL_STOCK = 10
+
+    def worker(self, seed, product_ids, barrier):
+        rng = random.Random(seed)
+        confirmed = Counter()
+        barrier.wait()
+        try:
+            for _ in range(self.OPERATIONS):
+                product_id = rng.choice(product_ids)
+                quantity = rng.randint(1, 3)
+                choice = rng.random()
+                try:
+                    reservation = reserve_stock(product_id, quantity, ttl=-1 if choice < 0.2 else None)
+                    if choice < 0.2:
+                        continue
+                    if choice < 0.7:
+                        confirm_reservation(reservation)
+                        confirmed[product_id] += quantity
+                    else:
+                        release_reservation(reservation)
+                    if choice > 0.9:
+                        release_expired_reservations()
+                except (InsufficientStock, ReservationExpired):
+                    pass
+                except OperationalError:
+                    # The shared in-memory test database reports a locked
+                    # table instead of waiting; the transaction rolled back.
+                    pass
+        finally:
+            connections.close_all()
+        return confirmed
+
+    def test_no_overselling_under_concurrency(self, settings, monkeypatch):
+        # Keep every movement buffered until the workers are done.
+        settings.PRODUCTS_STOCK_LEDGER_BUFFER_SIZE = 100_000
+        settings.PRODUCTS_STOCK_LEDGER_MAX_AGE = 3600
+        monkeypatch.setattr(ledger, '_buffer', None)
+        category = Category.objects.create(name="Flash sale")
+        product_ids = [
+            Product.objects.create(name=f"Product {index}", price=1, stock=self.INITIAL_STOCK, category=category).pk
+            for index in range(3)
+        ]
+        barrier = threading.Barrier(self.WORKERS)
+        with ThreadPoolExecutor(self.WORKERS) as pool:
+            futures = [pool.submit(self.worker, seed, product_ids, barrier) for seed in range(self.WORKERS)]
+            confirmed = sum((future.result() for future in futures), Counter())
+
+        release_expired_reservations(now=timezone.now() + timedelta(days=1))
+        get_stock_movement_buffer().flush()
+        movements = dict(
+            StockMovement.objects.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total')
+        )
+        assert not StockReservation.objects.exists()
+        for product in Product.objects.filter(pk__in=product_ids):
+            assert product.stock == self.INITIAL_STOCK - confirmed[product.pk]
+            assert product.reserved_stock == 0
+            assert movements.get(product.pk, 0) == -confirmed[product.pk]
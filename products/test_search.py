@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+
+from products.models import Category, Product
+from products.search import (
+    SQLITE_SEARCH_TRIGGERS,
+    ensure_sqlite_search_triggers,
+    search_products,
+)
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    def setup_method(self):
+        category = Category.objects.create(name="Electronics")
+        self.laptop = Product.objects.create(
+            name="Gaming Laptop",
+            description="Fast machine with a backlit keyboard",
+            price=Decimal("999.99"),
+            stock=10,
+            category=category
+        )
+        self.keyboard = Product.objects.create(
+            name="Mechanical Keyboard",
+            description="Clicky switches",
+            price=Decimal("79.99"),
+            stock=10,
+            category=category
+        )
+        self.mouse = Product.objects.create(
+            name="Wireless Mouse",
+            description="Ergonomic",
+            price=Decimal("25.99"),
+            stock=5,
+            category=category
+        )
+
+    def _search(self, query, **kwargs):
+        return list(search_products(Product.objects.all(), query, **kwargs))
+
+    def test_matches_name_and_description_ranked(self):
+        results = self._search("keyboard")
+
+        assert results == [self.keyboard, self.laptop]
+
+    def test_partial_word_matches(self):
+        assert self._search("mou") == [self.mouse]
+
+    def test_index_follows_updates_and_deletes(self):
+        self.mouse.name = "Wireless Trackball"
+        self.mouse.save()
+        assert self._search("trackball") == [self.mouse]
+        assert self._search("mouse") == []
+
+        self.mouse.delete()
+        assert self._search("trackball") == []
+
+    def test_query_syntax_is_not_interpreted(self):
+        assert self._search('"AND (') == []
+        assert self._search("   ") == []
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason="SQLite FTS5 triggers")
+    def test_lost_triggers_are_restored(self):
+        with connection.cursor() as cursor:
+            for trigger in SQLITE_SEARCH_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {trigger}")
+        Product.objects.filter(pk=self.mouse.pk).update(name="Trackball")
+
+        ensure_sqlite_search_triggers(connection)
+
+        assert self._search("trackball") == [self.mouse]
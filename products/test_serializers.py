@@ -0,0 +1,74 @@
+import json
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from products import serializers
+from products.models import Category, Product
+from products.serializers import PRODUCT_SERIALIZER, RowSerializer, dumps
+from products.views import build_product_json_data
+
+
+@pytest.mark.django_db
+class TestProductSerializer:
+    def setup_method(self):
+        self.category = Category.objects.create(name="Electronics")
+        self.products = [
+            Product.objects.create(
+                name=name, price=Decimal(price), stock=stock, category=self.category, is_active=active
+            )
+            for name, price, stock, active in (
+                ("Laptop", "999.99", 20, True),
+                ("Mouse", "25.90", 5, True),
+                ("Cable", "3.00", 0, True),
+                ("Old", "1.00", 50, False),
+            )
+        ]
+
+    def test_matches_model_serialization(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            data = PRODUCT_SERIALIZER.serialize(Product.objects.order_by('pk'))
+
+        expected = [build_product_json_data(product) for product in self.products]
+        assert data == expected
+        assert [row['status'] for row in data] == ['In Stock', 'Low Stock', 'Out of Stock', 'Inactive']
+
+    def test_first_and_in_bulk(self):
+        laptop, mouse = self.products[:2]
+
+        assert PRODUCT_SERIALIZER.first(pk=mouse.pk) == build_product_json_data(mouse)
+        assert PRODUCT_SERIALIZER.first(pk=mouse.pk, is_active=False) is None
+        assert PRODUCT_SERIALIZER.in_bulk([laptop.pk, self.products[3].pk, 0], is_active=True) == {
+            laptop.pk: build_product_json_data(laptop),
+        }
+
+    def test_custom_fields(self):
+        serializer = RowSerializer(
+            Product.objects.filter(is_active=False),
+            (('id', 'id', None), ('category', 'category__name', str.upper)),
+        )
+
+        assert serializer.serialize() == [{'id': self.products[3].pk, 'category': 'ELECTRONICS'}]
+
+    def test_serialize_sees_new_rows(self):
+        serializer = RowSerializer(Product.objects.filter(is_active=False).order_by('pk'), (('id', 'id', None),))
+        assert serializer.serialize() == [{'id': self.products[3].pk}]
+
+        newer = Product.objects.create(name="Older", price=1, category=self.category, is_active=False)
+
+        expected = [{'id': self.products[3].pk}, {'id': newer.pk}]
+        assert serializer.serialize() == expected
+        assert async_to_sync(serializer.aserialize)() == expected
+
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(serializers, 'orjson', None)
+
+    assert dumps({'name': 'Café', 'price': '1.00'}) == '{"name":"Café","price":"1.00"}'.encode()
+
+
+def test_dumps_round_trips():
+    data = {'id': 1, 'name': 'Laptop', 'price': '999.99', 'stock': 20, 'status': 'In Stock', 'category': 'Electronics'}
+
+    assert json.loads(dumps(data)) == data
@@ -2,7 +2,10 @@
 from decimal import Decimal
 from django.utils import timezone
 from products.models import Category, Product
-from products.utils import ProductUtils, calculate_tax, format_currency, calculate_shipping_cost, InventoryManager
+from products.utils import (
+    ProductUtils, calculate_tax, format_currency, calculate_shipping_cost, InventoryManager,
+    calculate_tax_batch, calculate_shipping_cost_batch,
+)
 
 
 @pytest.mark.django_db
@@ -30,6 +33,30 @@ def test_calculate_bulk_discount(self):
         assert result['discounted_total'] == Decimal('945.00')
         assert result['savings'] == Decimal('105.00')
 
+    def test_calculate_bulk_discount_queryset(self, django_assert_num_queries):
+        Product.objects.create(
+            name="Cable", price=Decimal("3.33"), stock=1, category=self.category
+        )
+        products = Product.objects.filter(category=self.category)
+        expected = ProductUtils.calculate_bulk_discount(list(products), 12.5)
+
+        with django_assert_num_queries(1):
+            result = ProductUtils.calculate_bulk_discount(products, 12.5)
+
+        assert result == expected
+        assert result['original_total'] == Decimal('1053.33')
+
+    def test_calculate_bulk_discount_sliced_queryset(self):
+        products = Product.objects.order_by('pk')[:2]
+        expected = ProductUtils.calculate_bulk_discount(list(products), 10)
+
+        assert ProductUtils.calculate_bulk_discount(products, 10) == expected
+
+    def test_calculate_bulk_discount_empty_queryset(self):
+        result = ProductUtils.calculate_bulk_discount(Product.objects.none(), 10)
+        assert result['original_total'] == Decimal('0.00')
+        assert result['savings'] == Decimal(0)
+
     def test_get_low_stock_products(self):
         low_stock_products = ProductUtils.get_low_stock_products(threshold=8)
         assert len(low_stock_products) == 1
@@ -52,6 +79,27 @@ def test_calculate_shipping_cost(self):
         assert isinstance(cost, Decimal)
         assert cost > Decimal('0')
 
+    def test_calculate_tax_batch_matches_scalar(self):
+        prices = [Decimal('100.00'), Decimal('19.99'), Decimal('0.01'), 7]
+        for rate in (0.1, 0.21, 0, -1):
+            expected = [str(calculate_tax(price, rate)) for price in prices]
+            assert [str(value) for value in calculate_tax_batch(prices, rate)] == expected
+
+    def test_calculate_shipping_cost_batch_matches_scalar(self):
+        # 1, 1.0 and Decimal('1.00') share a memoized result; the strings must still match.
+        weights = [2.5, 1, 1.0, Decimal('1.00'), 0, -3, 0.1, 2.5, 1 / 3]
+        distances = [500, 100, 100, 100, 100, 100, 333, 1 / 3, 1000]
+
+        expected = [str(calculate_shipping_cost(w, d)) for w, d in zip(weights, distances)]
+        assert [str(cost) for cost in calculate_shipping_cost_batch(weights, distances)] == expected
+
+        expected = [str(calculate_shipping_cost(w, 250)) for w in weights]
+        assert [str(cost) for cost in calculate_shipping_cost_batch(weights, 250)] == expected
+
+    def test_calculate_shipping_cost_batch_length_mismatch(self):
+        with pytest.raises(ValueError):
+            calculate_shipping_cost_batch([1, 2], [100])
+
 
 @pytest.mark.django_db
 class TestInventoryManager:
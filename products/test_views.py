@@ -3,7 +3,7 @@
 from decimal import Decimal
 from django.test import Client
 from django.urls import reverse
-from products.models import Category, Product
+from products.models import Category, Product, RelatedProduct
 
 
 @pytest.mark.django_db
@@ -48,10 +48,226 @@ def test_product_api_not_found(self):
         assert data['error'] == 'Product not found'
 
     def test_category_products_count(self):
+        Category.objects.create(name="Books")
+        Product.objects.create(
+            name="Old Mouse",
+            price=Decimal("5.00"),
+            stock=1,
+            category=self.category,
+            is_active=False
+        )
+
         response = self.client.get('/api/categories/count/')
 
         assert response.status_code == 200
         data = json.loads(response.content)
-        assert len(data['categories']) == 1
+        assert len(data['categories']) == 2
         assert data['categories'][0]['category'] == 'Electronics'
-        assert data['categories'][0]['product_count'] == 2
\ No newline at end of file
+        assert data['categories'][0]['product_count'] == 2
+        assert data['categories'][1]['product_count'] == 0
+
+    def test_category_products_count_single_query(self, django_assert_num_queries):
+        Category.objects.create(name="Books")
+
+        with django_assert_num_queries(1):
+            response = self.client.get('/api/categories/count/')
+
+        assert response.status_code == 200
+
+    def test_product_list_cursor_mode(self):
+        response = self.client.get('/', {'order': 'name'})
+
+        assert response.status_code == 200
+        assert response.context['cursor_mode'] is True
+        assert [p.name for p in response.context['page_obj']] == ['Laptop', 'Mouse']
+
+    def test_product_list_api_pages_with_cursor(self):
+        response = self.client.get('/api/products/list/', {'order': 'name', 'limit': 1})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Laptop']
+        assert data['previous_cursor'] is None
+
+        response = self.client.get(
+            '/api/products/list/',
+            {'order': 'name', 'limit': 1, 'cursor': data['next_cursor']}
+        )
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Mouse']
+        assert data['next_cursor'] is None
+        assert data['previous_cursor'] is not None
+
+    def test_product_list_api_honors_filters(self):
+        response = self.client.get('/api/products/list/', {'search': 'mou'})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Mouse']
+
+    def test_product_list_status_filter(self):
+        response = self.client.get(reverse('products:product_list'), {'status': 'low_stock'})
+
+        assert [p.name for p in response.context['page_obj']] == ['Mouse']
+        assert response.context['selected_status'] == 'low_stock'
+
+        response = self.client.get(reverse('products:product_list'), {'status': 'bogus'})
+        assert len(response.context['page_obj']) == 2
+
+    def test_product_list_api_status_filter(self):
+        response = self.client.get('/api/products/list/', {'status': 'in_stock'})
+
+        assert [p['name'] for p in json.loads(response.content)['products']] == ['Laptop']
+        assert self.client.get('/api/products/list/', {'status': 'bogus'}).status_code == 400
+
+    def test_category_status_counts(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = self.client.get('/api/categories/status-counts/')
+
+        assert json.loads(response.content)['categories'] == [{
+            'category': 'Electronics', 'inactive': 0, 'out_of_stock': 0, 'low_stock': 1, 'in_stock': 1,
+        }]
+
+    def test_product_list_api_invalid_cursor(self):
+        response = self.client.get('/api/products/list/', {'cursor': 'garbage'})
+
+        assert response.status_code == 400
+
+    def test_product_recent_api_pages_and_polls(self):
+        response = self.client.get('/api/products/recent/', {'limit': 1})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Mouse']
+        assert data['next_cursor'] is not None
+
+        response = self.client.get('/api/products/recent/', {'limit': 1, 'cursor': data['next_cursor']})
+        assert [p['name'] for p in json.loads(response.content)['products']] == ['Laptop']
+
+        Product.objects.create(name="Keyboard", price=Decimal("49.99"), stock=3, category=self.category)
+        response = self.client.get('/api/products/recent/', {'since': data['since_cursor']})
+
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Keyboard']
+        assert data['since_cursor'] is not None
+
+    def test_product_recent_api_invalid_params(self):
+        assert self.client.get('/api/products/recent/', {'since': 'garbage'}).status_code == 400
+        assert self.client.get('/api/products/recent/', {'days': '0'}).status_code == 400
+        assert self.client.get('/api/products/recent/', {'limit': 'x'}).status_code == 400
+
+    def test_product_batch_api_get(self, django_assert_num_queries):
+        ids = f'{self.product2.id},999,{self.product1.id},{self.product2.id}'
+
+        with django_assert_num_queries(1):
+            response = self.client.get('/api/products/', {'ids': ids})
+
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert [p['name'] for p in data['products']] == ['Mouse', 'Laptop']
+        assert data['products'][0]['category'] == 'Electronics'
+        assert data['missing'] == [999]
+
+    def test_product_batch_api_post_json(self):
+        response = self.client.post(
+            '/api/products/',
+            data=json.dumps({'ids': [self.product1.id]}),
+            content_type='application/json'
+        )
+
+        data = json.loads(response.content)
+        assert [p['id'] for p in data['products']] == [self.product1.id]
+        assert data['missing'] == []
+
+    def test_product_batch_api_rejects_bad_requests(self):
+        assert self.client.get('/api/products/', {'ids': 'a,b'}).status_code == 400
+        assert self.client.get('/api/products/').status_code == 400
+
+        too_many = ','.join(str(i) for i in range(1, 102))
+        assert self.client.get('/api/products/', {'ids': too_many}).status_code == 400
+
+    def test_product_api_conditional_get(self, django_assert_num_queries):
+        url = f'/api/products/{self.product1.id}/'
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+
+        with django_assert_num_queries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        self.product1.stock = 3
+        self.product1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_product_api_etag_changes_on_category_rename(self):
+        url = f'/api/products/{self.product1.id}/'
+        etag = self.client.get(url).headers['ETag']
+
+        self.category.name = "Computers"
+        self.category.save()
+
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_product_detail_conditional_get(self):
+        url = f'/product/{self.product1.id}/'
+        response = self.client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        # A change to a related product changes the rendered page.
+        self.product2.price = Decimal("19.99")
+        self.product2.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        # So does a rebuild of its related list, even without product changes.
+        RelatedProduct.objects.filter(product=self.product1).delete()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_product_detail_etag_ignores_unrelated_products(self):
+        for price in ("1000.00", "1001.00", "1002.00", "1003.00"):
+            Product.objects.create(name=f"Laptop {price}", price=Decimal(price), stock=1, category=self.category)
+        url = f'/product/{self.product1.id}/'
+        etag = self.client.get(url).headers['ETag']
+
+        # Same category, but too far in price to enter its related list.
+        self.product2.price = Decimal("24.99")
+        self.product2.save()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_product_detail_not_found(self):
+        assert self.client.get('/product/999/').status_code == 404
+
+    def test_product_list_category_options_are_cached(self, django_assert_max_num_queries):
+        self.client.get('/')
+
+        with django_assert_max_num_queries(2):
+            response = self.client.get('/')
+        assert b'Electronics' in response.content
+
+        Category.objects.create(name="Books")
+        assert b'Books' in self.client.get('/').content
+
+    def test_product_list_card_reflects_product_changes(self):
+        self.client.get('/')
+
+        self.product1.price = Decimal("899.99")
+        self.product1.save()
+
+        assert b'$899.99' in self.client.get('/').content
+
+    def test_product_detail_related_block_invalidated(self):
+        url = f'/product/{self.product1.id}/'
+        assert b'Mouse' in self.client.get(url).content
+
+        self.product2.name = "Trackball"
+        self.product2.save()
+
+        content = self.client.get(url).content
+        assert b'Trackball' in content
+        assert b'Mouse' not in content
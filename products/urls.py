@@ -6,6 +6,13 @@
 urlpatterns = [
     path('', views.product_list, name='product_list'),
     path('product/<int:product_id>/', views.product_detail, name='product_detail'),
+    path('api/products/', views.product_batch_api, name='product_batch_api'),
+    path('api/products/list/', views.product_list_api, name='product_list_api'),
+    path('api/products/export/', views.catalog_export, name='catalog_export'),
+    path('api/products/recent/', views.product_recent_api, name='product_recent_api'),
+    path('api/products/recommendations/', views.product_recommendations_api, name='product_recommendations_api'),
     path('api/products/<int:product_id>/', views.product_api, name='product_api'),
     path('api/categories/count/', views.category_products_count, name='category_count'),
+    path('api/categories/status-counts/', views.category_status_counts, name='category_status_counts'),
+    path('api/cache/stats/', views.product_api_cache_stats, name='product_api_cache_stats'),
 ]
\ No newline at end of file
@@ -1,7 +1,12 @@
+from collections import deque
 from decimal import Decimal
+from django.conf import settings
+from django.db.models import QuerySet, Sum
 from django.utils import timezone
 from datetime import timedelta
 
+CENT = Decimal('0.01')
+
 
 class ProductUtils:
     @staticmethod
@@ -9,6 +14,10 @@ def calculate_bulk_discount(products, discount_percentage):
         if discount_percentage < 0 or discount_percentage > 100:
             raise ValueError("Invalid discount percentage")
 
+        # Sliced querysets can't be aggregated without reordering; sum their rows.
+        if isinstance(products, QuerySet) and not products.query.is_sliced:
+            return ProductUtils._discount_totals(products, discount_percentage)
+
         total_original = sum(p.price for p in products)
         total_discounted = sum(p.apply_discount(discount_percentage) for p in products)
 
@@ -19,8 +28,30 @@ def calculate_bulk_discount(products, discount_percentage):
         }
 
     @staticmethod
-    def get_low_stock_products(threshold=10):
+    def _discount_totals(queryset, discount_percentage):
+        # A percentage discount is linear, so discounting the total equals
+        # summing the per-row apply_discount() results; only the price sum
+        # runs in the database and no rows are loaded.
+        total = queryset.order_by().aggregate(total=Sum('price'))['total']
+        # SQLite sums decimals as floats; prices are whole cents.
+        total_original = (total or Decimal(0)).quantize(CENT)
+        savings = total_original * (Decimal(str(discount_percentage)) / 100)
+        return {
+            'original_total': total_original,
+            'discounted_total': total_original - savings,
+            'savings': savings,
+        }
+
+    @staticmethod
+    def get_low_stock_products(threshold=None):
+        """
+        Active products at or below ``threshold``. Without a threshold, the
+        maintained low-stock set (per-category thresholds) is read instead
+        of scanning the catalog.
+        """
         from .models import Product
+        if threshold is None:
+            return Product.objects.filter(low_stock__isnull=False, is_active=True).select_related('category')
         return Product.objects.filter(
             stock__lte=threshold,
             is_active=True
@@ -33,7 +64,12 @@ def get_recent_products(days=30):
         return Product.objects.filter(
             created_at__gte=cutoff_date,
             is_active=True
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
+
+
+SHIPPING_BASE_COST = Decimal('5.00')
+SHIPPING_COST_PER_WEIGHT_UNIT = Decimal('0.50')
+NO_SHIPPING_COST = Decimal('0.00')
 
 
 def calculate_tax(price, tax_rate=0.1):
@@ -42,32 +78,94 @@ def calculate_tax(price, tax_rate=0.1):
     return price * (1 + Decimal(str(tax_rate)))
 
 
+def calculate_tax_batch(prices, tax_rate=0.1):
+    """calculate_tax for many prices; every result equals the scalar one exactly."""
+    if tax_rate < 0:
+        return list(prices)
+    multiplier = 1 + Decimal(str(tax_rate))
+    return [price * multiplier for price in prices]
+
+
 def format_currency(amount):
     return f"${amount:.2f}"
 
 
-def calculate_shipping_cost(weight, distance=100):
-    if weight <= 0:
-        return Decimal('0.00')
+def _distance_multiplier(distance):
+    return Decimal(str(1 + (distance / 1000)))
 
-    base_cost = Decimal('5.00')
-    weight_cost = Decimal(str(weight)) * Decimal('0.50')
-    distance_multiplier = 1 + (distance / 1000)
 
-    total_cost = (base_cost + weight_cost) * Decimal(str(distance_multiplier))
-    return total_cost.quantize(Decimal('0.01'))
+def _shipping_cost(weight, multiplier):
+    total_cost = (SHIPPING_BASE_COST + Decimal(str(weight)) * SHIPPING_COST_PER_WEIGHT_UNIT) * multiplier
+    return total_cost.quantize(CENT)
+
+
+def calculate_shipping_cost(weight, distance=100):
+    if weight <= 0:
+        return NO_SHIPPING_COST
+    return _shipping_cost(weight, _distance_multiplier(distance))
+
+
+def calculate_shipping_cost_batch(weights, distances=100):
+    """
+    calculate_shipping_cost for many weights, with one distance for all of
+    them or one per weight. Every result equals the scalar one exactly.
+
+    The float -> str -> Decimal conversions dominate the scalar function, so
+    multipliers and costs are memoized per distinct input value. Equal
+    inputs of different types (1, 1.0, Decimal(1)) share an entry: every
+    cost is quantized to cents, so they give the same result.
+    """
+    if isinstance(distances, (int, float, Decimal)):
+        multiplier = _distance_multiplier(distances)
+        costs = {}
+        results = []
+        for weight in weights:
+            key = weight
+            cost = costs.get(key)
+            if cost is None:
+                cost = costs[key] = NO_SHIPPING_COST if weight <= 0 else _shipping_cost(weight, multiplier)
+            results.append(cost)
+        return results
+
+    weights = list(weights)
+    distances = list(distances)
+    if len(weights) != len(distances):
+        raise ValueError("weights and distances must have the same length")
+
+    multipliers = {}
+    costs = {}
+    results = []
+    for weight, distance in zip(weights, distances):
+        key = (weight, distance)
+        cost = costs.get(key)
+        if cost is None:
+            if weight <= 0:
+                cost = NO_SHIPPING_COST
+            else:
+                multiplier = multipliers.get(distance)
+                if multiplier is None:
+                    multiplier = multipliers[distance] = _distance_multiplier(distance)
+                cost = _shipping_cost(weight, multiplier)
+            costs[key] = cost
+        results.append(cost)
+    return results
 
 
 class InventoryManager:
-    def __init__(self):
-        self.operations = []
+    def __init__(self, history_size=None):
+        # Only the most recent operations are kept in memory; the full
+        # history is the StockMovement ledger (products.ledger).
+        if history_size is None:
+            history_size = getattr(settings, 'PRODUCTS_INVENTORY_HISTORY_SIZE', 1000)
+        self.operations = deque(maxlen=history_size)
 
     def add_stock(self, product, quantity):
+        from .inventory import change_stock
+
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
 
-        product.stock += quantity
-        product.save()
+        change_stock(product, quantity)
 
         self.operations.append({
             'type': 'add',
@@ -77,14 +175,13 @@ def add_stock(self, product, quantity):
         })
 
     def remove_stock(self, product, quantity):
+        from .inventory import change_stock
+
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
 
-        if product.stock < quantity:
-            raise ValueError("Insufficient stock")
-
-        product.stock -= quantity
-        product.save()
+        # Raises InsufficientStock (a ValueError) without touching the row.
+        change_stock(product, -quantity)
 
         self.operations.append({
             'type': 'remove',
@@ -93,8 +190,29 @@ def remove_stock(self, product, quantity):
             'timestamp': timezone.now()
         })
 
+    def apply_stock_changes(self, changes):
+        """
+        Apply ``(product, quantity)`` pairs in one transaction; negative
+        quantities remove stock. Returns one result per pair, see
+        products.inventory.apply_stock_changes.
+        """
+        from .inventory import STOCK_CHANGED, apply_stock_changes
+
+        changes = list(changes)
+        results = apply_stock_changes(changes)
+        timestamp = timezone.now()
+        for (product, _), result in zip(changes, results):
+            if result['status'] == STOCK_CHANGED:
+                self.operations.append({
+                    'type': 'add' if result['quantity'] > 0 else 'remove',
+                    'product': getattr(product, 'name', product),
+                    'quantity': abs(result['quantity']),
+                    'timestamp': timestamp
+                })
+        return results
+
     def get_operation_history(self):
-        return self.operations.copy()
+        return list(self.operations)
 
 
 # Duplicate tax calculation functions - intentionally duplicated for SonarQube warnings
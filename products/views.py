@@ -1,99 +1,380 @@
+import json
+import uuid
 import structlog
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.core.paginator import Paginator
-from .models import Product, Category
+from django.views.decorators.csrf import csrf_exempt
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.views.decorators.http import require_http_methods
+from .cache import (
+    CATEGORIES_FRAGMENT,
+    api_cache_enabled,
+    category_products_fragment,
+    get_api_cache_stats,
+    get_cached_product_payload,
+    get_fragment_version,
+    set_cached_product_payload,
+)
+from .conditional import ProductValidators, get_product_validators
+from .export import EXPORT_FORMATS, export_catalog, parse_updated_since
+from .feeds import RECENT_PRODUCTS_DAYS, new_products_since, recent_products_page
+from .models import PRODUCT_STATUSES, Category, Product
+from .pagination import InvalidCursor, KeysetPaginator
+from .recommendations import recommend_products, record_view
+from .search import search_products
+from .serializers import PRODUCT_SERIALIZER, json_response
 
 logger = structlog.get_logger(__name__)
 
 
+PRODUCT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'name': ('name', 'id'),
+}
+PRODUCTS_PER_PAGE = 10
+MAX_PRODUCTS_PER_PAGE = 100
+MAX_BATCH_IDS = 100
+VISITOR_COOKIE = 'visitor'
+VISITOR_COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def parse_status(request):
+    status = request.GET.get('status') or None
+    if status is not None and status not in PRODUCT_STATUSES:
+        raise ValueError("Invalid status")
+    return status
+
+
+def filter_products(request, ranked=False, status=None):
+    products = get_active_products_by_category(request.GET.get('category'))
+    if status:
+        products = products.filter_status(status)
+
+    search_query = request.GET.get('search')
+    if search_query:
+        products = search_products(products, search_query, ranked=ranked)
+
+    return products
+
+
 def product_list(request):
     logger.info(
         "product_list_requested",
         category=request.GET.get('category'),
         search=request.GET.get('search'),
-        page=request.GET.get('page')
+        page=request.GET.get('page'),
+        cursor=request.GET.get('cursor'),
     )
-    products = Product.objects.filter(is_active=True).select_related('category')
-
+    order = request.GET.get('order')
+    cursor_mode = 'cursor' in request.GET or 'order' in request.GET
+    try:
+        status = parse_status(request)
+    except ValueError:
+        logger.warning("product_list_invalid_status", status=request.GET.get('status'))
+        status = None
+    # Keyset pages impose their own ordering, so relevance ranking only
+    # applies to the numbered pages.
+    products = filter_products(request, ranked=not cursor_mode, status=status)
     category_id = request.GET.get('category')
-    if category_id:
-        products = products.filter(category_id=category_id)
-
     search_query = request.GET.get('search')
-    if search_query:
-        products = products.filter(name__icontains=search_query)
-
-    paginator = Paginator(products, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    categories = Category.objects.all()
+    if cursor_mode:
+        if order not in PRODUCT_ORDERINGS:
+            order = 'newest'
+        paginator = KeysetPaginator(products, PRODUCTS_PER_PAGE, PRODUCT_ORDERINGS[order])
+        try:
+            page_obj = paginator.get_page(request.GET.get('cursor'))
+        except InvalidCursor:
+            logger.warning("product_list_invalid_cursor", cursor=request.GET.get('cursor'))
+            page_obj = paginator.get_page()
+    else:
+        paginator = Paginator(products, PRODUCTS_PER_PAGE)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+
+    # Only evaluated when the cached category options fragment is missing,
+    # and then from the primary: the fragment is cached under the current
+    # version, which a lagging replica may not have caught up with.
+    categories = Category.objects.using(DEFAULT_DB_ALIAS)
 
     context = {
         'page_obj': page_obj,
+        'cursor_mode': cursor_mode,
+        'order': order,
         'categories': categories,
+        'categories_version': get_fragment_version(CATEGORIES_FRAGMENT),
+        'fragment_cache_timeout': settings.PRODUCTS_FRAGMENT_CACHE_TIMEOUT,
         'selected_category': category_id,
         'search_query': search_query,
+        # The list only shows active products.
+        'statuses': [(slug, label) for slug, label in PRODUCT_STATUSES.items() if slug != 'inactive'],
+        'selected_status': status,
     }
 
     return render(request, 'products/product_list.html', context)
 
 
-def product_detail(request, product_id):
-    product = get_object_or_404(Product, id=product_id, is_active=True)
+def parse_limit(request):
+    try:
+        limit = min(int(request.GET.get('limit', PRODUCTS_PER_PAGE)), MAX_PRODUCTS_PER_PAGE)
+    except ValueError:
+        raise ValueError("Invalid limit") from None
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return limit
+
+
+def parse_list_api_params(request):
+    order = request.GET.get('order', 'newest')
+    if order not in PRODUCT_ORDERINGS:
+        raise ValueError("Invalid order")
+
+    products = filter_products(request, status=parse_status(request))
+    return KeysetPaginator(products, parse_limit(request), PRODUCT_ORDERINGS[order])
+
+
+def list_api_response(page):
+    logger.info("product_list_api_success", count=len(page))
+    return JsonResponse({
+        'products': [build_product_json_data(product) for product in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+def product_list_api(request):
+    try:
+        paginator = parse_list_api_params(request)
+        page = paginator.get_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        logger.warning("product_list_api_invalid_cursor", cursor=request.GET.get('cursor'))
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
 
-    related_products = Product.objects.filter(
-        category=product.category,
-        is_active=True
-    ).exclude(id=product.id)[:4]
+    return list_api_response(page)
+
+
+def product_recent_api(request):
+    since = request.GET.get('since')
+    try:
+        limit = parse_limit(request)
+        if since:
+            page, since_cursor = new_products_since(since, limit)
+        else:
+            try:
+                days = int(request.GET.get('days', RECENT_PRODUCTS_DAYS))
+            except ValueError:
+                raise ValueError("Invalid days") from None
+            if days < 1:
+                raise ValueError("Invalid days")
+            page, since_cursor = recent_products_page(request.GET.get('cursor'), limit, days)
+    except InvalidCursor:
+        logger.warning("product_recent_api_invalid_cursor", cursor=request.GET.get('cursor'), since=since)
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    logger.info("product_recent_api_success", count=len(page), since=bool(since))
+    return JsonResponse({
+        'products': [build_product_json_data(product) for product in page],
+        'next_cursor': page.next_cursor,
+        'since_cursor': since_cursor,
+    })
+
+
+def product_detail(request, product_id):
+    validators = get_product_validators(product_id, 'html', include_related=True)
+    if validators is not None:
+        response = validators.conditional_response(request)
+        if response is not None:
+            return response
+
+    product = get_object_or_404(Product.objects.select_related('category'), id=product_id, is_active=True)
+
+    # Precomputed by products.related; one indexed join, only evaluated
+    # when the cached related block is missing (from the primary, like
+    # the category options in product_list).
+    related_products = Product.objects.using(DEFAULT_DB_ALIAS).filter(
+        related_by__product_id=product.id,
+        is_active=True,
+    ).order_by('related_by__rank')
 
     context = {
         'product': product,
         'related_products': related_products,
+        'related_version': get_fragment_version(category_products_fragment(product.category_id)),
+        'fragment_cache_timeout': settings.PRODUCTS_FRAGMENT_CACHE_TIMEOUT,
     }
 
-    return render(request, 'products/product_detail.html', context)
+    response = render(request, 'products/product_detail.html', context)
+    if validators is not None:
+        validators.apply(response)
+    record_product_view(request, response, product.pk)
+    return response
+
+
+def get_visitor(request):
+    """The visitor id interactions are recorded under: the user, else the visitor cookie."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    visitor = request.COOKIES.get(VISITOR_COOKIE)
+    return visitor[:64] if visitor else None
+
+
+def record_product_view(request, response, product_id):
+    visitor = get_visitor(request)
+    if visitor is None:
+        visitor = uuid.uuid4().hex
+        response.set_cookie(VISITOR_COOKIE, visitor, max_age=VISITOR_COOKIE_MAX_AGE, httponly=True, samesite='Lax')
+    try:
+        record_view(visitor, product_id)
+    except DatabaseError as exc:
+        # Recommendations can do without one view; the page cannot.
+        logger.warning("product_view_not_recorded", product_id=product_id, error=str(exc))
 
 
 def product_api(request, product_id):
     logger.info("product_api_request", product_id=product_id)
-    try:
-        product = Product.objects.get(id=product_id, is_active=True)
-
-        data = {
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'stock': product.stock,
-            'status': product.get_status(),
-            'category': product.category.name,
-        }
-
-        logger.info(
-            "product_api_success",
-            product_id=product_id,
-            product_name=product.name,
-            status=product.get_status(),
-            stock=product.stock
-        )
-        return JsonResponse(data)
-    except Product.DoesNotExist:
+
+    cache_enabled = api_cache_enabled()
+    if cache_enabled:
+        cached, version = get_cached_product_payload(product_id)
+        if cached is not None:
+            # Cached with the validators of the same version: no query at all.
+            logger.info("product_api_cache_hit", product_id=product_id)
+            validators = ProductValidators(cached['etag'], cached['last_modified'])
+            return validators.conditional_response(request) or validators.apply(json_response(cached['data']))
+
+    # A payload cached under the current version must not come from a
+    # replica that has not seen the write which bumped it.
+    using = DEFAULT_DB_ALIAS if cache_enabled else None
+    validators = get_product_validators(product_id, 'json', using=using)
+    if validators is None:
+        logger.warning("product_not_found", product_id=product_id)
+        return JsonResponse({'error': 'Product not found'}, status=404)
+
+    response = validators.conditional_response(request)
+    if response is not None:
+        logger.info("product_api_not_modified", product_id=product_id)
+        return response
+
+    data = PRODUCT_SERIALIZER.first(id=product_id, is_active=True, using=using)
+    if data is None:
         logger.warning("product_not_found", product_id=product_id)
         return JsonResponse({'error': 'Product not found'}, status=404)
 
+    if cache_enabled:
+        set_cached_product_payload(product_id, version, {
+            'data': data, 'etag': validators.etag, 'last_modified': validators.last_modified,
+        })
+
+    logger.info(
+        "product_api_success",
+        product_id=product_id,
+        product_name=data['name'],
+        status=data['status'],
+        stock=data['stock']
+    )
+    return validators.apply(json_response(data))
+
+
+def product_api_cache_stats(request):
+    return JsonResponse({'enabled': api_cache_enabled(), **get_api_cache_stats()})
+
+
+def parse_batch_ids(request):
+    try:
+        if request.method == 'POST' and request.content_type == 'application/json':
+            ids = json.loads(request.body or b'{}').get('ids', [])
+            if not isinstance(ids, list):
+                raise ValueError("ids must be a list")
+        else:
+            source = request.POST if request.method == 'POST' else request.GET
+            ids = [value for value in source.get('ids', '').split(',') if value.strip()]
+
+        # Keep the requested order but look every id up only once.
+        ids = list(dict.fromkeys(int(value) for value in ids))
+    except (ValueError, TypeError, AttributeError):
+        logger.warning("product_batch_invalid_ids")
+        raise ValueError("Invalid ids") from None
+
+    if not ids:
+        raise ValueError("No ids given")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
+
+def batch_api_response(ids, found):
+    """``found`` maps ids to PRODUCT_SERIALIZER dicts."""
+    products = [found[product_id] for product_id in ids if product_id in found]
+    missing = [product_id for product_id in ids if product_id not in found]
+
+    logger.info("product_batch_success", requested=len(ids), found=len(products), missing=missing)
+    return json_response({'products': products, 'missing': missing})
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def product_batch_api(request):
+    try:
+        ids = parse_batch_ids(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return batch_api_response(ids, PRODUCT_SERIALIZER.in_bulk(ids, is_active=True))
+
+
+def product_recommendations_api(request):
+    try:
+        ids = parse_batch_ids(request)
+        limit = parse_limit(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    products = recommend_products(ids, limit)
+    logger.info("product_recommendations_success", history=len(ids), count=len(products))
+    return JsonResponse({'products': [build_product_json_data(product) for product in products]})
+
+
+def catalog_export(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': 'Invalid format'}, status=400)
+
+    updated_since = request.GET.get('updated_since')
+    try:
+        updated_since = parse_updated_since(updated_since) if updated_since else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid updated_since'}, status=400)
+
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true')
+    logger.info(
+        "catalog_export_request",
+        format=export_format,
+        updated_since=str(updated_since) if updated_since else None,
+        gzip=compress,
+    )
+
+    response = StreamingHttpResponse(
+        export_catalog(export_format, updated_since, compress),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="catalog.{export_format}"'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 
 def category_products_count(request):
     logger.info("category_products_count_request")
-    categories = Category.objects.all()
-    data = []
-
-    for category in categories:
-        count = category.products.filter(is_active=True).count()
-        data.append({
-            'category': category.name,
-            'product_count': count
-        })
+    data = [
+        {'category': name, 'product_count': count}
+        for name, count in Category.objects.values_list('name', 'product_count')
+    ]
 
     logger.info(
         "category_products_count_success",
@@ -103,6 +384,19 @@ def category_products_count(request):
     return JsonResponse({'categories': data})
 
 
+def category_status_counts_response(rows):
+    data = [
+        {'category': row['category__name'], **{status: row[status] for status in PRODUCT_STATUSES}}
+        for row in rows
+    ]
+    logger.info("category_status_counts_success", total_categories=len(data))
+    return JsonResponse({'categories': data})
+
+
+def category_status_counts(request):
+    return category_status_counts_response(Product.objects.status_counts_by_category())
+
+
 # Duplicate function 1 - intentionally duplicated for SonarQube warnings
 def get_active_products_by_category(category_id=None):
     products = Product.objects.filter(is_active=True).select_related('category')
@@ -12,5 +12,7 @@
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "qualitydemo.settings")
+# Serve the read APIs with the async views from products.async_views.
+os.environ.setdefault("DJANGO_ROOT_URLCONF", "qualitydemo.asgi_urls")
 
 application = get_asgi_application()
@@ -0,0 +1,13 @@
+"""
+URL configuration used by the ASGI deployment (see qualitydemo/asgi.py).
+
+It mirrors qualitydemo.urls but routes the read APIs to the async views in
+products.async_views.
+"""
+from django.contrib import admin
+from django.urls import include, path
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include('products.async_urls')),
+]
@@ -45,6 +45,7 @@
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'products.db_routing.replica_pinning_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -53,7 +54,8 @@
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'qualitydemo.urls'
+# qualitydemo/asgi.py switches this to qualitydemo.asgi_urls (async read APIs)
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'qualitydemo.urls')
 
 TEMPLATES = [
     {
@@ -96,6 +98,91 @@
         }
     }
 
+# Read replicas (products.db_routing): DB_REPLICAS lists replica hosts
+# (host[:port]) for PostgreSQL or replica database files for SQLite.
+DATABASE_REPLICAS = []
+for index, location in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica['NAME'] = BASE_DIR / location
+    else:
+        host, _, port = location.partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    DATABASES[f'replica_{index}'] = replica
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['products.db_routing.PrimaryReplicaRouter']
+DATABASE_REPLICA_APPS = ['products']
+# Skip a replica lagging more than this many seconds; re-checked every interval
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '5'))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = 5
+# How long a client reads from the primary after writing
+DATABASE_PRIMARY_PIN_SECONDS = int(os.environ.get('DB_PRIMARY_PIN_SECONDS', '10'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use Redis if REDIS_URL is set (docker-compose does). The in-process
+# fallback is per worker: cache invalidations made by one gunicorn worker
+# are not seen by the others until entries time out, so keep it for
+# development and single-process runs.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # Room for one template fragment per product card
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
+# Opt-in response cache for products.views.product_api
+PRODUCTS_API_CACHE_ENABLED = os.environ.get('PRODUCTS_API_CACHE_ENABLED', 'false').lower() == 'true'
+PRODUCTS_API_CACHE_ALIAS = 'default'
+PRODUCTS_API_CACHE_TIMEOUT = int(os.environ.get('PRODUCTS_API_CACHE_TIMEOUT', '300'))
+
+# Lifetime of the cached product list/detail template fragments
+PRODUCTS_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('PRODUCTS_FRAGMENT_CACHE_TIMEOUT', '600'))
+
+# Stock ledger write buffering (products.ledger) and in-memory history size
+PRODUCTS_STOCK_LEDGER_BUFFER_SIZE = int(os.environ.get('PRODUCTS_STOCK_LEDGER_BUFFER_SIZE', '500'))
+PRODUCTS_STOCK_LEDGER_MAX_AGE = float(os.environ.get('PRODUCTS_STOCK_LEDGER_MAX_AGE', '5'))
+PRODUCTS_STOCK_LEDGER_MAX_PENDING = int(os.environ.get('PRODUCTS_STOCK_LEDGER_MAX_PENDING', '10000'))
+PRODUCTS_INVENTORY_HISTORY_SIZE = 1000
+
+# Default low-stock threshold; Category.low_stock_threshold overrides it
+PRODUCTS_LOW_STOCK_THRESHOLD = 10
+
+# Seconds a checkout reservation holds stock (products.reservations)
+PRODUCTS_RESERVATION_TTL = int(os.environ.get('PRODUCTS_RESERVATION_TTL', '900'))
+
+# Scorers (dotted path, weight) used to precompute related products;
+# products.related.CoViewScorer adds what visitors viewed together. A
+# product save also updates the lists of its this many closest products.
+PRODUCTS_RELATED_SCORERS = [
+    ('products.related.PriceProximityScorer', 1.0),
+]
+PRODUCTS_RELATED_NEIGHBOUR_UPDATES = 20
+
+# Neighbours kept per product by products.recommendations, and how often
+# (seconds) each process checks the database for a newer build
+PRODUCTS_RECOMMENDATION_NEIGHBOURS = 20
+PRODUCTS_RECOMMENDATION_RELOAD_INTERVAL = int(os.environ.get('PRODUCTS_RECOMMENDATION_RELOAD_INTERVAL', '30'))
+
+# Recorded product views: a visitor's repeat views of a product within
+# this many seconds are skipped, and only this share of visitors is
+# recorded; prune_interactions keeps this many days
+PRODUCTS_INTERACTION_VIEW_DEDUP_SECONDS = 3600
+PRODUCTS_INTERACTION_VIEW_SAMPLE_RATE = float(os.environ.get('PRODUCTS_INTERACTION_VIEW_SAMPLE_RATE', '1'))
+PRODUCTS_INTERACTION_RETENTION_DAYS = 90
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators